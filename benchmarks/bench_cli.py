@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+"""Benchmarks for each of the tag CLI subcommands."""
+
+import os
+import tag
+import tag.__main__
+from tag.tests import data_file
+from benchdata import HONEYBEE, NCBI, PCAN, YE, quiet, tempdir
+
+
+def _cli(arglist):
+    args = tag.cli.parser().parse_args(arglist)
+
+    def run():
+        with quiet():
+            tag.__main__.main(args)
+    return run
+
+
+def bench_bae():
+    return _cli(['bae'] + YE)
+
+
+def bench_bcollapse():
+    return _cli(['bcollapse'] + YE)
+
+
+def bench_closest():
+    return _cli(['closest', YE[1], YE[2]])
+
+
+def bench_diff():
+    return _cli(['diff', YE[1], YE[2]])
+
+
+def bench_gff3():
+    return _cli(['gff3', NCBI])
+
+
+def bench_intersect():
+    return _cli(['intersect', YE[1], YE[2]])
+
+
+def bench_locuspocus():
+    return _cli(['locuspocus'] + YE)
+
+
+def bench_merge():
+    return _cli(['merge'] + YE)
+
+
+def bench_occ():
+    return _cli(['occ', NCBI, 'CDS'])
+
+
+def bench_pep2nuc():
+    return _cli([
+        'pep2nuc', '-k', 'protein', data_file('Ypes-abinit.gff3.gz'),
+        data_file('Ypes-signalp-prot.gff3.gz'),
+    ])
+
+
+def bench_pmrna():
+    return _cli(['pmrna', HONEYBEE])
+
+
+def bench_pmrna_sorted():
+    return _cli(['pmrna', '--sorted', HONEYBEE])
+
+
+def bench_split():
+    pattern = os.path.join(tempdir(), 'split', '{}.gff3')
+    return _cli(['split', '--out', pattern, '--max-open', '16', NCBI])
+
+
+def bench_split_size():
+    pattern = os.path.join(tempdir(), 'split', 'chunk{}.gff3.gz')
+    return _cli(['split', '--out', pattern, '--size', '256K', NCBI])
+
+
+def bench_sum():
+    return _cli(['sum', NCBI])
+
+
+def bench_validate():
+    return _cli(['validate', NCBI])
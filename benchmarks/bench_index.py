@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+"""Benchmarks for interval and name indexes."""
+
+import os
+import random
+import tag
+from benchdata import NCBI, PCAN, synthetic, tempdir
+
+
+def bench_index_consume():
+    entries = list(tag.GFF3Reader(infilename=NCBI))
+
+    def run():
+        index = tag.index.Index()
+        index.consume(entries)
+    return run
+
+
+def bench_index_query():
+    index = tag.index.Index()
+    index.consume_file(NCBI)
+    rng = random.Random(42)
+    queries = list()
+    for seqid in index.seqids:
+        start, end = index.extent(seqid)
+        for _ in range(50):
+            qstart = rng.randint(start, end)
+            queries.append((seqid, qstart, qstart + rng.randint(1, 10000)))
+
+    def run():
+        for seqid, start, end in queries:
+            index.query(seqid, start, end, strict=False)
+            index.query(seqid, start, end, strict=True)
+            index.query(seqid, start)
+    return run
+
+
+def bench_index_query_many():
+    index = tag.index.Index()
+    index.consume_file(NCBI)
+    rng = random.Random(42)
+    regions = list()
+    for seqid in index.seqids:
+        start, end = index.extent(seqid)
+        for _ in range(50):
+            qstart = rng.randint(start, end)
+            regions.append((seqid, qstart, qstart + rng.randint(1, 10000)))
+    points = [region[:2] for region in regions]
+
+    def run():
+        index.query_many(regions, strict=False)
+        index.query_many(regions, strict=True)
+        index.query_many(points)
+    return run
+
+
+def bench_index_query_cached():
+    index = tag.index.Index(cachesize=1000)
+    index.consume_file(synthetic('index', seqlen=2000000))
+    seqid = next(index.seqids)
+    # Overlapping viewports, revisited as when panning back and forth
+    viewports = [(seqid, s, s + 50000) for s in range(0, 1950000, 10000)]
+
+    def run():
+        for _ in range(10):
+            for region in viewports:
+                index.query(*region, strict=False)
+    return run
+
+
+def bench_index_nearest():
+    index = tag.index.Index()
+    index.consume_file(NCBI)
+    rng = random.Random(42)
+    points = list()
+    for seqid in index.seqids:
+        start, end = index.extent(seqid)
+        for _ in range(50):
+            points.append((seqid, rng.randint(start, end)))
+
+    def run():
+        for point in points:
+            index.nearest(*point, k=3)
+    return run
+
+
+def bench_index_nearest_many():
+    index = tag.index.Index()
+    index.consume_file(NCBI)
+    rng = random.Random(42)
+    points = list()
+    for seqid in index.seqids:
+        start, end = index.extent(seqid)
+        for _ in range(50):
+            points.append((seqid, rng.randint(start, end)))
+    return lambda: index.nearest_many(points, k=3)
+
+
+def bench_named_index():
+    entries = list(tag.GFF3Reader(infilename=PCAN))
+
+    def run():
+        index = tag.index.NamedIndex()
+        index.consume(entries)
+        for name in index.names:
+            index[name]
+    return run
+
+
+def bench_named_index_lazy():
+    infile = synthetic('named', seqs=4, seqlen=2000000)
+    index = tag.index.NamedIndex()
+    index.consume_file(infile)
+    names = list(index.names)[::20]
+
+    def run():
+        index = tag.index.NamedIndex(lazy=True)
+        index.consume_file(infile)
+        for name in names:
+            index[name]
+    return run
+
+
+def bench_store_updates():
+    storedir = os.path.join(tempdir(), 'store-updates')
+    store = tag.store.AnnotationStore(storedir)
+    store.consume_file(NCBI)
+    features = list(store)[::20]
+
+    def run():
+        for feature in features:
+            store.replace(feature)
+    return run
+
+
+def bench_store_open():
+    storedir = os.path.join(tempdir(), 'store-open')
+    with tag.store.AnnotationStore(storedir) as store:
+        store.consume_file(NCBI)
+        store.compact()
+
+    def run():
+        tag.store.AnnotationStore(storedir).close()
+    return run
+
+
+def bench_server_queries():
+    import atexit
+    import http.client
+    import threading
+    service = tag.server.AnnotationService()
+    service.load(NCBI)
+    server = tag.server.AnnotationServer(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    atexit.register(server.shutdown)
+    rng = random.Random(42)
+    seqids = list(service.index.seqids)
+    paths = list()
+    for _ in range(1000):
+        seqid = rng.choice(seqids)
+        start, end = service.index.extent(seqid)
+        qstart = rng.randint(start + 1, end)
+        paths.append('/region?seqid={}&start={}&end={}'.format(
+            seqid, qstart, qstart + rng.randint(1, 10000)
+        ))
+
+    def run():
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_port)
+        for path in paths:
+            conn.request('GET', path)
+            conn.getresponse().read()
+        conn.close()
+    return run
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+"""Benchmarks for reading and writing GFF3."""
+
+import io
+import os
+import tag
+from benchdata import NCBI, PRODIGAL, consume, plain, tempdir
+
+
+def bench_reader_unsorted_gz():
+    return lambda: consume(tag.GFF3Reader(infilename=NCBI))
+
+
+def bench_reader_unsorted_plain():
+    infile = plain(NCBI)
+    return lambda: consume(tag.GFF3Reader(infilename=infile))
+
+
+def bench_reader_sorted_gz():
+    return lambda: consume(
+        tag.GFF3Reader(infilename=PRODIGAL, assumesorted=True)
+    )
+
+
+def bench_reader_sorted_plain():
+    infile = plain(PRODIGAL)
+    return lambda: consume(tag.GFF3Reader(infilename=infile,
+                                          assumesorted=True))
+
+
+def bench_reader_mmap():
+    infile = plain(NCBI)
+
+    def run():
+        instream = tag.fileio.open(infile, 'r', usemmap=True)
+        consume(tag.GFF3Reader(instream))
+    return run
+
+
+def _recompressed(ext):
+    outfile = os.path.join(tempdir(), 'reader.gff3.' + ext)
+    if not os.path.exists(outfile):
+        with tag.open(NCBI, 'r') as infh, tag.open(outfile, 'w') as outfh:
+            outfh.write(infh.read())
+    return outfile
+
+
+def bench_reader_bz2():
+    infile = _recompressed('bz2')
+    return lambda: consume(tag.GFF3Reader(infilename=infile))
+
+
+def bench_reader_xz():
+    infile = _recompressed('xz')
+    return lambda: consume(tag.GFF3Reader(infilename=infile))
+
+
+def bench_reader_budget_sorted():
+    return lambda: consume(tag.GFF3Reader(
+        infilename=NCBI, assumesorted=True, max_records=200
+    ))
+
+
+def bench_reader_budget_spill():
+    return lambda: consume(tag.GFF3Reader(
+        infilename=NCBI, max_records=200, tempdir=tempdir()
+    ))
+
+
+def bench_writer():
+    entries = list(tag.GFF3Reader(infilename=NCBI))
+
+    def run():
+        writer = tag.GFF3Writer(entries, outfile=io.StringIO())
+        writer.retainids = True
+        writer.write()
+    return run
+
+
+def bench_writer_gz():
+    entries = list(tag.GFF3Reader(infilename=NCBI))
+    outfile = os.path.join(tempdir(), 'writer.gff3.gz')
+
+    def run():
+        writer = tag.GFF3Writer(entries, outfile=outfile)
+        writer.retainids = True
+        writer.write()
+        writer.outfile.close()
+    return run
+
+
+def bench_writer_xz():
+    entries = list(tag.GFF3Reader(infilename=NCBI))
+    outfile = os.path.join(tempdir(), 'writer.gff3.xz')
+
+    def run():
+        writer = tag.GFF3Writer(entries, outfile=outfile)
+        writer.retainids = True
+        writer.write()
+        writer.outfile.close()
+    return run
+
+
+def bench_writer_bgzf():
+    entries = list(tag.GFF3Reader(infilename=NCBI))
+    outfile = os.path.join(tempdir(), 'writer.gff3.bgz')
+
+    def run():
+        writer = tag.GFF3Writer(entries, outfile=outfile)
+        writer.retainids = True
+        writer.write()
+        writer.outfile.close()
+    return run
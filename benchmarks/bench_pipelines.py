@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+"""Benchmarks for streaming pipelines: merging, loci, evaluation, isoforms."""
+
+import tag
+from benchdata import HONEYBEE, PCAN, YE, consume
+
+
+def _sorted_entries(infile):
+    return list(tag.GFF3Reader(infilename=infile, assumesorted=True))
+
+
+def bench_select_merge():
+    streams = [_sorted_entries(infile) for infile in YE]
+    return lambda: consume(tag.select.merge(*streams))
+
+
+def bench_select_merge_cascade():
+    streams = [_sorted_entries(infile) for infile in YE] * 40
+    return lambda: consume(tag.select.merge(*streams, fanin=16))
+
+
+def bench_select_collapse_duplicates():
+    streams = [_sorted_entries(infile) for infile in YE] * 2
+
+    def run():
+        merger = tag.select.merge(*streams)
+        consume(tag.select.collapse_duplicates(merger))
+    return run
+
+
+def bench_locus_loci():
+    streams = [_sorted_entries(infile) for infile in YE]
+    return lambda: consume(tag.locus.loci(*streams))
+
+
+def bench_locus_cluster():
+    streams = [_sorted_entries(infile) for infile in YE] * 4
+    merger = tag.select.merge(*streams, keyed=True)
+    keyed = [(key, entry) for key, entry in merger if key[0] == 4]
+    return lambda: consume(tag.locus.cluster(keyed))
+
+
+def bench_sweep_intersect():
+    astream = _sorted_entries(YE[1])
+    bstream = _sorted_entries(YE[2])
+    return lambda: consume(tag.sweep.intersect(astream, bstream, minperc=0.5))
+
+
+def bench_sweep_intersect_types():
+    entries = _sorted_entries(HONEYBEE)
+
+    def run():
+        consume(tag.sweep.intersect(entries, entries, atype='exon',
+                                    btype='CDS'))
+    return run
+
+
+def bench_sweep_closest():
+    astream = _sorted_entries(YE[1])
+    bstream = _sorted_entries(YE[2])
+    return lambda: consume(tag.sweep.closest(astream, bstream, k=2))
+
+
+def bench_sweep_diff():
+    old = _sorted_entries(HONEYBEE)
+    new = _sorted_entries(HONEYBEE)
+    return lambda: consume(tag.sweep.diff(old, new))
+
+
+def bench_bae_eval_stream():
+    def run():
+        streams = [
+            tag.GFF3Reader(infilename=infile, assumesorted=True)
+            for infile in YE
+        ]
+        consume(tag.bae.eval_stream(tag.locus.loci(*streams)))
+    return run
+
+
+def bench_transcript_primary_mrna():
+    def run():
+        for infile in (HONEYBEE, PCAN):
+            reader = tag.GFF3Reader(infilename=infile)
+            consume(tag.transcript.primary_mrna(reader))
+    return run
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+"""Benchmarks on synthetic data of increasing size, to expose poor scaling."""
+
+import tag
+from benchdata import consume, synthetic
+
+
+def _sorted(size):
+    return synthetic('sorted-{}'.format(size), seqs=5 * size, seqlen=1000000)
+
+
+def _unsorted(size):
+    return synthetic('unsorted-{}'.format(size), seqs=5 * size, seqlen=1000000,
+                     shuffle=100, separators=False)
+
+
+def bench_scaling_sorted_1x():
+    infile = _sorted(1)
+    return lambda: consume(tag.GFF3Reader(infilename=infile,
+                                          assumesorted=True))
+
+
+def bench_scaling_sorted_4x():
+    infile = _sorted(4)
+    return lambda: consume(tag.GFF3Reader(infilename=infile,
+                                          assumesorted=True))
+
+
+def bench_scaling_unsorted_1x():
+    infile = _unsorted(1)
+    return lambda: consume(tag.GFF3Reader(infilename=infile))
+
+
+def bench_scaling_unsorted_4x():
+    infile = _unsorted(4)
+    return lambda: consume(tag.GFF3Reader(infilename=infile))
+
+
+def bench_scaling_synth():
+    synth = tag.synth.GenomeSynthesizer(seqs=4, seqlen=1000000, fasta=True)
+    return lambda: consume(synth)
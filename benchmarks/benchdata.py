@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+"""Shared data and helpers for the benchmark suite."""
+
+import atexit
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import tag
+from tag.tests import data_file
+
+
+NCBI = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+HONEYBEE = data_file('honeybee-100kb.gff3.gz')
+PCAN = data_file('pcan-123.gff3.gz')
+PRODIGAL = data_file('Ye.prodigal.gff3.gz')
+YE = [
+    data_file('Ye.callgenes.gff3.gz'),
+    data_file('Ye.glimmer.gff3.gz'),
+    data_file('Ye.prodigal.gff3.gz'),
+]
+
+_tempdir = None
+
+
+def tempdir():
+    global _tempdir
+    if _tempdir is None:
+        _tempdir = tempfile.mkdtemp(prefix='tag-bench-')
+        atexit.register(shutil.rmtree, _tempdir, True)
+    return _tempdir
+
+
+def plain(gzfile):
+    """Decompressed copy of a bundled data file, created on first use."""
+    outfile = os.path.join(tempdir(), os.path.basename(gzfile)[:-3])
+    if not os.path.exists(outfile):
+        with gzip.open(gzfile, 'rb') as infh, open(outfile, 'wb') as outfh:
+            shutil.copyfileobj(infh, outfh)
+    return outfile
+
+
+def synthetic(name, **kwargs):
+    """Synthetic GFF3 file, created on first use; see tag.synth."""
+    outfile = os.path.join(tempdir(), name + '.gff3')
+    if not os.path.exists(outfile):
+        with open(outfile, 'w') as outfh:
+            tag.synth.GenomeSynthesizer(**kwargs).write(outfh)
+    return outfile
+
+
+def consume(stream):
+    for _ in stream:
+        pass
+
+
+@contextlib.contextmanager
+def quiet():
+    """Discard terminal output, such as from CLI commands."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        with contextlib.redirect_stderr(io.StringIO()):
+            yield
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+"""
+Performance benchmarks for tag.
+
+Benchmarks are functions named :code:`bench_*` in the :code:`bench_*.py`
+modules of this directory. Each benchmark function performs any setup work
+and returns a callable with no arguments: only the callable is measured. Each
+benchmark is timed over several repetitions (reporting the best and median
+wall time), and then run once more under :code:`tracemalloc` to record peak
+memory allocation.
+
+Results can be saved as a baseline and compared against in later runs.
+
+    python benchmarks/run.py                    # run and compare to baseline
+    python benchmarks/run.py -k reader          # run selected benchmarks
+    python benchmarks/run.py --save-baseline    # overwrite stored baseline
+"""
+
+from __future__ import print_function
+import argparse
+import gc
+import glob
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+BENCHDIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(BENCHDIR, 'baseline.json')
+
+
+def discover(patterns=None):
+    """Collect benchmark functions, optionally filtered by name."""
+    sys.path.insert(0, BENCHDIR)
+    sys.path.insert(0, os.path.dirname(BENCHDIR))
+    benchmarks = list()
+    for modfile in sorted(glob.glob(os.path.join(BENCHDIR, 'bench_*.py'))):
+        modname = os.path.basename(modfile)[:-3]
+        module = importlib.import_module(modname)
+        for name in sorted(dir(module)):
+            if not name.startswith('bench_'):
+                continue
+            fullname = '{}.{}'.format(modname[6:], name[6:])
+            if patterns and not any(p in fullname for p in patterns):
+                continue
+            benchmarks.append((fullname, getattr(module, name)))
+    return benchmarks
+
+
+def measure(benchfunc, repeat=5):
+    """Time a benchmark and record its peak memory allocation."""
+    times = list()
+    for _ in range(repeat):
+        func = benchfunc()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    func = benchfunc()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'best': min(times),
+        'median': statistics.median(times),
+        'peakmem': peak,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print results alongside the baseline and report regressions."""
+    regressions = list()
+    template = '{:<36s} {:>10s} {:>10s} {:>8s} {:>10s} {:>8s}'
+    print(template.format('benchmark', 'best', 'baseline', 'ratio',
+                          'peakmem', 'ratio'))
+    for name in sorted(results):
+        result = results[name]
+        base = baseline.get(name)
+        timestr = '{:.4f}s'.format(result['best'])
+        memstr = '{:.1f}MB'.format(result['peakmem'] / 1e6)
+        if base is None:
+            print(template.format(name, timestr, '-', '-', memstr, '-'))
+            continue
+        tratio = result['best'] / base['best']
+        mratio = result['peakmem'] / max(base['peakmem'], 1)
+        flag = ''
+        if tratio > threshold or mratio > threshold:
+            regressions.append(name)
+            flag = '  <-- regression'
+        print(template.format(
+            name, timestr, '{:.4f}s'.format(base['best']),
+            '{:.2f}x'.format(tratio), memstr, '{:.2f}x'.format(mratio),
+        ) + flag)
+    return regressions
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description='Run tag benchmarks')
+    parser.add_argument(
+        '-k', '--select', metavar='PATTERN', action='append',
+        help='run only benchmarks whose name contains PATTERN; can be '
+        'specified multiple times'
+    )
+    parser.add_argument(
+        '-r', '--repeat', metavar='N', type=int, default=5,
+        help='number of timed repetitions per benchmark; default is 5'
+    )
+    parser.add_argument(
+        '-b', '--baseline', metavar='FILE', default=BASELINE,
+        help='baseline results file; default is benchmarks/baseline.json'
+    )
+    parser.add_argument(
+        '-t', '--threshold', metavar='T', type=float, default=1.25,
+        help='report a regression when time or memory exceeds the baseline '
+        'by a factor of T; default is 1.25'
+    )
+    parser.add_argument(
+        '-s', '--save-baseline', action='store_true',
+        help='store the results as the new baseline'
+    )
+    parser.add_argument(
+        '-f', '--fail-on-regression', action='store_true',
+        help='exit with a non-zero status if any regressions are reported'
+    )
+    parser.add_argument(
+        '-o', '--out', metavar='FILE', help='write results to FILE in JSON '
+        'format'
+    )
+    return parser
+
+
+def main(args):
+    results = dict()
+    for name, benchfunc in discover(args.select):
+        results[name] = measure(benchfunc, repeat=args.repeat)
+        print('.', end='', file=sys.stderr)
+        sys.stderr.flush()
+    print('', file=sys.stderr)
+
+    baseline = dict()
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as fh:
+            baseline = json.load(fh)['results']
+    regressions = compare(results, baseline, args.threshold)
+
+    output = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as fh:
+            json.dump(output, fh, indent=2, sort_keys=True)
+    if args.save_baseline:
+        if args.select:
+            baseline.update(results)
+            output['results'] = baseline
+        with open(args.baseline, 'w') as fh:
+            json.dump(output, fh, indent=2, sort_keys=True)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(get_parser().parse_args())
@@ -26,6 +26,7 @@ setup(name='tag',
       include_package_data=True,
       entry_points={'console_scripts': ['tag = tag.__main__:main']},
       install_requires=['intervaltree>=3.0', 'networkx>=2.0'],
+      extras_require={'table': ['numpy'], 'zstd': ['zstandard']},
       classifiers=[
           'Development Status :: 4 - Beta',
           'Environment :: Console',
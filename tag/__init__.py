@@ -8,10 +8,6 @@
 # -----------------------------------------------------------------------------
 """Package-wide configuration"""
 
-try:
-    import __builtin__ as builtins
-except ImportError:  # pragma: no cover
-    import builtins
 from tag.comment import Comment
 from tag.directive import Directive
 from tag.feature import Feature
@@ -20,13 +16,22 @@ from tag.range import Range
 from tag.reader import GFF3Reader
 from tag.writer import GFF3Writer
 from tag.score import Score
+from tag import aio
 from tag import bae
+from tag import cache
 from tag import cli
+from tag import fileio
 from tag import index
 from tag import locus
 from tag import select
+from tag import server
+from tag import stages
+from tag import store
+from tag import sweep
+from tag import synth
+from tag import table
 from tag import transcript
-from gzip import open as gzopen
+from tag import validate
 import sys
 
 from ._version import get_versions
@@ -34,14 +39,17 @@ __version__ = get_versions()['version']
 del get_versions
 
 
-def open(filename, mode):
-    if mode not in ['r', 'w']:
+def open(filename, mode, buffersize=None):
+    """
+    Open a file in text mode, compressing or decompressing as needed.
+
+    Compressed input is recognized by its contents, and output is compressed
+    according to its file name suffix (see :code:`tag.fileio`). Set
+    :code:`filename` to :code:`-` or :code:`None` to use stdin or stdout.
+    """
+    if mode not in ['r', 'w', 'a']:
         raise ValueError('invalid mode "{}"'.format(mode))
     if filename in ['-', None]:  # pragma: no cover
         filehandle = sys.stdin if mode == 'r' else sys.stdout
         return filehandle
-    openfunc = builtins.open
-    if filename.endswith('.gz'):
-        openfunc = gzopen
-        mode += 't'
-    return openfunc(filename, mode)
+    return fileio.open(filename, mode, buffersize=buffersize)
@@ -8,6 +8,7 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import print_function
+import cProfile
 import tag
 
 
@@ -25,4 +26,16 @@ def main(args=None):
 
     assert args.cmd in tag.cli.mains
     mainmethod = tag.cli.mains[args.cmd]
-    mainmethod(args)
+    if args.time_stages:
+        timer = tag.stages.enable()
+    try:
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.runcall(mainmethod, args)
+            profiler.dump_stats(args.profile)
+        else:
+            mainmethod(args)
+    finally:
+        if args.time_stages:
+            tag.stages.disable()
+            timer.report()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+"""
+Asynchronous reading and writing of GFF3 data with asyncio.
+
+The asynchronous reader and writer share their parsing, resolution, and
+formatting logic with :code:`GFF3Reader` and :code:`GFF3Writer`, and produce
+identical results. Blocking file I/O is performed in an executor, and data
+are processed in batches of lines or entries, returning control to the event
+loop between batches. For unsorted input, the final sorting and ID/Parent
+resolution of the entire annotation is also performed in the executor.
+
+>>> import asyncio
+>>> async def count_genes(infile):
+...     reader = AsyncGFF3Reader(infilename=infile)
+...     genes = 0
+...     async for entry in reader:
+...         if isinstance(entry, tag.Feature) and entry.type == 'gene':
+...             genes += 1
+...     return genes
+>>> infile = tag.tests.data_file('pcan-123.gff3.gz')
+>>> loop = asyncio.new_event_loop()
+>>> loop.run_until_complete(count_genes(infile))
+70
+>>> loop.close()
+"""
+
+import asyncio
+from io import StringIO
+from itertools import islice
+import sys
+import tag
+from tag.reader import GFF3Reader
+from tag.writer import GFF3Writer
+
+
+def _readbatch(lineiter, batchsize):
+    return list(islice(lineiter, batchsize))
+
+
+class AsyncGFF3Reader(object):
+    """
+    Loads sequence features and other GFF3 entries asynchronously.
+
+    Entries are obtained with :code:`async for`. Input can be provided as a
+    file name, as a regular (blocking) iterable of lines such as a file
+    object, or as an asynchronous iterable of lines (:code:`str` or
+    :code:`bytes`) such as an :code:`asyncio.StreamReader`. Blocking input
+    is read :code:`batchsize` lines at a time in the given :code:`executor`
+    (the loop's default executor if None).
+
+    The :code:`assumesorted`, :code:`strict`, :code:`checkorder`,
+    :code:`trusted`, :code:`symbols`, :code:`max_records`,
+    :code:`max_memory`, and :code:`tempdir` arguments have the same meaning
+    as for :code:`GFF3Reader`, and runtime statistics are collected in the
+    :code:`stats` attribute. Caching is not supported. At the end of the
+    input, remaining entries are resolved :code:`batchsize` at a time in the
+    executor.
+    """
+
+    def __init__(self, instream=None, infilename=None, batchsize=1000,
+                 executor=None, **kwargs):
+        assert (not instream) != (not infilename), (
+            'provide either an instream or an infile name, not both'
+        )
+        self.instream = instream
+        self.infilename = infilename
+        self.batchsize = batchsize
+        self.executor = executor
+        if kwargs.get('cache') is not None:
+            raise ValueError('caching is not supported by AsyncGFF3Reader')
+        self._reader = GFF3Reader(instream=iter([]), **kwargs)
+        self.stats = self._reader.stats
+
+    def __aiter__(self):
+        return self._parse()
+
+    async def _batches(self, loop):
+        if hasattr(self.instream, '__aiter__'):
+            batch = list()
+            async for line in self.instream:
+                if isinstance(line, bytes):
+                    line = line.decode()
+                batch.append(line)
+                if len(batch) == self.batchsize:
+                    yield batch
+                    batch = list()
+            if batch:
+                yield batch
+            return
+
+        instream = self.instream
+        if instream is None:
+            instream = await loop.run_in_executor(
+                self.executor, tag.open, self.infilename, 'r'
+            )
+        lineiter = iter(instream)
+        try:
+            while True:
+                batch = await loop.run_in_executor(
+                    self.executor, _readbatch, lineiter, self.batchsize
+                )
+                if len(batch) == 0:
+                    break
+                yield batch
+        finally:
+            if self.instream is None:
+                instream.close()
+
+    async def _parse(self):
+        loop = asyncio.get_running_loop()
+        reader = self._reader
+        stats = reader.stats
+        reader._start()
+        if self.infilename is not None and reader._flushes_early():
+            await loop.run_in_executor(
+                self.executor, reader._hoist_directives, self.infilename
+            )
+        try:
+            async for batch in self._batches(loop):
+                stats.lines += len(batch)
+                stats.bytes += sum(len(line) for line in batch)
+                for obj in reader._handle_lines(batch):
+                    yield obj
+                await asyncio.sleep(0)
+
+            entries = reader._finish()
+            while True:
+                batch = await loop.run_in_executor(
+                    self.executor, _readbatch, entries, self.batchsize
+                )
+                if len(batch) == 0:
+                    break
+                for obj in batch:
+                    yield obj
+        finally:
+            if reader._spill is not None:
+                reader._spill.close()
+
+
+class AsyncGFF3Writer(object):
+    """
+    Writes sequence features and other GFF3 entries asynchronously.
+
+    The :code:`instream` can be a regular or an asynchronous iterable of GFF3
+    entries, such as an :code:`AsyncGFF3Reader`. Output is formatted
+    :code:`batchsize` entries at a time and written to :code:`outfile`, which
+    can be a file name (or :code:`-` for stdout), a file object, or an
+    :code:`asyncio.StreamWriter`. Writes to files are performed in the given
+    :code:`executor` (the loop's default executor if None).
+
+    The :code:`retainids` and :code:`complex_separators` attributes and the
+    runtime :code:`stats` behave as for :code:`GFF3Writer`.
+    """
+
+    def __init__(self, instream, outfile='-', batchsize=1000, executor=None):
+        self._instream = instream
+        self.outfile = outfile
+        self.batchsize = batchsize
+        self.executor = executor
+        self._buffer = StringIO()
+        self._writer = GFF3Writer(None, outfile=self._buffer)
+        self._writer._out = self._buffer
+        self.stats = self._writer.stats
+
+    @property
+    def retainids(self):
+        return self._writer.retainids
+
+    @retainids.setter
+    def retainids(self, value):
+        self._writer.retainids = value
+
+    @property
+    def complex_separators(self):
+        return self._writer.complex_separators
+
+    @complex_separators.setter
+    def complex_separators(self, value):
+        self._writer.complex_separators = value
+
+    async def _entries(self):
+        if hasattr(self._instream, '__aiter__'):
+            async for entry in self._instream:
+                yield entry
+        else:
+            for entry in self._instream:
+                yield entry
+
+    async def write(self, blockitvl=0):
+        """Pull entries from the instream and write them to the output."""
+        loop = asyncio.get_running_loop()
+        outfile = self.outfile
+        if outfile == '-':
+            outfile = sys.stdout
+        elif isinstance(outfile, str):
+            outfile = await loop.run_in_executor(
+                self.executor, tag.open, outfile, 'w'
+            )
+
+        async def flush():
+            data = self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            if hasattr(outfile, 'drain'):
+                outfile.write(data.encode())
+                await outfile.drain()
+            else:
+                await loop.run_in_executor(self.executor, outfile.write, data)
+
+        starttime = loop.time()
+        try:
+            self._writer._print(repr(tag.Directive('##gff-version 3')))
+            count = 0
+            async for entry in self._entries():
+                self._writer._write_entry(entry, blockitvl)
+                count += 1
+                if count == self.batchsize:
+                    await flush()
+                    count = 0
+            await flush()
+        finally:
+            if isinstance(self.outfile, str) and self.outfile != '-':
+                await loop.run_in_executor(self.executor, outfile.close)
+        self.stats.seconds += loop.time() - starttime
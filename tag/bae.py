@@ -10,6 +10,7 @@
 from __future__ import division
 from collections import defaultdict
 import tag
+from tag.stages import timed
 
 
 def encodes_cds(feature):
@@ -49,6 +50,7 @@ def collapse_locus(features):
         yield feature
 
 
+@timed('collapse_stream')
 def collapse_stream(locusstream):
     """Feature stream for collapsing bacterial annotation data."""
     for seqid, interval, locus in locusstream:
@@ -108,6 +110,7 @@ def eval_locus(features):
         feature.add_attribute('protein_coverage', prot_coverage)
 
 
+@timed('eval_stream')
 def eval_stream(locusstream):
     """Feature stream for bacterial annotation evaluation."""
     for seqid, interval, locus in locusstream:
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import gc
+import hashlib
+import marshal
+import os
+import struct
+import tempfile
+import tag
+from tag.comment import Comment
+from tag.directive import Directive
+from tag.feature import Feature
+from tag.range import Range
+from tag.score import Score
+from tag.sequence import Sequence
+
+
+FORMAT_VERSION = 2
+BLOCK_SIZE = 1000
+
+
+def default_cache_dir():
+    """Cache location: :code:`$TAG_CACHE_DIR`, or :code:`~/.cache/tag`."""
+    if 'TAG_CACHE_DIR' in os.environ:
+        return os.environ['TAG_CACHE_DIR']
+    return os.path.join(os.path.expanduser('~'), '.cache', 'tag')
+
+
+def file_digest(filename, blocksize=1 << 20):
+    """Compute the SHA-1 digest of a file's contents."""
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as fh:
+        for block in iter(lambda: fh.read(blocksize), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _encode_feature(feature):
+    """
+    Encode a feature graph as a tuple of primitive values.
+
+    Every feature reachable from the given feature (children, multi-feature
+    siblings and representatives, and pseudo-feature parents) is encoded as a
+    node, with graph edges recorded as node indices.
+    """
+    nodes = [feature]
+    index = {feature: 0}
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        linked = list(node.children or [])
+        linked.extend(node.siblings or [])
+        if node.multi_rep is not None:
+            linked.append(node.multi_rep)
+        for other in linked:
+            if other not in index:
+                index[other] = len(nodes)
+                nodes.append(other)
+        i += 1
+
+    encoded = list()
+    for node in nodes:
+        children = None
+        if node.children is not None:
+            children = tuple(index[c] for c in node.children)
+        siblings = None
+        if node.siblings is not None:
+            siblings = tuple(index[s] for s in node.siblings)
+        multirep = -1 if node.multi_rep is None else index[node.multi_rep]
+        encoded.append((
+            node._seqid, node._source, node._type, node._range._start,
+            node._range._end, node._score.value, node._strand, node._phase,
+            node._attrs, children, siblings, multirep, node._pseudo,
+        ))
+    return tuple(encoded)
+
+
+def _decode_feature(encoded):
+    nodes = list()
+    for values in encoded:
+        node = Feature.__new__(Feature)
+        node._seqid, node._source, node._type = values[0:3]
+        node._range = Range.unchecked(values[3], values[4])
+        node._score = Score(values[5])
+        node._strand, node._phase, node._attrs = values[6:9]
+        node._pseudo = values[12]
+        nodes.append(node)
+    for node, values in zip(nodes, encoded):
+        children, siblings, multirep = values[9:12]
+        node.children = None
+        if children is not None:
+            node.children = [nodes[i] for i in children]
+        node.siblings = None
+        if siblings is not None:
+            node.siblings = [nodes[i] for i in siblings]
+        node.multi_rep = None if multirep == -1 else nodes[multirep]
+    return nodes[0]
+
+
+def encode(entry):
+    """Encode a GFF3 entry as a tuple of primitive values."""
+    if isinstance(entry, Feature):
+        return ('F', _encode_feature(entry))
+    elif isinstance(entry, Directive):
+        return ('D', entry._rawdata)
+    elif isinstance(entry, Comment):
+        return ('C', entry._rawdata)
+    elif isinstance(entry, Sequence):
+        return ('S', entry.defline, entry.seq)
+    raise ValueError('cannot encode entry of type {}'.format(type(entry)))
+
+
+def decode(record):
+    """Create a GFF3 entry from its encoded representation."""
+    kind = record[0]
+    if kind == 'F':
+        return _decode_feature(record[1])
+    elif kind == 'D':
+        return Directive(record[1])
+    elif kind == 'C':
+        return Comment(record[1])
+    elif kind == 'S':
+        return Sequence(record[1], record[2])
+    raise ValueError('invalid cache record type "{}"'.format(kind))
+
+
+def _write_block(fh, block):
+    data = marshal.dumps(block)
+    fh.write(struct.pack('<Q', len(data)))
+    fh.write(data)
+
+
+def _read_block(fh):
+    size, = struct.unpack('<Q', fh.read(8))
+    return marshal.loads(fh.read(size))
+
+
+def _encode_reader(reader):
+    """Encode the statistics and sequence regions of a reader."""
+    declared = dict(
+        (seqid, region._rawdata)
+        for seqid, region in reader.regions.declared.items()
+    )
+    inferred = dict(
+        (seqid, (rng._start, rng._end))
+        for seqid, rng in reader.regions.inferred.items()
+    )
+    return (reader.stats.asdict(), declared, inferred)
+
+
+def _decode_reader(record, reader):
+    stats, declared, inferred = record
+    for attr, value in stats.items():
+        setattr(reader.stats, attr, value)
+    for seqid, rawdata in declared.items():
+        reader.regions.declared[seqid] = Directive(rawdata)
+    for seqid, (start, end) in inferred.items():
+        reader.regions.inferred[seqid] = Range(start, end)
+
+
+class AnnotationCache(object):
+    """
+    On-disk cache of parsed GFF3 data.
+
+    The cache stores the resolved and sorted entry stream produced by
+    :code:`GFF3Reader`, so that subsequent reads of an unchanged file can skip
+    parsing and ID/Parent resolution entirely. Cache entries are keyed by the
+    file's path, size, modification time, and content hash, along with any
+    reader settings that affect the entry stream.
+
+    Entries are stored as blocks of primitive values serialized with
+    :code:`marshal`, and are streamed back out block by block. The reader's
+    statistics and sequence regions are stored at the end of the file, and
+    are restored before any entries are loaded, without opening the input
+    file. When the total size of the cache exceeds :code:`maxsize` bytes,
+    the least recently used entries are evicted.
+
+    To use the cache, pass it to the reader.
+
+    >>> import tempfile
+    >>> cache = AnnotationCache(cachedir=tempfile.mkdtemp())
+    >>> infile = tag.tests.data_file('grape-cpgat.gff3')
+    >>> reader = tag.GFF3Reader(infilename=infile, cache=cache)
+    >>> len(list(reader))  # parse the file and populate the cache
+    5
+    >>> reader = tag.GFF3Reader(infilename=infile, cache=cache)
+    >>> len(list(reader))  # load the cached entries
+    5
+    >>> cache.hits, cache.misses
+    (1, 1)
+    """
+
+    def __init__(self, cachedir=None, maxsize=1 << 30):
+        self.cachedir = cachedir or default_cache_dir()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.cachedir):
+            os.makedirs(self.cachedir)
+
+    def key(self, infilename, options=()):
+        """Compute the cache key for the given file and reader settings."""
+        path = os.path.abspath(infilename)
+        stat = os.stat(path)
+        data = '\t'.join([
+            str(FORMAT_VERSION), path, str(stat.st_size),
+            str(stat.st_mtime_ns), file_digest(path), repr(options),
+        ])
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cachedir, key + '.tagc')
+
+    def entries(self, reader):
+        """
+        Yield the entries for the given reader, from the cache if possible.
+
+        On a cache miss, the reader's entries are parsed as usual and stored
+        in the cache as they are yielded.
+        """
+        options = (reader.assumesorted, reader.strict, reader.checkorder,
+                   reader.trusted)
+        key = self.key(reader.infilename, options=options)
+        cachefile = self.path(key)
+        if os.path.exists(cachefile):
+            self.hits += 1
+            os.utime(cachefile, None)
+            for entry in self.load(cachefile, reader=reader):
+                yield entry
+            return
+
+        self.misses += 1
+        for entry in self.store(cachefile, reader._parse(), reader=reader):
+            yield entry
+        self.evict()
+
+    def load(self, cachefile, reader=None):
+        """
+        Stream entries out of a cache file.
+
+        If a :code:`reader` is provided, its statistics and sequence regions
+        are restored first.
+        """
+        with open(cachefile, 'rb') as fh:
+            header = _read_block(fh)
+            if header != ('tag-cache', FORMAT_VERSION):
+                raise ValueError('invalid cache file ' + cachefile)
+            if reader is not None:
+                start = fh.tell()
+                fh.seek(-8, os.SEEK_END)
+                offset, = struct.unpack('<Q', fh.read(8))
+                fh.seek(offset)
+                metadata = _read_block(fh)
+                if metadata is not None:
+                    _decode_reader(metadata, reader)
+                fh.seek(start)
+            while True:
+                # Decoding creates many small container objects at once, which
+                # would otherwise trigger repeated, fruitless garbage
+                # collection passes.
+                gcenabled = gc.isenabled()
+                gc.disable()
+                try:
+                    block = _read_block(fh)
+                    if block is not None:
+                        entries = [decode(record) for record in block]
+                finally:
+                    if gcenabled:
+                        gc.enable()
+                if block is None:
+                    break
+                for entry in entries:
+                    yield entry
+
+    def store(self, cachefile, entrystream, reader=None):
+        """
+        Pass entries through while writing them to a cache file.
+
+        Entries are encoded before they are yielded, so downstream
+        modifications do not affect the cached data. The cache file is only
+        created once the entry stream has been consumed completely, at which
+        point the statistics and sequence regions of the :code:`reader` that
+        produced the entries are stored, followed by their offset.
+        """
+        fd, tmpname = tempfile.mkstemp(dir=self.cachedir, suffix='.tmp')
+        complete = False
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                _write_block(fh, ('tag-cache', FORMAT_VERSION))
+                block = list()
+                for entry in entrystream:
+                    block.append(encode(entry))
+                    if len(block) == BLOCK_SIZE:
+                        _write_block(fh, tuple(block))
+                        block = list()
+                    yield entry
+                if len(block) > 0:
+                    _write_block(fh, tuple(block))
+                _write_block(fh, None)
+                offset = fh.tell()
+                metadata = None if reader is None else _encode_reader(reader)
+                _write_block(fh, metadata)
+                fh.write(struct.pack('<Q', offset))
+            os.replace(tmpname, cachefile)
+            complete = True
+        finally:
+            if not complete:
+                os.remove(tmpname)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits."""
+        cachefiles = list()
+        for filename in os.listdir(self.cachedir):
+            if filename.endswith('.tagc'):
+                stat = os.stat(os.path.join(self.cachedir, filename))
+                cachefiles.append((stat.st_mtime, filename, stat.st_size))
+        cachefiles.sort()
+        total = sum([size for mtime, filename, size in cachefiles])
+        for mtime, filename, size in cachefiles:
+            if total <= self.maxsize:
+                break
+            os.remove(os.path.join(self.cachedir, filename))
+            total -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for filename in os.listdir(self.cachedir):
+            if filename.endswith('.tagc'):
+                os.remove(os.path.join(self.cachedir, filename))
@@ -12,36 +12,57 @@ import sys
 import tag
 from . import bae
 from . import bcollapse
+from . import closest
+from . import diff
 from . import gff3
+from . import intersect
 from . import locuspocus
 from . import merge
 from . import occ
 from . import pep2nuc
 from . import pmrna
+from . import serve
+from . import split
 from . import sum
+from . import synth
+from . import validate
 
 subparser_funcs = {
     'bae': bae.subparser,
     'bcollapse': bcollapse.subparser,
+    'closest': closest.subparser,
+    'diff': diff.subparser,
     'gff3': gff3.subparser,
+    'intersect': intersect.subparser,
     'locuspocus': locuspocus.subparser,
     'merge': merge.subparser,
     'occ': occ.subparser,
     'pep2nuc': pep2nuc.subparser,
     'pmrna': pmrna.subparser,
+    'serve': serve.subparser,
+    'split': split.subparser,
     'sum': sum.subparser,
+    'synth': synth.subparser,
+    'validate': validate.subparser,
 }
 
 mains = {
     'bae': bae.main,
     'bcollapse': bcollapse.main,
+    'closest': closest.main,
+    'diff': diff.main,
     'gff3': gff3.main,
+    'intersect': intersect.main,
     'locuspocus': locuspocus.main,
     'merge': merge.main,
     'occ': occ.main,
     'pmrna': pmrna.main,
     'pep2nuc': pep2nuc.main,
+    'serve': serve.main,
+    'split': split.main,
     'sum': sum.main,
+    'synth': synth.main,
+    'validate': validate.main,
 }
 
 
@@ -50,6 +71,11 @@ def parser():
     parser = argparse.ArgumentParser()
     parser.add_argument('-v', '--version', action='version',
                         version='tag v{}'.format(tag.__version__))
+    parser.add_argument('--profile', metavar='FILE', help='profile the '
+                        'command with cProfile and write stats to FILE')
+    parser.add_argument('--time-stages', action='store_true', help='report '
+                        'wall time, CPU time, and peak memory for each '
+                        'processing stage in the terminal (stderr)')
     subparsers = parser.add_subparsers(dest='cmd', metavar='cmd',
                                        help=subcmdstr)
     for subcmd, parserfunc in subparser_funcs.items():
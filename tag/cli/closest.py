@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import argparse
+import tag
+from tag import GFF3Reader
+
+
+def subparser(subparsers):
+    subparser = subparsers.add_parser('closest')
+    subparser.add_argument(
+        '-o', '--out', metavar='FILE', help='write output in GFF3 to FILE; '
+        'default is terminal (stdout)'
+    )
+    subparser.add_argument(
+        '-k', '--num', metavar='K', type=int, default=1, help='report the K '
+        'closest features of B for each feature of A; by default K=1'
+    )
+    subparser.add_argument(
+        '-s', '--same-strand', action='store_true', help='only report '
+        'features of B on the same strand as the feature of A'
+    )
+    subparser.add_argument(
+        '-D', '--direction', choices=['upstream', 'downstream'], help='only '
+        'report features of B (other than overlapping features) upstream or '
+        'downstream of the feature of A; relative to the strand of the '
+        'feature of A with --same-strand, otherwise to the reference'
+    )
+    subparser.add_argument(
+        '-a', '--a-type', metavar='TYPE', help='report closest features for '
+        'features of type TYPE from A; by default, for top-level features'
+    )
+    subparser.add_argument(
+        '-b', '--b-type', metavar='TYPE', help='report features of type TYPE '
+        'from B; by default, top-level features are reported'
+    )
+    subparser.add_argument(
+        '-i', '--id-attr', metavar='KEY', default='ID', help='identify '
+        'features of B by attribute KEY, or by location if they have none; '
+        'default is "ID"'
+    )
+    subparser.add_argument(
+        '-c', '--check-sorted', action='store_true', help='verify that the '
+        'features in each input file are sorted'
+    )
+    subparser.add_argument(
+        '-r', '--relax', action='store_false', default=True, dest='strict',
+        help='relax parsing stringency'
+    )
+    subparser.add_argument(
+        'a', metavar='A', help='sorted input file in GFF3 format'
+    )
+    subparser.add_argument(
+        'b', metavar='B', help='sorted input file in GFF3 format'
+    )
+
+
+def label(feature, attribute):
+    value = feature.get_attribute(attribute, as_string=True)
+    if value is None:
+        value = '{}:{}-{}'.format(feature.seqid, feature.start + 1,
+                                  feature.end)
+    return value
+
+
+def report(results, attribute):
+    """Record the closest features in "closest" and "closest_distance"."""
+    for feature, neighbors in results:
+        if neighbors:
+            # Values are stored as one string to keep them paired and ordered
+            labels = [label(other, attribute) for other, d in neighbors]
+            distances = [str(distance) for o, distance in neighbors]
+            feature.add_attribute('closest', ','.join(labels))
+            feature.add_attribute('closest_distance', ','.join(distances))
+        yield feature
+
+
+def main(args):
+    astream = GFF3Reader(
+        infilename=args.a, strict=args.strict, assumesorted=True
+    )
+    bstream = GFF3Reader(
+        infilename=args.b, strict=args.strict, assumesorted=True
+    )
+    results = tag.sweep.closest(
+        astream, bstream, k=args.num, strand=args.same_strand,
+        direction=args.direction, atype=args.a_type, btype=args.b_type,
+        validate=args.check_sorted,
+    )
+    writer = tag.writer.GFF3Writer(report(results, args.id_attr), args.out)
+    writer.retainids = True
+    writer.write()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+from __future__ import print_function
+import argparse
+from collections import OrderedDict
+import tag
+from tag import GFF3Reader, GFF3Writer
+
+
+STATUSES = ('unchanged', 'changed', 'added', 'removed')
+
+
+def subparser(subparsers):
+    subparser = subparsers.add_parser('diff')
+    subparser.add_argument(
+        '-d', '--details', metavar='FILE', help='write each added, removed, '
+        'or changed feature graph to FILE in GFF3, with its status in a '
+        '"diff" attribute; changed graphs are written as in NEW'
+    )
+    subparser.add_argument(
+        '-i', '--ignore', metavar='KEY', action='append', default=list(),
+        help='ignore attribute KEY when comparing feature graphs, in '
+        'addition to ID and Parent; can be specified multiple times'
+    )
+    subparser.add_argument(
+        '-c', '--check-sorted', action='store_true', help='verify that the '
+        'features in each input file are sorted'
+    )
+    subparser.add_argument(
+        '-r', '--relax', action='store_false', default=True, dest='strict',
+        help='relax parsing stringency'
+    )
+    subparser.add_argument(
+        'old', metavar='OLD', help='sorted input file in GFF3 format'
+    )
+    subparser.add_argument(
+        'new', metavar='NEW', help='sorted input file in GFF3 format'
+    )
+
+
+def tally(results, counts):
+    """Count results by sequence ID, yielding only the differences."""
+    for status, old, new in results:
+        feature = old if new is None else new
+        if feature.seqid not in counts:
+            counts[feature.seqid] = dict((s, 0) for s in STATUSES)
+        counts[feature.seqid][status] += 1
+        if status == 'unchanged':
+            continue
+        feature.add_attribute('diff', status)
+        yield feature
+
+
+def main(args):
+    oldstream = GFF3Reader(
+        infilename=args.old, strict=args.strict, assumesorted=True
+    )
+    newstream = GFF3Reader(
+        infilename=args.new, strict=args.strict, assumesorted=True
+    )
+    ignore = ('ID', 'Parent') + tuple(args.ignore)
+    results = tag.sweep.diff(
+        oldstream, newstream, ignore=ignore, validate=args.check_sorted
+    )
+    counts = OrderedDict()
+    differences = tally(results, counts)
+    if args.details:
+        writer = GFF3Writer(differences, args.details)
+        writer.retainids = True
+        writer.write()
+    else:
+        for _ in differences:
+            pass
+
+    print('seqid', *STATUSES, sep='\t')
+    totals = dict((s, 0) for s in STATUSES)
+    for seqid, seqcounts in counts.items():
+        print(seqid, *[seqcounts[s] for s in STATUSES], sep='\t')
+        for status in STATUSES:
+            totals[status] += seqcounts[status]
+    print('total', *[totals[s] for s in STATUSES], sep='\t')
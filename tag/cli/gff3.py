@@ -9,6 +9,7 @@
 
 import argparse
 import tag
+from tag.cli.split import size
 
 
 def subparser(subparsers):
@@ -33,13 +34,39 @@ def subparser(subparsers):
         '-s', '--sorted', action='store_true', help='assume the input data is '
         'sorted'
     )
+    subparser.add_argument(
+        '-t', '--trusted', action='store_true', help='skip validation of '
+        'input data known to be valid, such as previous output of "tag gff3"'
+    )
+    subparser.add_argument(
+        '--cache', metavar='DIR', help='cache parsed input in DIR to '
+        'speed up subsequent runs on the same unchanged input'
+    )
+    subparser.add_argument(
+        '--max-records', metavar='N', type=int, help='hold at most N '
+        'feature lines in memory while parsing, spilling the rest to disk'
+    )
+    subparser.add_argument(
+        '--max-memory', metavar='SIZE', type=size, help='limit the '
+        'estimated memory used for parsing to SIZE bytes (suffixes K, M, and '
+        'G are supported), spilling feature lines to disk as needed'
+    )
+    subparser.add_argument(
+        '--temp-dir', metavar='DIR', help='directory for temporary '
+        'files; default is the system temporary directory'
+    )
     subparser.add_argument('gff3', help='input file in GFF3 format')
 
 
 def main(args):
+    cache = None
+    if args.cache:
+        cache = tag.cache.AnnotationCache(cachedir=args.cache)
     reader = tag.reader.GFF3Reader(
         infilename=args.gff3, strict=args.strict, assumesorted=args.sorted,
-        checkorder=not args.no_sort
+        checkorder=not args.no_sort, trusted=args.trusted, cache=cache,
+        max_records=args.max_records, max_memory=args.max_memory,
+        tempdir=args.temp_dir
     )
     writer = tag.writer.GFF3Writer(reader, args.out)
     writer.retainids = args.retain_ids
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import argparse
+import tag
+from tag import GFF3Reader
+
+
+def subparser(subparsers):
+    subparser = subparsers.add_parser('intersect')
+    subparser.add_argument(
+        '-o', '--out', metavar='FILE', help='write output in GFF3 to FILE; '
+        'default is terminal (stdout)'
+    )
+    subparser.add_argument(
+        '-m', '--mode', choices=['overlap', 'nonoverlap', 'count'],
+        default='overlap', help='report features of A that overlap features '
+        'of B ("overlap", the default), features of A that overlap no '
+        'features of B ("nonoverlap"), or all features of A with the number '
+        'of features of B they overlap in an "overlap_count" attribute '
+        '("count")'
+    )
+    subparser.add_argument(
+        '-n', '--min-bp', metavar='N', type=int, default=1, help='only '
+        'consider features overlapping if they overlap by at least N bp; by '
+        'default N=1'
+    )
+    subparser.add_argument(
+        '-p', '--min-perc', metavar='P', type=float, default=0.0,
+        help='only consider features overlapping if they overlap by a '
+        'fraction of at least P of the length of each; by default P=0.0'
+    )
+    subparser.add_argument(
+        '-s', '--same-strand', action='store_true', help='only consider '
+        'features overlapping if they are on the same strand'
+    )
+    subparser.add_argument(
+        '-a', '--a-type', metavar='TYPE', help='compare features of type '
+        'TYPE from A; by default, top-level features are compared'
+    )
+    subparser.add_argument(
+        '-b', '--b-type', metavar='TYPE', help='compare features of type '
+        'TYPE from B; by default, top-level features are compared'
+    )
+    subparser.add_argument(
+        '-c', '--check-sorted', action='store_true', help='verify that the '
+        'features in each input file are sorted'
+    )
+    subparser.add_argument(
+        '-r', '--relax', action='store_false', default=True, dest='strict',
+        help='relax parsing stringency'
+    )
+    subparser.add_argument(
+        'a', metavar='A', help='sorted input file in GFF3 format'
+    )
+    subparser.add_argument(
+        'b', metavar='B', help='sorted input file in GFF3 format'
+    )
+
+
+def report(intersection, mode):
+    for feature, overlaps in intersection:
+        if mode == 'count':
+            feature.add_attribute('overlap_count', str(len(overlaps)))
+            yield feature
+        elif bool(overlaps) == (mode == 'overlap'):
+            yield feature
+
+
+def main(args):
+    astream = GFF3Reader(
+        infilename=args.a, strict=args.strict, assumesorted=True
+    )
+    bstream = GFF3Reader(
+        infilename=args.b, strict=args.strict, assumesorted=True
+    )
+    intersection = tag.sweep.intersect(
+        astream, bstream, minbp=args.min_bp, minperc=args.min_perc,
+        strand=args.same_strand, atype=args.a_type, btype=args.b_type,
+        validate=args.check_sorted,
+    )
+    writer = tag.writer.GFF3Writer(report(intersection, args.mode), args.out)
+    writer.retainids = True
+    writer.write()
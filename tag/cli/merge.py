@@ -23,15 +23,76 @@ def subparser(subparsers):
         help='relax parsing stringency'
     )
     subparser.add_argument(
-        'gff3', nargs='+', help='input files in GFF3 format'
+        '-f', '--file-list', metavar='FILE', help='read input file names '
+        'from FILE, one per line, in addition to any given as arguments'
     )
+    subparser.add_argument(
+        '-n', '--fan-in', metavar='N', type=int, default=64, help='read at '
+        'most N input files at a time; larger numbers of files are merged in '
+        'groups through temporary files; default is 64'
+    )
+    subparser.add_argument(
+        '-c', '--check-sorted', action='store_true', help='verify that the '
+        'features in each input file are sorted'
+    )
+    subparser.add_argument(
+        '--temp-dir', metavar='DIR', help='directory for temporary '
+        'files; default is the system temporary directory'
+    )
+    subparser.add_argument(
+        '-u', '--unique', action='store_true', help='collapse identical '
+        'feature graphs from different input files into a single copy'
+    )
+    subparser.add_argument(
+        '-a', '--origin-attr', metavar='KEY', default='merged_from',
+        help='with --unique, record the names of the input files containing '
+        'each feature in attribute KEY; default is "merged_from"'
+    )
+    subparser.add_argument(
+        'gff3', nargs='*', help='input files in GFF3 format'
+    )
+
+
+def read_file_list(filename):
+    """Read file names from a file, ignoring blank lines and comments."""
+    with tag.open(filename, 'r') as instream:
+        for line in instream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+
+def lazy_reader(infilename, strict=True, validate=False, origin=None):
+    """Open and parse the input file only once the first entry is needed."""
+    reader = GFF3Reader(
+        infilename=infilename, strict=strict, assumesorted=True
+    )
+    entries = reader
+    if validate:
+        entries = tag.select.check_sorted(entries, label=infilename)
+    if origin is not None:
+        entries = tag.select.label_features(entries, origin, infilename)
+    for entry in entries:
+        yield entry
+    reader.instream.close()
 
 
 def main(args):
+    infiles = list(args.gff3)
+    if args.file_list:
+        infiles.extend(read_file_list(args.file_list))
+    if len(infiles) == 0:
+        raise ValueError('no input files provided')
+    origin = args.origin_attr if args.unique else None
     instreams = [
-        GFF3Reader(infilename=fn, strict=args.strict, assumesorted=True)
-        for fn in args.gff3
+        lazy_reader(fn, strict=args.strict, validate=args.check_sorted,
+                    origin=origin)
+        for fn in infiles
     ]
-    merger = tag.select.merge(*instreams)
+    merger = tag.select.merge(
+        *instreams, fanin=args.fan_in, tempdir=args.temp_dir
+    )
+    if args.unique:
+        merger = tag.select.collapse_duplicates(merger, attribute=origin)
     writer = tag.writer.GFF3Writer(merger, args.out)
     writer.write()
@@ -18,10 +18,24 @@ def subparser(subparsers):
     subparser = subparsers.add_parser('pmrna')
     subparser.add_argument('-r', '--relax', action='store_false', default=True,
                            dest='strict', help='relax parsing stringency')
+    subparser.add_argument('-s', '--sorted', action='store_true',
+                           help='assume the input data is sorted, and stream '
+                           'genes through rather than loading the entire '
+                           'file into memory')
+    subparser.add_argument('-p', '--processes', metavar='N', type=int,
+                           default=None, help='select isoforms in N worker '
+                           'processes')
+    subparser.add_argument('-c', '--chunk-size', metavar='C', type=int,
+                           default=100, help='with --processes, send genes to '
+                           'worker processes in chunks of C; default is 100')
     subparser.add_argument('gff3', help='input file')
 
 
 def main(args):
-    reader = tag.GFF3Reader(infilename=args.gff3, strict=args.strict)
-    writer = tag.GFF3Writer(tag.transcript.primary_mrna(reader))
+    reader = tag.GFF3Reader(
+        infilename=args.gff3, strict=args.strict, assumesorted=args.sorted
+    )
+    writer = tag.GFF3Writer(tag.transcript.primary_mrna(
+        reader, processes=args.processes, chunksize=args.chunk_size
+    ))
     writer.write()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+from __future__ import print_function
+import sys
+import tag
+
+
+def subparser(subparsers):
+    subparser = subparsers.add_parser('serve')
+    subparser.add_argument(
+        '-H', '--host', metavar='HOST', default='127.0.0.1', help='address '
+        'on which to listen; default is 127.0.0.1'
+    )
+    subparser.add_argument(
+        '-p', '--port', type=int, metavar='PORT', default=8000, help='port '
+        'on which to listen; default is 8000'
+    )
+    subparser.add_argument(
+        '-t', '--threads', type=int, metavar='T', default=8, help='number of '
+        'worker threads; default is 8'
+    )
+    subparser.add_argument(
+        '-a', '--attribute', metavar='ATTR', default='ID', help='attribute '
+        'by which features are indexed for lookup by name; default is ID'
+    )
+    subparser.add_argument(
+        '-c', '--cache-size', type=int, metavar='N', default=0, help='cache '
+        'the results of up to N distinct region queries; default is 0 (no '
+        'caching)'
+    )
+    subparser.add_argument(
+        '-r', '--relax', action='store_false', default=True, dest='strict',
+        help='relax parsing stringency'
+    )
+    subparser.add_argument(
+        '-V', '--verbose', action='store_true', help='log each request in '
+        'the terminal (stderr)'
+    )
+    subparser.add_argument(
+        'gff3', nargs='+', help='input file(s) in GFF3 format'
+    )
+
+
+def build_server(args):
+    service = tag.server.AnnotationService(
+        attribute=args.attribute, cachesize=args.cache_size
+    )
+    for infile in args.gff3:
+        service.load(infile, strict=args.strict)
+    return tag.server.AnnotationServer(
+        service, host=args.host, port=args.port, threads=args.threads,
+        verbose=args.verbose,
+    )
+
+
+def main(args):
+    server = build_server(args)
+    host, port = server.server_address[:2]
+    print('[tag::serve] listening on http://{}:{}'.format(host, port),
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import argparse
+import tag
+
+
+SIZE_SUFFIXES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def size(value):
+    """Parse a size in bytes, with an optional K, M, or G suffix."""
+    multiplier = 1
+    suffix = value[-1:].upper()
+    if suffix in SIZE_SUFFIXES:
+        value, multiplier = value[:-1], SIZE_SUFFIXES[suffix]
+    try:
+        result = int(float(value) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid size "{}"'.format(value))
+    if result < 1:
+        raise argparse.ArgumentTypeError('size must be positive')
+    return result
+
+
+def max_open_files():
+    """Default limit on open output files, well below the process limit."""
+    try:
+        import resource
+        softlimit, hardlimit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, ValueError):  # pragma: no cover
+        return 64
+    if softlimit == resource.RLIM_INFINITY:  # pragma: no cover
+        return 256
+    return max(1, min(256, softlimit // 2))
+
+
+def subparser(subparsers):
+    subparser = subparsers.add_parser('split')
+    subparser.add_argument(
+        '-o', '--out', metavar='PATTERN', default='{}.gff3', help='write '
+        'output to files named by replacing "{}" in PATTERN with the '
+        'sequence ID, feature type, or chunk number; files ending in .gz, '
+        '.bz2, .xz, or .zst are compressed, and files ending in .bgz are '
+        'written in BGZF format; default is "{}.gff3"'
+    )
+    mode = subparser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '-b', '--by', choices=['seqid', 'type'], default='seqid',
+        help='split by the sequence ID (the default) or the type of each '
+        'top-level feature'
+    )
+    mode.add_argument(
+        '-n', '--count', metavar='N', type=int, help='split into chunks of N '
+        'top-level features'
+    )
+    mode.add_argument(
+        '-z', '--size', metavar='SIZE', type=size, help='split into chunks '
+        'of approximately SIZE bytes (before compression), such as 500K or '
+        '2M; chunks are only cut between feature graphs'
+    )
+    subparser.add_argument(
+        '-m', '--max-open', metavar='M', type=int, default=None, help='keep '
+        'at most M output files open at a time; by default, half of the '
+        'open file limit, up to 256'
+    )
+    subparser.add_argument(
+        '-s', '--sorted', action='store_true', help='assume the input data '
+        'is sorted, and stream features through rather than loading the '
+        'entire file into memory'
+    )
+    subparser.add_argument(
+        '-r', '--relax', action='store_false', default=True, dest='strict',
+        help='relax parsing stringency'
+    )
+    subparser.add_argument('gff3', help='input file in GFF3 format')
+
+
+def main(args):
+    by, chunksize = args.by, None
+    if args.count:
+        by, chunksize = 'count', args.count
+    elif args.size:
+        by, chunksize = 'size', args.size
+    maxopen = args.max_open or max_open_files()
+    reader = tag.GFF3Reader(
+        infilename=args.gff3, strict=args.strict, assumesorted=args.sorted
+    )
+    writer = tag.writer.GFF3SplitWriter(
+        reader, args.out, by=by, chunksize=chunksize, maxopen=maxopen
+    )
+    writer.write()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import sys
+import tag
+
+
+def subparser(subparsers):
+    subparser = subparsers.add_parser('synth')
+    subparser.add_argument(
+        '-o', '--out', metavar='FILE', default='-', help='write output in '
+        'GFF3 format to FILE; default is terminal (stdout)'
+    )
+    subparser.add_argument(
+        '-n', '--seqs', type=int, metavar='N', default=1, help='number of '
+        'sequences; default is 1'
+    )
+    subparser.add_argument(
+        '-l', '--seq-length', type=int, metavar='L', default=1000000,
+        help='length of each sequence; default is 1000000'
+    )
+    subparser.add_argument(
+        '-d', '--density', type=float, metavar='D', default=100, help='genes '
+        'per Mb; default is 100'
+    )
+    subparser.add_argument(
+        '-i', '--isoforms', type=int, metavar='I', default=3, help='maximum '
+        'number of mRNAs per gene; default is 3'
+    )
+    subparser.add_argument(
+        '-e', '--exons', type=int, metavar='E', default=6, help='maximum '
+        'number of exons per mRNA; default is 6'
+    )
+    subparser.add_argument(
+        '-m', '--matches', type=float, metavar='M', default=10, help='cDNA '
+        'alignments per Mb; default is 10'
+    )
+    subparser.add_argument(
+        '-p', '--overlap', type=float, metavar='P', default=0.05,
+        help='probability that a gene overlaps the previous gene; default is '
+        '0.05'
+    )
+    subparser.add_argument(
+        '-u', '--shuffle', type=int, metavar='W', default=0, help='shuffle '
+        'feature graphs within windows of W graphs, and lines within each '
+        'feature graph; default is 0 (sorted output)'
+    )
+    subparser.add_argument(
+        '-c', '--single-cds', action='store_false', dest='multicds',
+        help='write CDS segments as independent features rather than as a '
+        'multi-feature'
+    )
+    subparser.add_argument(
+        '-x', '--no-separators', action='store_false', dest='separators',
+        help='do not print ### separators between feature graphs'
+    )
+    subparser.add_argument(
+        '-f', '--fasta', action='store_true', help='include random genomic '
+        'sequences in a ##FASTA section'
+    )
+    subparser.add_argument(
+        '-s', '--seed', type=int, metavar='S', default=42, help='random seed; '
+        'default is 42'
+    )
+
+
+def main(args):
+    synth = tag.synth.GenomeSynthesizer(
+        seqs=args.seqs, seqlen=args.seq_length, density=args.density,
+        isoforms=args.isoforms, exons=args.exons, multicds=args.multicds,
+        matches=args.matches, overlap=args.overlap, shuffle=args.shuffle,
+        separators=args.separators, fasta=args.fasta, seed=args.seed,
+    )
+    if args.out == '-':
+        synth.write(sys.stdout)
+    else:
+        with tag.open(args.out, 'w') as outstream:
+            synth.write(outstream)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+from __future__ import print_function
+import sys
+import tag
+
+
+def subparser(subparsers):
+    subparser = subparsers.add_parser('validate')
+    subparser.add_argument(
+        '-o', '--out', metavar='FILE', help='write the list of errors to '
+        'FILE; default is terminal (stdout)'
+    )
+    subparser.add_argument(
+        '-s', '--sorted', action='store_true', help='check that the input '
+        'is sorted, as for "tag gff3 --sorted"'
+    )
+    subparser.add_argument(
+        '-r', '--relax', action='store_false', default=True, dest='strict',
+        help='relax parsing stringency'
+    )
+    subparser.add_argument(
+        '-m', '--max-errors', metavar='N', type=int, default=100, help='stop '
+        'after reporting N errors; set to 0 to report all errors; default is '
+        '100'
+    )
+    subparser.add_argument(
+        '-p', '--processes', metavar='N', type=int, default=None,
+        help='check line syntax in N worker processes'
+    )
+    subparser.add_argument(
+        '-c', '--chunk-size', metavar='C', type=int, default=10000,
+        help='with --processes, send lines to worker processes in chunks of '
+        'C; default is 10000'
+    )
+    subparser.add_argument('gff3', help='input file in GFF3 format')
+
+
+def main(args):
+    outstream = tag.open(args.out, 'w')
+    count = 0
+    with tag.open(args.gff3, 'r') as instream:
+        errors = tag.validate.validate(
+            instream, assumesorted=args.sorted, strict=args.strict,
+            maxerrors=args.max_errors, processes=args.processes,
+            chunksize=args.chunk_size,
+        )
+        for lineno, message in errors:
+            print('{}:{}: {}'.format(args.gff3, lineno, message),
+                  file=outstream)
+            count += 1
+    if args.out:
+        outstream.close()
+    if count > 0:
+        if args.max_errors and count >= args.max_errors:
+            print('[tag::validate] stopped after', count, 'errors',
+                  file=sys.stderr)
+        sys.exit(1)
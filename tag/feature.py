@@ -42,9 +42,24 @@ class Feature(object):
     """
 
     @staticmethod
-    def from_gff3(data):
+    def from_gff3(data, trusted=False, symbols=None):
+        """
+        Create a feature from a line of GFF3.
+
+        If a symbol table (see :code:`tag.reader.SymbolTable`) is provided,
+        the seqid, source, type, and attribute keys (and optionally attribute
+        values) are replaced by canonical string objects from the table.
+        """
         fields = data.split('\t')
-        assert len(fields) == 9
+        assert len(fields) == 9, \
+            'expected 9 tab-separated columns, found {}'.format(len(fields))
+        if symbols is not None:
+            intern = symbols.intern
+            fields[0] = intern(fields[0])
+            fields[1] = intern(fields[1])
+            fields[2] = intern(fields[2])
+        if trusted:
+            return Feature._from_trusted_fields(fields, symbols=symbols)
         if fields[6] not in ['+', '-', '.']:
             raise ValueError('invalid strand "{}"'.format(fields[6]))
         if fields[7] not in ['0', '1', '2', '.']:
@@ -54,8 +69,32 @@ class Feature(object):
         feat = Feature(
             fields[0], fields[2], int(fields[3]) - 1, int(fields[4]),
             source=fields[1], score=Score.from_str(fields[5]),
-            strand=fields[6], phase=phase, attrstr=fields[8]
+            strand=fields[6], phase=phase
         )
+        feat._attrs = feat.parse_attributes(fields[8], symbols=symbols)
+        return feat
+
+    @staticmethod
+    def _from_trusted_fields(fields, symbols=None):
+        """
+        Unchecked constructor for pre-validated GFF3 data.
+
+        Skips the strand, phase, and coordinate validation performed by the
+        default constructor.
+        """
+        feat = Feature.__new__(Feature)
+        feat._seqid = fields[0]
+        feat._source = fields[1]
+        feat._type = fields[2]
+        feat._range = Range.unchecked(int(fields[3]) - 1, int(fields[4]))
+        feat._score = Score.from_str(fields[5])
+        feat._strand = fields[6]
+        feat._phase = None if fields[7] == '.' else int(fields[7])
+        feat._attrs = feat.parse_attributes(fields[8], symbols=symbols)
+        feat.children = None
+        feat.multi_rep = None
+        feat.siblings = None
+        feat._pseudo = False
         return feat
 
     def __init__(self, seqid, ftype, start, end, source='tag', score=None,
@@ -489,12 +528,13 @@ class Feature(object):
         """Return a list of all this feature's attribute keys."""
         return sorted(list(self._attrs))
 
-    def parse_attributes(self, attrstring):
+    def parse_attributes(self, attrstring, symbols=None):
         """
         Parse an attribute string.
 
         Given a string with semicolon-separated key-value pairs, populate a
-        dictionary with the given attributes.
+        dictionary with the given attributes. If a symbol table is provided,
+        attribute keys and (as configured by the table) values are interned.
         """
         if attrstring in [None, '', '.']:
             return dict()
@@ -505,11 +545,15 @@ class Feature(object):
             if kvp == '':
                 continue
             key, value = kvp.split('=')
+            if symbols is not None:
+                key = symbols.intern(key)
             if key == 'ID':
                 assert ',' not in value
                 attributes[key] = value
                 continue
             values = value.split(',')
+            if symbols is not None and symbols.interns_values(key):
+                values = [symbols.intern(v) for v in values]
             valdict = dict((val, True) for val in values)
             attributes[key] = valdict
         return attributes
@@ -0,0 +1,683 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+"""
+Threaded reading and writing of compressed text files, and memory-mapped
+reading of large plain text files.
+
+Decompression and compression run in background threads, overlapping with
+parsing and formatting in the calling thread. The zlib, bz2, and lzma
+libraries release the GIL while they work, so on multi-core machines
+throughput on compressed files approaches that on plain text files.
+
+The :code:`CompressedReader` decompresses in a background thread into a
+bounded queue of decoded text blocks, and yields lines from those blocks.
+Files with multiple compressed members or frames (including BGZF files) are
+supported. The :code:`CompressedWriter` hands formatted chunks to a
+compression thread; the :code:`GzipWriter` can instead use a small pool of
+threads to write BGZF blocks, which can be compressed independently of one
+another.
+
+Compression formats are registered as codecs (see :code:`Codec` and
+:code:`register_codec`). When :code:`tag.open` reads a file, its format is
+detected from the magic bytes at the start of the file regardless of the
+file name, and when it writes or appends to a file, the format is chosen by
+file name suffix: :code:`.gz` (and :code:`.bgz`, written in BGZF format),
+:code:`.bz2`, :code:`.xz`, and :code:`.zst`. Support for Zstandard requires
+Python 3.14 or the optional :code:`zstandard` package. Uncompressed files
+of at least :code:`MMAP_THRESHOLD` bytes are read with a
+:code:`MmapReader`.
+
+>>> import tempfile
+>>> outfile = os.path.join(tempfile.mkdtemp(), 'example.gff3.gz')
+>>> with GzipWriter(outfile, bgzf=True) as fh:
+...     for i in range(3):
+...         _ = fh.write('line {}\\n'.format(i))
+>>> with GzipReader(outfile) as fh:
+...     list(fh)
+['line 0\\n', 'line 1\\n', 'line 2\\n']
+>>> os.unlink(outfile)
+>>> outfile = os.path.join(tempfile.mkdtemp(), 'example.gff3.xz')
+>>> with open(outfile, 'w') as fh:
+...     _ = fh.write('##gff-version 3\\n')
+>>> detect_codec(outfile).name
+'xz'
+>>> with open(outfile, 'r') as fh:
+...     fh.read()
+'##gff-version 3\\n'
+>>> os.unlink(outfile)
+"""
+
+try:
+    import __builtin__ as builtins
+except ImportError:  # pragma: no cover
+    import builtins
+import bz2
+import codecs
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+try:
+    import lzma
+except ImportError:  # pragma: no cover
+    lzma = None
+import mmap
+import os
+import queue
+import struct
+import threading
+import zlib
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover
+    zstd = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+import tag
+
+
+# Accept gzip and zlib headers, maximum window size
+_GZIP_WBITS = zlib.MAX_WBITS | 32
+
+_BGZF_MAX_BLOCK = 0xff00
+_BGZF_HEADER = b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00'
+_BGZF_EOF = _BGZF_HEADER + b'\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+# Uncompressed files at least this large are memory-mapped for reading
+MMAP_THRESHOLD = 1 << 24
+
+_EOF = object()
+
+
+def bgzf_block(data, level=6):
+    """Compress up to 65280 bytes of data into a single BGZF block."""
+    assert len(data) <= _BGZF_MAX_BLOCK, 'data too large for a BGZF block'
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    cdata = compressor.compress(data) + compressor.flush()
+    blocksize = len(_BGZF_HEADER) + 2 + len(cdata) + 8
+    return b''.join((
+        _BGZF_HEADER, struct.pack('<H', blocksize - 1), cdata,
+        struct.pack('<II', zlib.crc32(data) & 0xffffffff, len(data)),
+    ))
+
+
+def _normalize_newlines(text):
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+class CompressedReader(object):
+    """
+    Text-mode reader for compressed files.
+
+    The :code:`decompressor` function creates an incremental decompression
+    object, such as :code:`bz2.BZ2Decompressor`, for each compressed member
+    of the file. A background thread reads the file :code:`blocksize` bytes
+    at a time, decompresses and decodes the data, and places the resulting
+    text blocks in a queue holding at most :code:`maxblocks` blocks. Line
+    endings are normalized to :code:`\\n` as with :code:`open()` in text
+    mode.
+    """
+
+    def __init__(self, filename, decompressor, blocksize=1 << 18,
+                 maxblocks=8, encoding='utf-8'):
+        self.name = filename
+        self.decompressor = decompressor
+        self.blocksize = blocksize
+        self.encoding = encoding
+        self.closed = True
+        dobj = decompressor()
+        self._raw = builtins.open(filename, 'rb')
+        self.closed = False
+        self._queue = queue.Queue(maxsize=maxblocks)
+        self._stop = threading.Event()
+        self._lines = list()
+        self._index = 0
+        self._tail = ''
+        self._eof = False
+        self._thread = threading.Thread(
+            target=self._decompress, args=(dobj,), daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decompress(self, dobj):
+        try:
+            decoder = codecs.getincrementaldecoder(self.encoding)()
+            pending = False
+            while not self._stop.is_set():
+                data = self._raw.read(self.blocksize)
+                if not data:
+                    break
+                while data:
+                    text = decoder.decode(dobj.decompress(data))
+                    pending = True
+                    if text and not self._put(text):
+                        return
+                    if not dobj.eof:
+                        break
+                    # End of a compressed member; more members may follow
+                    data = dobj.unused_data
+                    dobj = self.decompressor()
+                    pending = False
+            if pending:
+                raise EOFError('compressed file "{}" ended before the '
+                               'end-of-stream marker'.format(self.name))
+            text = decoder.decode(b'', final=True)
+            if text:
+                self._put(text)
+            self._put(_EOF)
+        except Exception as error:
+            self._put(error)
+        finally:
+            self._raw.close()
+
+    def _fill(self):
+        """Split the next decoded block into lines; False at end of file."""
+        while True:
+            if self._eof:
+                return False
+            block = self._queue.get()
+            if block is _EOF:
+                self._eof = True
+                if self._tail:
+                    self._lines, self._index = [self._tail], 0
+                    self._tail = ''
+                    return True
+                return False
+            if isinstance(block, Exception):
+                self._eof = True
+                raise block
+            text = self._tail + block
+            if '\r' in text:
+                # A \r\n pair may be split across blocks
+                if text.endswith('\r'):
+                    self._tail = text
+                    continue
+                text = _normalize_newlines(text)
+            lines = text.split('\n')
+            self._tail = lines.pop()
+            if lines:
+                self._lines = [line + '\n' for line in lines]
+                self._index = 0
+                return True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._index >= len(self._lines):
+            if not self._fill():
+                raise StopIteration
+        line = self._lines[self._index]
+        self._index += 1
+        return line
+
+    next = __next__
+
+    def readline(self):
+        try:
+            return next(self)
+        except StopIteration:
+            return ''
+
+    def read(self):
+        return ''.join(self)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._stop.set()
+        # Unblock the background thread if it is waiting on a full queue
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class GzipReader(CompressedReader):
+    """
+    Text-mode reader for gzip-compressed files.
+
+    See :code:`CompressedReader`.
+    """
+
+    def __init__(self, filename, blocksize=1 << 18, maxblocks=8,
+                 encoding='utf-8'):
+        super(GzipReader, self).__init__(
+            filename, _gzip_decompressor, blocksize=blocksize,
+            maxblocks=maxblocks, encoding=encoding
+        )
+
+
+class MmapReader(object):
+    """
+    Text-mode reader for memory-mapped uncompressed files.
+
+    Lines are read from the memory map and decoded without any intermediate
+    buffering. Files containing :code:`\\r` characters are instead decoded
+    :code:`blocksize` bytes at a time (extended to the next line break), so
+    that line endings can be normalized to :code:`\\n` as with
+    :code:`open()` in text mode.
+    """
+
+    def __init__(self, filename, blocksize=1 << 20, encoding='utf-8'):
+        self.name = filename
+        self.blocksize = blocksize
+        self.encoding = encoding
+        self.closed = True
+        self._map = None
+        self._lines = iter(())
+        with builtins.open(filename, 'rb') as fh:
+            if os.fstat(fh.fileno()).st_size > 0:
+                self._map = mmap.mmap(
+                    fh.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        self.closed = False
+        if self._map is None:
+            return
+        if self._map.find(b'\r') < 0:
+            self._lines = map(
+                bytes.decode, iter(self._map.readline, b''), repeat(encoding)
+            )
+        else:
+            self._lines = (
+                line for block in self._blocks() for line in block
+            )
+
+    def _blocks(self):
+        data, pos, size = self._map, 0, len(self._map)
+        while pos < size:
+            end = data.find(b'\n', min(pos + self.blocksize, size) - 1)
+            end = size if end < 0 else end + 1
+            text = data[pos:end].decode(self.encoding)
+            pos = end
+            yield _normalize_newlines(text).splitlines(True)
+
+    def __iter__(self):
+        return self._lines
+
+    def __next__(self):
+        return next(self._lines)
+
+    next = __next__
+
+    def readline(self):
+        return next(self._lines, '')
+
+    def read(self):
+        return ''.join(self._lines)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._lines = iter(())
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _Done(object):
+    """Stand-in for a future whose result was computed synchronously."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+class CompressedWriter(object):
+    """
+    Text-mode writer for compressed files.
+
+    The :code:`compressor` function creates an incremental compression
+    object, such as :code:`bz2.BZ2Compressor`. Written text is buffered and
+    handed off in chunks of :code:`blocksize` characters to a background
+    compression thread. At most :code:`maxpending` chunks are in flight at a
+    time; compressed data are written to the file in order by the calling
+    thread.
+
+    Data still buffered or in flight are written when the file is flushed or
+    closed. With :code:`append=True`, compressed data are added to the end of
+    an existing file as a new compressed member.
+    """
+
+    def __init__(self, filename, compressor, blocksize=1 << 18,
+                 maxpending=None, encoding='utf-8', append=False, threads=1):
+        self.name = filename
+        self.blocksize = blocksize
+        self.encoding = encoding
+        self.closed = True
+        if maxpending is None:
+            maxpending = 2 * threads
+        self.maxpending = maxpending
+        self._compressor = compressor() if compressor else None
+        self._raw = builtins.open(filename, 'ab' if append else 'wb')
+        self.closed = False
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._buffer = list()
+        self._buffered = 0
+        self._pending = deque()
+
+    def _submit(self, func, data):
+        try:
+            future = self._executor.submit(func, data)
+        except RuntimeError:  # pragma: no cover
+            # Executor is gone, e.g. during interpreter shutdown
+            future = _Done(func(data))
+        self._pending.append(future)
+
+    def _compress(self, data):
+        """Submit a chunk of encoded data for compression."""
+        self._submit(self._compressor.compress, data)
+
+    def _finish(self):
+        """Compressed data to write at the end of the file."""
+        return self._compressor.flush()
+
+    def _handoff(self):
+        if not self._buffer:
+            return
+        data = ''.join(self._buffer).encode(self.encoding)
+        self._buffer = list()
+        self._buffered = 0
+        self._compress(data)
+        while len(self._pending) > self.maxpending:
+            self._raw.write(self._pending.popleft().result())
+
+    def write(self, text):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.blocksize:
+            self._handoff()
+        return len(text)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        """Wait for buffered data to be compressed and written."""
+        if self.closed:
+            return
+        self._handoff()
+        while self._pending:
+            self._raw.write(self._pending.popleft().result())
+        self._raw.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.flush()
+            self._raw.write(self._finish())
+        finally:
+            self.closed = True
+            self._raw.close()
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class GzipWriter(CompressedWriter):
+    """
+    Text-mode writer for gzip-compressed files.
+
+    With :code:`bgzf=True` output is written in the blocked gzip format used
+    by samtools and tabix. Each block is compressed independently, using a
+    pool of :code:`threads` threads (by default up to 4, depending on the
+    number of CPUs). See :code:`CompressedWriter`.
+    """
+
+    def __init__(self, filename, level=6, bgzf=False, threads=None,
+                 blocksize=1 << 18, maxpending=None, encoding='utf-8',
+                 append=False):
+        self.level = level
+        self.bgzf = bgzf
+        if threads is None:
+            threads = min(4, os.cpu_count() or 1) if bgzf else 1
+        if maxpending is None:
+            maxpending = 2 * threads if not bgzf else 32 * threads
+        compressor = None
+        if not bgzf:
+            def compressor():
+                return zlib.compressobj(
+                    level, zlib.DEFLATED, zlib.MAX_WBITS | 16
+                )
+        super(GzipWriter, self).__init__(
+            filename, compressor, blocksize=blocksize, maxpending=maxpending,
+            encoding=encoding, append=append, threads=threads
+        )
+
+    def _compress(self, data):
+        if not self.bgzf:
+            return super(GzipWriter, self)._compress(data)
+        for i in range(0, len(data), _BGZF_MAX_BLOCK):
+            block = data[i:i + _BGZF_MAX_BLOCK]
+            self._submit(self._compress_block, block)
+
+    def _compress_block(self, data):
+        return bgzf_block(data, self.level)
+
+    def _finish(self):
+        if self.bgzf:
+            return _BGZF_EOF
+        return super(GzipWriter, self)._finish()
+
+
+def _gzip_decompressor():
+    return zlib.decompressobj(_GZIP_WBITS)
+
+
+def _require_lzma():
+    if lzma is None:  # pragma: no cover
+        raise ImportError('xz compression requires Python built with lzma')
+
+
+def _require_zstd():
+    if zstd is None and zstandard is None:
+        raise ImportError(
+            'Zstandard compression requires the zstandard package: '
+            'pip install zstandard'
+        )
+
+
+def _xz_decompressor():
+    _require_lzma()
+    return lzma.LZMADecompressor()
+
+
+def _xz_compressor():
+    _require_lzma()
+    return lzma.LZMACompressor()
+
+
+def _zstd_decompressor():
+    _require_zstd()
+    if zstd is not None:  # pragma: no cover
+        return zstd.ZstdDecompressor()
+    return zstandard.ZstdDecompressor().decompressobj()  # pragma: no cover
+
+
+def _zstd_compressor():
+    _require_zstd()
+    if zstd is not None:  # pragma: no cover
+        return zstd.ZstdCompressor()
+    return zstandard.ZstdCompressor().compressobj()  # pragma: no cover
+
+
+class Codec(object):
+    """
+    A compression format supported by :code:`tag.open`.
+
+    Compressed files are recognized by the :code:`magic` bytes at the start
+    of the file when reading, and by the file name :code:`suffixes` when
+    writing or appending. The :code:`reader` and :code:`writer` functions
+    open a file for reading, and for writing or appending, in text mode; they
+    are called as :code:`reader(filename, blocksize)` and
+    :code:`writer(filename, blocksize, append)`, where :code:`blocksize` is
+    the buffer size requested by the caller (or :code:`None`).
+    """
+
+    def __init__(self, name, magic, suffixes, reader, writer):
+        self.name = name
+        self.magic = magic
+        self.suffixes = tuple(suffixes)
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    def streaming(cls, name, magic, suffixes, decompressor, compressor):
+        """
+        Define a codec from incremental (de)compression object factories.
+
+        See :code:`CompressedReader` and :code:`CompressedWriter`.
+        """
+        def reader(filename, blocksize):
+            return CompressedReader(filename, decompressor,
+                                    blocksize=blocksize or 1 << 18)
+
+        def writer(filename, blocksize, append):
+            return CompressedWriter(filename, compressor,
+                                    blocksize=blocksize or 1 << 18,
+                                    append=append)
+        return cls(name, magic, suffixes, reader, writer)
+
+
+_codecs = list()
+
+
+def register_codec(codec):
+    """
+    Add support for a compression format to :code:`tag.open`.
+
+    A codec registered later takes precedence over earlier codecs with the
+    same name, magic bytes, or suffixes.
+    """
+    _codecs.insert(0, codec)
+
+
+def detect_codec(filename):
+    """
+    Determine the compression format of a file from its first few bytes.
+
+    Returns :code:`None` for uncompressed (or empty) files. Only regular
+    files are inspected, so that no data are consumed from pipes; the codec
+    of any other file is determined by its name.
+    """
+    if not os.path.isfile(filename):
+        return suffix_codec(filename)
+    length = max(len(codec.magic) for codec in _codecs)
+    with builtins.open(filename, 'rb') as fh:
+        start = fh.read(length)
+    for codec in _codecs:
+        if start.startswith(codec.magic):
+            return codec
+    return None
+
+
+def suffix_codec(filename):
+    """Determine the compression format for a file from its name."""
+    for codec in _codecs:
+        if filename.endswith(codec.suffixes):
+            return codec
+    return None
+
+
+def _gzip_writer(filename, blocksize, append):
+    return GzipWriter(filename, bgzf=filename.endswith('.bgz'),
+                      blocksize=blocksize or 1 << 18, append=append)
+
+
+register_codec(Codec(
+    'gzip', b'\x1f\x8b', ('.gz', '.bgz'),
+    lambda filename, blocksize: GzipReader(filename, blocksize or 1 << 18),
+    _gzip_writer,
+))
+register_codec(Codec.streaming(
+    'bzip2', b'BZh', ('.bz2',), bz2.BZ2Decompressor, bz2.BZ2Compressor,
+))
+register_codec(Codec.streaming(
+    'xz', b'\xfd7zXZ\x00', ('.xz',), _xz_decompressor, _xz_compressor,
+))
+register_codec(Codec.streaming(
+    'zstd', b'\x28\xb5\x2f\xfd', ('.zst',), _zstd_decompressor,
+    _zstd_compressor,
+))
+
+
+def open(filename, mode, buffersize=None, usemmap=None):
+    """
+    Open a file for reading, writing, or appending in text mode.
+
+    When reading, the compression format is detected from the contents of
+    the file; when writing or appending, from the file name (see
+    :code:`detect_codec` and :code:`suffix_codec`). The :code:`buffersize`
+    sets the size of the blocks read or written at a time (in bytes, or in
+    characters for compressed output). Uncompressed files are read with a
+    :code:`MmapReader` if :code:`usemmap` is set, or by default if they are
+    at least :code:`MMAP_THRESHOLD` bytes in size. The :code:`mode` is one of
+    :code:`r`, :code:`w`, or :code:`a`, optionally followed by :code:`t`.
+    """
+    if mode in ('rt', 'wt', 'at'):
+        mode = mode[0]
+    if mode not in ('r', 'w', 'a'):
+        raise ValueError('invalid mode "{}"'.format(mode))
+    if mode == 'r':
+        codec = detect_codec(filename)
+        if codec is not None:
+            return codec.reader(filename, buffersize)
+        if usemmap is None:
+            usemmap = os.path.isfile(filename) and \
+                os.path.getsize(filename) >= MMAP_THRESHOLD
+        if usemmap:
+            return MmapReader(filename, blocksize=buffersize or 1 << 20)
+    else:
+        codec = suffix_codec(filename)
+        if codec is not None:
+            return codec.writer(filename, buffersize, mode == 'a')
+    return builtins.open(filename, mode, buffering=buffersize or -1)
@@ -7,10 +7,15 @@
 # under the BSD 3-clause license: see LICENSE.
 # -----------------------------------------------------------------------------
 
-from collections import defaultdict
-from intervaltree import IntervalTree
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, OrderedDict
+from intervaltree import Interval, IntervalTree
+from itertools import accumulate
+import io
+from operator import itemgetter
 import tag
 import sys
+import threading
 
 
 class Index(defaultdict):
@@ -46,13 +51,49 @@ class Index(defaultdict):
     gene@chr8[72, 5081]
     gene@chr8[10538, 11678]
     gene@chr8[22053, 23448]
+
+    Many regions can be queried at once with :code:`query_many`. Results of
+    repeated queries can be cached by setting :code:`cachesize` to the
+    maximum number of results to retain; the least recently used results
+    are discarded first, and the cache is cleared whenever a feature is
+    added to or removed from the index.
+
+    >>> index = tag.index.Index(cachesize=100)
+    >>> index.consume_file(tag.tests.data_file('pcan-123.gff3.gz'))
+    >>> regions = [
+    ...     ('scaffold_125', 19000, 87000),
+    ...     ('scaffold_123', 5000, 6000),
+    ...     ('scaffold_125', 57500, 57600),
+    ... ]
+    >>> results = index.query_many(regions, strict=False)
+    >>> [len(features) for features in results]
+    [3, 1, 1]
+    >>> print(results[2][0].slug)
+    gene@scaffold_125[57450, 57680]
+    >>> _ = index.query('scaffold_123', 5000, 6000, strict=False)
+    >>> index.cache_hits, index.cache_misses
+    (1, 3)
+
+    The features closest to a position or range are found with
+    :code:`nearest`.
+
+    >>> for feature, distance in index.nearest('scaffold_123', 5000, k=2):
+    ...     print(feature.slug, distance)
+    gene@scaffold_123[5583, 5894] 582
+    gene@scaffold_123[23738, 25158] 18737
     """
 
-    def __init__(self):
+    def __init__(self, cachesize=0):
         defaultdict.__init__(self, IntervalTree)
         self.declared_regions = dict()
         self.inferred_regions = dict()
         self.yield_inferred = True
+        self.cachesize = cachesize
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        self._cachelock = threading.Lock()
+        self._sweepdata = dict()
 
     def consume_file(self, infile):
         """Load the specified GFF3 file into memory."""
@@ -74,12 +115,33 @@ class Index(defaultdict):
         if not isinstance(feature, tag.feature.Feature):
             raise ValueError('expected Feature object')
         self[feature.seqid][feature.start:feature.end] = feature
+        self._sweepdata.pop(feature.seqid, None)
+        if self._cache:
+            with self._cachelock:
+                self._cache.clear()
         if feature.seqid not in self.inferred_regions:
             self.inferred_regions[feature.seqid] = feature._range.copy()
         newrange = self.inferred_regions[feature.seqid].merge(feature._range)
         self.inferred_regions[feature.seqid].start = newrange.start
         self.inferred_regions[feature.seqid].end = newrange.end
 
+    def remove_feature(self, feature):
+        """
+        Remove a :code:`Feature` object from the index.
+
+        The inferred region of the feature's sequence is not shrunk.
+        """
+        if feature.seqid not in self:
+            raise ValueError('feature not in index: ' + feature.slug)
+        tree = self[feature.seqid]
+        tree.remove(Interval(feature.start, feature.end, feature))
+        if not tree:
+            del self[feature.seqid]
+        self._sweepdata.pop(feature.seqid, None)
+        if self._cache:
+            with self._cachelock:
+                self._cache.clear()
+
     def consume(self, entrystream):
         """
         Load a stream of entries into memory.
@@ -119,6 +181,10 @@ class Index(defaultdict):
         :param strict: indicates whether query is strict containment or overlap
                        (:code:`True` and :code:`False`, respectively)
         """
+        key = (seqid, start, end, strict)
+        result = self._cache_get(key)
+        if result is not None:
+            return list(result)
         if end and strict:
             query = self[seqid].envelop
             args = (start, end)
@@ -128,7 +194,156 @@ class Index(defaultdict):
         else:
             query = self[seqid].at
             args = [start]
-        return sorted([intvl.data for intvl in query(*args)])
+        result = sorted([intvl.data for intvl in query(*args)])
+        self._cache_put(key, tuple(result))
+        return result
+
+    def query_many(self, regions, strict=True):
+        """
+        Query the index for features in each of the specified ranges.
+
+        Each region is a tuple of a seqid, a start, and optionally an end, as
+        for :code:`query`. Returns a list with the sorted features for each
+        region, in the same order as the regions.
+
+        Rather than querying the interval tree once per region, the regions
+        for each sequence are sorted and answered in a single sweep over the
+        sequence's features in sorted order, keeping track of features that
+        may overlap the current region.
+        """
+        regions = list(regions)
+        results = [None] * len(regions)
+        byseqid = defaultdict(list)
+        for i, region in enumerate(regions):
+            seqid, start = region[0], region[1]
+            end = region[2] if len(region) > 2 else None
+            cached = self._cache_get((seqid, start, end, strict))
+            if cached is not None:
+                results[i] = list(cached)
+            elif seqid not in self:
+                results[i] = list()
+            else:
+                byseqid[seqid].append((start, end, i))
+
+        for seqid, queries in byseqid.items():
+            queries.sort(key=itemgetter(0))
+            arrays = self._sweep_arrays(seqid)
+            features, starts, ends = \
+                arrays.features, arrays.starts, arrays.ends
+            numfeatures = len(features)
+            active = list()
+            nextfeat = 0
+            for start, end, i in queries:
+                point = not end
+                qend = start + 1 if point else end
+                while nextfeat < numfeatures and starts[nextfeat] < qend:
+                    active.append(nextfeat)
+                    nextfeat += 1
+                # Queries are sorted by start, so features ending before this
+                # query starts can be discarded for good
+                active = [j for j in active if ends[j] > start]
+                if strict and not point:
+                    hits = [
+                        features[j] for j in active
+                        if starts[j] >= start and ends[j] <= end
+                    ]
+                else:
+                    hits = [features[j] for j in active if starts[j] < qend]
+                results[i] = hits
+                self._cache_put((seqid, start, end, strict), tuple(hits))
+        return results
+
+    def nearest(self, seqid, start, end=None, k=1, strand=None,
+                direction=None):
+        """
+        Find the features nearest to the specified range or position.
+
+        Returns a list of up to :code:`k` tuples of a feature and its
+        distance from the query, closest first. Overlapping features have a
+        distance of 0 and adjacent features a distance of 1.
+
+        :param seqid: ID of the sequence to query
+        :param start: start of the query interval
+        :param end: end of the query interval; omit to query a position
+        :param k: number of features to report
+        :param strand: only report features on the specified strand
+        :param direction: only report features (other than overlapping
+                          features) located :code:`upstream` or
+                          :code:`downstream` of the query, with respect to
+                          :code:`strand` if specified, otherwise the
+                          reference sequence
+        """
+        return self.nearest_many(
+            [(seqid, start, end)], k=k, strand=strand, direction=direction
+        )[0]
+
+    def nearest_many(self, regions, k=1, strand=None, direction=None):
+        """
+        Find the features nearest to each of the specified ranges.
+
+        Regions are given as for :code:`query_many`. Returns a list with the
+        result of :code:`nearest` for each region, in the same order as the
+        regions. The regions for each sequence are answered in order of
+        position, each binary search in the sorted start and end arrays
+        resuming from where the previous one left off.
+        """
+        regions = list(regions)
+        results = [None] * len(regions)
+        byseqid = defaultdict(list)
+        for i, region in enumerate(regions):
+            seqid, start = region[0], region[1]
+            end = region[2] if len(region) > 2 else None
+            if seqid not in self:
+                results[i] = list()
+            else:
+                byseqid[seqid].append((start, end or start + 1, i))
+
+        for seqid, queries in byseqid.items():
+            queries.sort(key=itemgetter(0, 1))
+            arrays = self._sweep_arrays(seqid, strand=strand)
+            for i, hits in arrays.nearest(queries, k, strand, direction):
+                results[i] = hits
+        return results
+
+    def _sweep_arrays(self, seqid, strand=None):
+        """
+        Features for a sequence in sorted arrays (see FeatureArrays).
+
+        If :code:`strand` is specified, only features on that strand are
+        included, so that searches need not skip over features on the other
+        strand.
+        """
+        bystrand = self._sweepdata.setdefault(seqid, dict())
+        data = bystrand.get(strand)
+        if data is None:
+            tree = self[seqid]
+            features = (interval.data for interval in tree)
+            if strand is not None:
+                features = (f for f in features if f.strand == strand)
+            data = FeatureArrays(features, tree=tree)
+            bystrand[strand] = data
+        return data
+
+    def _cache_get(self, key):
+        if not self.cachesize:
+            return None
+        with self._cachelock:
+            result = self._cache.get(key)
+            if result is None:
+                self.cache_misses += 1
+            else:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return result
+
+    def _cache_put(self, key, result):
+        if not self.cachesize:
+            return
+        with self._cachelock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cachesize:
+                self._cache.popitem(last=False)
 
     @property
     def seqids(self):
@@ -143,6 +358,143 @@ class Index(defaultdict):
         return sr.start, sr.end
 
 
+class FeatureArrays(object):
+    """
+    Features on a single sequence in sorted arrays for binary search.
+
+    Features are sorted by position (see :code:`tag.select.sort_key`), with
+    arrays of their starts and ends, and the running maximum of the ends.
+    For searching by end, feature positions are also sorted by end, with
+    the sorted ends.
+
+    Features overlapping a query are found by scanning back from the query
+    end until the running maximum end falls before the query start. A
+    feature spanning much of the sequence would make this scan long, so
+    after :code:`scanlimit` features an interval tree is searched instead,
+    for this and all later queries: the :code:`tree` provided, or one built
+    when first needed. Features in the tree that are not in the arrays are
+    ignored.
+    """
+
+    scanlimit = 32
+
+    def __init__(self, features, tree=None):
+        self.features = sorted(features, key=tag.select.sort_key)
+        self.starts = [feature.start for feature in self.features]
+        self.ends = [feature.end for feature in self.features]
+        self.maxends = list(accumulate(self.ends, max))
+        self.endorder = sorted(range(len(self.ends)),
+                               key=self.ends.__getitem__)
+        self.sortedends = [self.ends[j] for j in self.endorder]
+        self.tree = tree
+        self.positions = None
+        self.empty = ()
+        self.usetree = False
+
+    def _search_tree(self, start, end):
+        if self.positions is None:
+            self.positions = dict(
+                (id(feature), j) for j, feature in enumerate(self.features)
+            )
+        if self.tree is None:
+            # Empty intervals cannot be stored in the tree
+            self.tree = IntervalTree(
+                Interval(feature.start, feature.end, feature)
+                for feature in self.features if feature.start < feature.end
+            )
+            self.empty = [
+                j for j, feature in enumerate(self.features)
+                if feature.start == feature.end
+            ]
+        overlaps = list()
+        for interval in self.tree.overlap(start, end):
+            j = self.positions.get(id(interval.data))
+            if j is not None:
+                overlaps.append(j)
+        for j in self.empty:
+            if start < self.starts[j] < end:
+                overlaps.append(j)
+        return overlaps
+
+    def _overlaps(self, start, end, nextstart):
+        """
+        Find the features overlapping a query.
+
+        Features before position :code:`nextstart` start before the end of
+        the query, and overlap it if they end after its start; none do once
+        the running maximum end is reached.
+        """
+        if self.usetree:
+            return self._search_tree(start, end)
+        maxends, ends = self.maxends, self.ends
+        overlaps = list()
+        stop = max(nextstart - self.scanlimit, 0)
+        j = nextstart - 1
+        while j >= stop:
+            if maxends[j] <= start:
+                return overlaps
+            if ends[j] > start:
+                overlaps.append(j)
+            j -= 1
+        if j < 0:
+            return overlaps
+        self.usetree = True
+        return self._search_tree(start, end)
+
+    def nearest(self, queries, k=1, strand=None, direction=None):
+        """
+        Find the features nearest to each of a list of query intervals.
+
+        Queries are tuples of a start, an end, and a label, sorted by start.
+        For each query, yields the label and a list of up to :code:`k` tuples
+        of a feature and its distance, as for :code:`Index.nearest`.
+        Features flanking each query are found by binary search, resuming
+        from where the search for the previous query left off.
+        """
+        assert direction in (None, 'upstream', 'downstream'), direction
+        left, right = True, True
+        if direction is not None:
+            left = (direction == 'upstream') == (strand != '-')
+            right = not left
+        features, starts = self.features, self.starts
+        endorder, sortedends = self.endorder, self.sortedends
+        numfeatures = len(features)
+        nextstart, nextend, prevend = 0, 0, 0
+        for start, end, label in queries:
+            # Query ends are only sorted among queries that nest
+            lo = nextstart if end >= prevend else 0
+            nextstart = bisect_left(starts, end, lo)
+            prevend = end
+
+            # Hits are (distance, position in sorted order) pairs
+            hits = [
+                (0, j) for j in self._overlaps(start, end, nextstart)
+                if strand is None or features[j].strand == strand
+            ]
+            if right:
+                # Features starting at or after the end of the query
+                count = 0
+                for j in range(nextstart, numfeatures):
+                    if count == k:
+                        break
+                    if strand is None or features[j].strand == strand:
+                        hits.append((starts[j] - end + 1, j))
+                        count += 1
+            if left:
+                # Features ending at or before the start of the query
+                nextend = bisect_right(sortedends, start, nextend)
+                count = 0
+                for j in range(nextend - 1, -1, -1):
+                    if count == k:
+                        break
+                    position = endorder[j]
+                    if strand is None or features[position].strand == strand:
+                        hits.append((start - sortedends[j] + 1, position))
+                        count += 1
+            hits.sort()
+            yield label, [(features[j], dist) for dist, j in hits[:k]]
+
+
 class NamedIndex(object):
     """
     In-memory index for retrieving genome features by identifier.
@@ -155,16 +507,50 @@ class NamedIndex(object):
     >>> exon = index['PCAN011a001859T1.exon1']
     >>> print(exon.slug)
     exon@scaffold_125[57450, 57680]
+
+    By default every named feature is kept in memory, along with the rest of
+    its feature graph. With :code:`lazy=True`, files loaded with
+    :code:`consume_file` are instead scanned for the byte offset and length
+    of the lines making up each top-level feature graph, and only these are
+    stored for each name. A graph is parsed from the file when one of its
+    features is requested, and the :code:`cachesize` most recently parsed
+    graphs are retained. Lazy indexing requires an uncompressed file that is
+    not modified while the index is in use.
+
+    >>> index = tag.index.NamedIndex(lazy=True, cachesize=2)
+    >>> index.consume_file(tag.tests.data_file('grape-cpgat.gff3'))
+    >>> 'chr8.g3.t1' in index, 'bogus' in index
+    (True, False)
+    >>> print(index['chr8.g3.t1'].slug)
+    mRNA@chr8[22053, 23448]
+    >>> print(index['chr8.g3'].children[0] is index['chr8.g3.t1'])
+    True
     """
 
-    def __init__(self):
+    def __init__(self, lazy=False, cachesize=128):
         self.data = dict()
+        self.lazy = lazy
+        self.cachesize = cachesize
+        self._offsets = dict()
+        self._blocks = list()
+        self._sources = list()
+        self._cache = OrderedDict()
+        self._cachelock = threading.Lock()
 
     def consume_file(self, infile, attribute='ID'):
+        if self.lazy:
+            self._scan(infile, attribute)
+            return
         reader = tag.reader.GFF3Reader(infilename=infile)
         self.consume(reader, attribute=attribute)
 
     def consume(self, entrystream, attribute='ID'):
+        for name, feature in self._named_features(entrystream, attribute):
+            self.data[name] = feature
+            self._offsets.pop(name, None)
+
+    @staticmethod
+    def _named_features(entrystream, attribute):
         for feature in tag.select.features(entrystream):
             for subfeature in feature:
                 name = subfeature.get_attribute(attribute)
@@ -172,17 +558,122 @@ class NamedIndex(object):
                     continue
                 if subfeature.is_multi and subfeature.multi_rep != subfeature:
                     continue
-                self.data[name] = subfeature
+                yield name, subfeature
+
+    def _scan(self, infile, attribute):
+        """
+        Find the byte range of each top-level feature graph in a file.
+
+        Features are grouped into graphs by their ID and Parent attributes.
+        The lines of a graph need not be contiguous: graphs whose byte ranges
+        overlap are stored as a single block, so that each block can be
+        parsed independently of the rest of the file.
+        """
+        if tag.fileio.detect_codec(infile) is not None:
+            msg = 'lazy indexing requires an uncompressed file: ' + infile
+            raise ValueError(msg)
+        groups = dict()
+        spans = dict()
+        names = list()
+
+        def find(key):
+            while groups[key] != key:
+                groups[key] = groups[groups[key]]
+                key = groups[key]
+            return key
+
+        def join(key, other):
+            if other not in groups:
+                groups[other] = other
+                spans[other] = list(spans[key])
+                return
+            key, other = find(key), find(other)
+            if key != other:
+                groups[other] = key
+                span, otherspan = spans[key], spans.pop(other)
+                span[0] = min(span[0], otherspan[0])
+                span[1] = max(span[1], otherspan[1])
+
+        offset = 0
+        with io.open(infile, 'rb') as instream:
+            for line in instream:
+                start, offset = offset, offset + len(line)
+                if line.startswith(b'##FASTA'):
+                    break
+                if line.startswith(b'#') or not line.strip():
+                    continue
+                fields = line.decode('utf-8').rstrip('\r\n').split('\t')
+                if len(fields) != 9:
+                    msg = 'malformed feature at byte {}'.format(start)
+                    raise ValueError(msg)
+                attrs = dict(
+                    kvp.split('=', 1) for kvp in fields[8].split(';')
+                    if kvp not in ('', '.')
+                )
+                key = attrs.get('ID', start)
+                if key in groups:
+                    root = find(key)
+                    spans[root][1] = offset
+                else:
+                    groups[key] = key
+                    spans[key] = [start, offset]
+                for parentid in attrs.get('Parent', '').split(','):
+                    if parentid:
+                        join(key, parentid)
+                name = attrs.get(attribute)
+                if name is not None and ',' not in name:
+                    names.append((name, key))
+
+        # Merge overlapping byte ranges into independently parseable blocks
+        sourceid = len(self._sources)
+        self._sources.append((infile, attribute))
+        roots = sorted(spans.items(), key=lambda item: item[1])
+        blockids = dict()
+        blockend = -1
+        for root, (start, end) in roots:
+            if start >= blockend:
+                self._blocks.append([sourceid, start, end - start])
+            else:
+                block = self._blocks[-1]
+                block[2] = max(end, blockend) - block[1]
+            blockend = max(end, blockend)
+            blockids[root] = len(self._blocks) - 1
+        for name, key in names:
+            self._offsets[name] = blockids[find(key)]
+            self.data.pop(name, None)
+
+    def _materialize(self, blockid):
+        """Parse a block of the source file, caching the named features."""
+        with self._cachelock:
+            if blockid in self._cache:
+                self._cache.move_to_end(blockid)
+                return self._cache[blockid]
+        sourceid, offset, length = self._blocks[blockid]
+        infile, attribute = self._sources[sourceid]
+        with io.open(infile, 'rb') as instream:
+            instream.seek(offset)
+            data = instream.read(length).decode('utf-8')
+        reader = tag.reader.GFF3Reader(io.StringIO(data, newline=None))
+        features = dict(self._named_features(reader, attribute))
+        with self._cachelock:
+            self._cache[blockid] = features
+            while len(self._cache) > max(self.cachesize, 1):
+                self._cache.popitem(last=False)
+        return features
 
     def __getitem__(self, name):
+        if name in self._offsets:
+            return self._materialize(self._offsets[name])[name]
         if name not in self.data:
             raise IndexError(name)
         return self.data[name]
 
     def __contains__(self, name):
-        return name in self.data
+        return name in self._offsets or name in self.data
 
     @property
     def names(self):
-        for name in sorted(self.data.keys()):
+        names = set(self.data.keys())
+        names.update(self._offsets.keys())
+        for name in sorted(names):
             yield name
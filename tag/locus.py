@@ -8,10 +8,23 @@
 # -----------------------------------------------------------------------------
 
 import tag
+from tag.stages import timed
+import warnings
 
 
 class LocusBuffer(object):
+    """
+    Buffer of features belonging to a single locus.
+
+    Deprecated: :code:`loci` no longer uses this class; use :code:`cluster`
+    to group sorted features into loci.
+    """
+
     def __init__(self, firstfeature):
+        warnings.warn(
+            'LocusBuffer is deprecated; use tag.locus.cluster instead',
+            DeprecationWarning, stacklevel=2
+        )
         self.buffer = [firstfeature]
         self.seqid = firstfeature.seqid
         self.range = firstfeature.range
@@ -31,7 +44,58 @@ class LocusBuffer(object):
         self.range = self.range.merge(feature.range)
 
 
-def loci(*sorted_streams, **kwargs):
+def cluster(keyedfeatures, minbp=25, minperc=0.25):
+    """Cluster sorted features into loci by overlap.
+
+    The :code:`keyedfeatures` stream provides :code:`(key, feature)` tuples
+    sorted by key, where each key is computed by :code:`tag.select.sort_key`.
+    Features are compared using the integer coordinates cached in the keys,
+    so clustering allocates nothing per feature. A feature joins the current
+    locus if it overlaps the locus by at least :code:`minbp` bp and by at
+    least :code:`minperc` of the lengths of both the feature and the locus.
+    Each locus is yielded as a :code:`(seqid, start, end, features)` tuple.
+
+    >>> features = [tag.Feature('chr1', 'gene', 1, 1000),
+    ...             tag.Feature('chr1', 'gene', 800, 2000),
+    ...             tag.Feature('chr1', 'gene', 1500, 3000)]
+    >>> keyed = [(tag.select.sort_key(f), f) for f in features]
+    >>> for seqid, start, end, locus in cluster(keyed, minperc=0.0):
+    ...     print(seqid, start, end, len(locus))
+    chr1 1 3000 3
+    >>> for seqid, start, end, locus in cluster(keyed):
+    ...     print(seqid, start, end, len(locus))
+    chr1 1 1000 1
+    chr1 800 3000 2
+    """
+    assert minbp >= 1, 'must require at least 1bp overlap'
+    buffer = list()
+    seqid, start, end = None, 0, 0
+    for key, feature in keyedfeatures:
+        fseqid, fstart, fend = key[1], key[2], key[3]
+        if fseqid == seqid:
+            overlap = (fend if fend < end else end) - \
+                (fstart if fstart > start else start)
+            if overlap >= minbp and (not minperc or (
+                overlap / (fend - fstart) >= minperc and
+                overlap / (end - start) >= minperc
+            )):
+                buffer.append(feature)
+                if fstart < start:
+                    start = fstart
+                if fend > end:
+                    end = fend
+                continue
+        if buffer:
+            yield seqid, start, end, tuple(buffer)
+            buffer.clear()
+        buffer.append(feature)
+        seqid, start, end = fseqid, fstart, fend
+    if buffer:
+        yield seqid, start, end, tuple(buffer)
+
+
+@timed('loci')
+def loci(*sorted_streams, featuretype=None, minbp=25, minperc=0.25):
     """Determine feature loci from two or more sorted annotation streams.
 
     Rather than simply relying on gene coordinates from a reference annotation,
@@ -40,32 +104,27 @@ def loci(*sorted_streams, **kwargs):
     references or predictions. This enables efficient and accurate assessment
     of both sensitivity and specificity at the level of individual nucleotides
     and entire features.
+
+    Loci are yielded as :code:`(seqid, range, features)` tuples; see
+    :code:`cluster` for details.
     """
-    featuretype = kwargs['featuretype'] if 'featuretype' in kwargs else None
-    minbp = kwargs['minbp'] if 'minbp' in kwargs else 25
-    minperc = kwargs['minperc'] if 'minperc' in kwargs else 0.25
-    locus = None
-    merger = tag.select.merge(*sorted_streams)
-    features = tag.select.features(merger, type=featuretype)
-    for feature in features:
-        if locus is None:
-            locus = LocusBuffer(feature)
-        elif locus.test(feature, minbp=minbp, minperc=minperc) is True:
-            locus.add(feature)
-        else:
-            yield locus.seqid, locus.range, tuple(locus.buffer)
-            locus = LocusBuffer(feature)
-    yield locus.seqid, locus.range, tuple(locus.buffer)
-
-
-def pocus(*sorted_streams, **kwargs):
+    merger = tag.select.merge(*sorted_streams, keyed=True)
+    keyedfeatures = (
+        (key, entry) for key, entry in merger if key[0] == 4 and (
+            not featuretype or tag.select._typecheck(entry, featuretype)
+        )
+    )
+    for seqid, start, end, features in cluster(keyedfeatures, minbp, minperc):
+        yield seqid, tag.Range(start, end), features
+
+
+def pocus(*sorted_streams, delta=0, **kwargs):
     """Feature stream for locus parsing.
 
     From two or more sorted annotation streams, create a new stream that yields
     the features from the original streams, additional `locus` features, and
     separator directives (`###`) between loci.
     """
-    delta = kwargs['delta'] if 'delta' in kwargs else 0
     for seqid, rng, features in loci(*sorted_streams, **kwargs):
         locus = tag.Feature(
             seqid, 'experimental_feature', rng.start - delta, rng.end + delta,
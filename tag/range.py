@@ -70,6 +70,23 @@ class Range(object):
         self._start = start
         self._end = end
 
+    @classmethod
+    def unchecked(cls, start, end):
+        """
+        Create a range without validating its coordinates.
+
+        Intended for data that has already been validated, such as GFF3
+        produced by :code:`tag gff3`. Invalid coordinates passed to this
+        constructor will not be detected.
+
+        >>> Range.unchecked(100, 250)
+        [100, 250)
+        """
+        rng = cls.__new__(cls)
+        rng._start = start
+        rng._end = end
+        return rng
+
     def __str__(self):
         if self._start == self._end:
             return str(self._start)
@@ -8,7 +8,12 @@
 # -----------------------------------------------------------------------------
 
 from collections import defaultdict
+import heapq
+from operator import itemgetter
+import os
+import shutil
 import sys
+import tempfile
 import tag
 from tag import Range
 from tag import Comment
@@ -33,6 +38,10 @@ class FeatureTypeDisagreementError(ValueError):
     pass
 
 
+class MissingParentError(ValueError):
+    pass
+
+
 def clean_lines(instream):
     for line in instream:
         line = line.strip()
@@ -61,6 +70,97 @@ def parse_fasta(data):  # pragma: no cover
         yield Sequence(name, ''.join(seq))
 
 
+# Approximate memory consumed by parsed features, per character of input
+MEMORY_PER_CHAR = 16
+RUN_BLOCK_SIZE = 16
+# Maximum number of spilled runs read at once, to avoid running out of file
+# handles when many batches are spilled (see tag.select.merge)
+RUN_FANIN = 64
+
+
+class SpillFile(object):
+    """
+    Feature lines set aside on disk, grouped into feature graphs.
+
+    Lines are grouped by their ID and Parent attributes with a union-find
+    structure over IDs, so that only the IDs and the byte offset of each
+    line are kept in memory.
+    """
+
+    def __init__(self, tempdir=None):
+        self.dirname = tempfile.mkdtemp(prefix='tag-spill-', dir=tempdir)
+        self.filename = os.path.join(self.dirname, 'features.gff3')
+        self.outstream = open(self.filename, 'wb')
+        self.offset = 0
+        self.groups = dict()
+        self.offsets = dict()
+
+    def _find(self, key):
+        groups = self.groups
+        while groups[key] != key:
+            groups[key] = groups[groups[key]]
+            key = groups[key]
+        return key
+
+    def _join(self, key, other):
+        if other not in self.groups:
+            self.groups[other] = other
+            self.offsets[other] = list()
+        key, other = self._find(key), self._find(other)
+        if key == other:
+            return
+        if len(self.offsets[key]) < len(self.offsets[other]):
+            key, other = other, key
+        self.groups[other] = key
+        self.offsets[key].extend(self.offsets.pop(other))
+
+    def add(self, feature, line=None):
+        """Write a feature line to disk, noting its ID and Parent."""
+        if line is None:
+            line = str(feature)
+        data = (line + '\n').encode('utf-8')
+        offset = self.offset
+        self.outstream.write(data)
+        self.offset += len(data)
+
+        key = feature.get_attribute('ID')
+        if key is None:
+            key = offset
+        if key not in self.groups:
+            self.groups[key] = key
+            self.offsets[key] = list()
+        self.offsets[self._find(key)].append(offset)
+        parentid = feature.get_attribute('Parent')
+        if parentid is not None:
+            parentids = parentid if isinstance(parentid, list) else [parentid]
+            for pid in parentids:
+                self._join(key, pid)
+
+    def graphs(self):
+        """Yield the lines of each feature graph, in order of appearance."""
+        self.outstream.close()
+        graphs = sorted(
+            (sorted(offsets) for offsets in self.offsets.values() if offsets),
+            key=itemgetter(0)
+        )
+        self.groups, self.offsets = None, None
+        with open(self.filename, 'rb') as instream:
+            for offsets in graphs:
+                lines = list()
+                for offset in offsets:
+                    instream.seek(offset)
+                    line = instream.readline().decode('utf-8')
+                    lines.append(line.rstrip('\n'))
+                yield lines
+        os.unlink(self.filename)
+
+    def close(self):
+        """Remove the spill file and any other files in its directory."""
+        if not self.outstream.closed:
+            self.outstream.close()
+        shutil.rmtree(self.dirname, ignore_errors=True)
+
+
 class RegionSet(object):
     def __init__(self):
         self.declared = dict()
@@ -84,6 +184,85 @@ class RegionSet(object):
                 raise AnnotationOutOfBoundsError(msg)
 
 
+class SymbolTable(dict):
+    """
+    Table of canonical string objects for frequently repeated values.
+
+    A genome annotation typically has only a handful of distinct sequence IDs,
+    sources, feature types, and attribute keys, each repeated on thousands or
+    millions of lines. Interning these strings through a symbol table ensures
+    that all features share a single copy of each value.
+
+    Attribute values are interned according to :code:`attrvalues`: set to
+    :code:`True` to intern all attribute values (except IDs), to a collection
+    of attribute keys to intern only the values of those attributes, or to
+    :code:`None` (the default) to leave attribute values alone.
+
+    >>> symbols = SymbolTable(attrvalues=['gbkey'])
+    >>> a = symbols.intern(''.join(['chr', '1']))
+    >>> b = symbols.intern(''.join(['chr', '1']))
+    >>> a is b
+    True
+    >>> symbols.interns_values('gbkey'), symbols.interns_values('Name')
+    (True, False)
+    """
+
+    def __init__(self, attrvalues=None):
+        dict.__init__(self)
+        self.attrvalues = attrvalues
+        if attrvalues not in (None, True):
+            self.attrvalues = frozenset(attrvalues)
+
+    def intern(self, string):
+        """Return the canonical copy of the given string."""
+        return self.setdefault(string, string)
+
+    def interns_values(self, attrkey):
+        """Indicate whether values of the given attribute are interned."""
+        if self.attrvalues is None:
+            return False
+        return self.attrvalues is True or attrkey in self.attrvalues
+
+
+class ReaderStats(object):
+    """
+    Runtime statistics for a GFF3Reader.
+
+    - :code:`lines`, :code:`bytes`: input lines and characters consumed
+      (characters and bytes are equivalent for ASCII data)
+    - :code:`features`: feature lines parsed
+    - :code:`merged`: feature lines merged into an existing multi-feature
+    - :code:`pseudofeatures`: pseudo-features created as parents of top-level
+      multi-features
+    - :code:`flushes`: blocks of sorted features resolved and emitted early
+      at a :code:`###` directive, or when the memory budget is exceeded
+    - :code:`peakbuffered`: largest number of records held in memory at once,
+      awaiting resolution; large values for sorted data usually indicate
+      missing :code:`###` directives
+    - :code:`spilled`: feature lines set aside on disk when the memory
+      budget is exceeded
+    - :code:`inferredregions`: :code:`##sequence-region` directives inferred
+      from feature coordinates
+
+    >>> reader = GFF3Reader(tag.tests.data_stream('grape-cpgat.gff3'))
+    >>> entries = list(reader)
+    >>> reader.stats.lines, reader.stats.features, reader.stats.merged
+    (33, 28, 4)
+    >>> reader.stats.asdict()['peakbuffered']
+    30
+    """
+
+    __slots__ = ('lines', 'bytes', 'features', 'merged', 'pseudofeatures',
+                 'flushes', 'peakbuffered', 'inferredregions', 'spilled')
+
+    def __init__(self):
+        for attr in self.__slots__:
+            setattr(self, attr, 0)
+
+    def asdict(self):
+        return dict((attr, getattr(self, attr)) for attr in self.__slots__)
+
+
 class GFF3Reader():
     """
     Loads sequence features and other GFF3 entries into memory.
@@ -120,65 +299,211 @@ class GFF3Reader():
 
     The :code:`strict` attribute enforces some additional sanity checks, which
     in some exceptional cases may need to be relaxed.
+
+    Setting :code:`trusted` to True skips per-feature validation (coordinates,
+    strand, phase, sequence bounds, and parent/child consistency) and the
+    inference of :code:`##sequence-region` directives. This is intended only
+    for re-reading data that has already been validated, such as the output
+    of :code:`tag gff3`.
+
+    When reading from a file, a :code:`tag.cache.AnnotationCache` can be
+    provided with the :code:`cache` attribute to skip parsing of unchanged
+    files. The file is then only opened if it must be parsed.
+
+    Sequence IDs, sources, feature types, and attribute keys are interned
+    through the reader's :code:`symbols` table (see :code:`SymbolTable`) to
+    reduce memory consumption. A table can be shared among readers by passing
+    it to the constructor, which is also how interning of attribute values is
+    configured. Set :code:`symbols` to :code:`False` to disable interning.
+
+    Memory consumption can be bounded by setting :code:`max_records` (the
+    number of feature lines awaiting resolution) and/or :code:`max_memory`
+    (in bytes, estimated from the length of the feature lines awaiting
+    resolution). When the budget is exceeded while reading sorted input,
+    feature graphs that are provably complete (they end before the current
+    position, and are not multi-features spanning it) are resolved and
+    emitted early. If that does not free up at least half of the budget,
+    or the input is not sorted, the remaining feature lines and all
+    subsequent ones are spilled to a temporary file in :code:`tempdir`,
+    grouped into feature graphs by ID. At the end of the input these are
+    resolved a batch of graphs at a time into sorted temporary files, which
+    are then merged, so the entries are the same as without a budget.
+    Directives and comments sort before all features, so when reading from
+    a file with a budget they are read ahead of the features. On other input
+    streams, a directive or comment following graphs emitted early is
+    reported as a sorting error unless :code:`checkorder` is False.
+
+    >>> infile = tag.tests.data_file('grape-cpgat.gff3')
+    >>> reader = GFF3Reader(infilename=infile, max_records=10)
+    >>> len(list(tag.select.features(reader)))
+    3
+    >>> reader.stats.spilled
+    28
+
+    Runtime statistics are collected in the reader's :code:`stats` attribute
+    (see :code:`ReaderStats`). When entries are loaded from a cache, the
+    statistics and sequence regions recorded when the file was parsed are
+    restored.
     """
 
     def __init__(self, instream=None, infilename=None, assumesorted=False,
-                 strict=True, checkorder=True):
+                 strict=True, checkorder=True, trusted=False, cache=None,
+                 symbols=None, max_records=None, max_memory=None,
+                 tempdir=None):
         assert (not instream) != (not infilename), (
             'provide either an instream or an infile name, not both'
         )
         self.instream = instream
-        if infilename:
-            self.infilename = infilename
+        self.infilename = infilename
+        if infilename and cache is None:
             self.instream = tag.open(infilename, 'r')
         self.assumesorted = assumesorted
         self.strict = strict
         self.checkorder = checkorder
+        self.trusted = trusted
+        self.cache = cache
+        self.symbols = SymbolTable() if symbols is None else symbols
+        if symbols is False:
+            self.symbols = None
+        self.max_records = max_records
+        self.max_memory = max_memory
+        self.tempdir = tempdir
         self.regions = RegionSet()
+        self.stats = ReaderStats()
         self._counter = 0
         self._prevrecord = None
+        self._spill = None
+        self._fasta = None
+        self._hoisted = False
 
     def __iter__(self):
         """Generator function returns GFF3 entries."""
+        if self.cache is not None and self.infilename is not None:
+            return tag.stages.iterate('parse', self.cache.entries(self))
+        return tag.stages.iterate('parse', self._parse())
+
+    def _rawlines(self):
+        stats = self.stats
+        for line in self.instream:
+            stats.lines += 1
+            stats.bytes += len(line)
+            yield line
+
+    def _parse(self):
+        if self.instream is None:
+            self.instream = tag.open(self.infilename, 'r')
+        self._start()
+        if self.infilename is not None and self._flushes_early():
+            self._hoist_directives(self.infilename)
+        try:
+            for obj in self._handle_lines(self._rawlines()):
+                yield obj
+            for obj in self._finish():
+                yield obj
+        finally:
+            if self._spill is not None:
+                self._spill.close()
+
+    def _start(self):
+        """Prepare to parse a new input."""
         self._reset()
-        for line in clean_lines(self.instream):
+        self._spill = None
+        self._fasta = None
+        self._hoisted = False
+
+    def _flushes_early(self):
+        """Whether feature graphs may be emitted before the end of input."""
+        budget = self.max_records or self.max_memory
+        return bool(budget) and self.assumesorted and self.strict
+
+    def _hoist_directives(self, infilename):
+        """
+        Read the directives and comments of a file ahead of its features.
+
+        Directives and comments sort before all features, so they must all be
+        known before feature graphs can be emitted early. The directives and
+        comments found in the body of the file are skipped when it is parsed.
+        """
+        with tag.open(infilename, 'r') as instream:
+            for line in clean_lines(instream):
+                if line == '##FASTA':
+                    break
+                if line.startswith('#') and line != '###':
+                    self._handle_special(line)
+        self._hoisted = True
+
+    def _handle_lines(self, rawlines):
+        """
+        Handle lines of GFF3, yielding entries as they are resolved.
+
+        The input can be provided in several batches of lines, followed by a
+        call to :code:`_finish`. Lines following a :code:`##FASTA` directive
+        are parsed as sequences at the end of the input.
+        """
+        rawlines = iter(rawlines)
+        if self._fasta is not None:
+            if not isinstance(self._fasta, list):
+                self._fasta = list(self._fasta)
+            self._fasta.extend(rawlines)
+            return
+        budget = self.max_records or self.max_memory
+        for line in clean_lines(rawlines):
             if line == '###':
                 for obj in self._handle_intermediate():
                     yield obj
             elif line == '##FASTA':
-                for sequence in parse_fasta(self.instream):
-                    self.records.append(sequence)
+                self._fasta = rawlines
                 break
             elif line.startswith('#'):
-                self._handle_special(line)
+                if not self._hoisted:
+                    self._handle_special(line)
             else:
                 self._handle_feature(line)
+                if budget and self._spill is None and self._overbudget():
+                    for obj in self._flush_complete():
+                        yield obj
+                    if self._overbudget(fraction=0.5):
+                        self._start_spill()
+
+    def _finish(self):
+        """Resolve and yield all remaining entries at the end of the input."""
+        if self._fasta is not None:
+            for sequence in parse_fasta(self._fasta):
+                self.records.append(sequence)
+            self._fasta = None
+        # Entries resolved at the end are sorted, but must still be checked
+        # against any emitted before the end
+        checkorder = self.checkorder and self.stats.flushes > 0
+        for obj in self._emit(self._resolve_features(), checkorder):
+            yield obj
 
-        for obj in self._resolve_features():
+    def _handle_intermediate(self):
+        if self.assumesorted or not self.checkorder:
+            self.stats.flushes += 1
+            for obj in self._emit(self._resolve_features()):
+                yield obj
+
+    def _emit(self, records, checkorder=None):
+        """Yield resolved records, checking their order if requested."""
+        if checkorder is None:
+            checkorder = self.checkorder
+        for obj in records:
             if self._counter == 0:
                 isv = isinstance(obj, Directive) and obj.type == 'gff-version'
                 if not isv:
                     self._prevrecord = Directive('##gff-version 3')
                     self._counter += 1
                     yield self._prevrecord
-
+            if checkorder:
+                if self._prevrecord and self._prevrecord > obj:
+                    msg = 'sorting error: {} > {}'.format(
+                        self._prevrecord.slug, obj.slug,
+                    )
+                    raise AnnotationSortingError(msg)
             self._prevrecord = obj
             self._counter += 1
             yield obj
 
-    def _handle_intermediate(self):
-        if self.assumesorted or not self.checkorder:
-            for obj in self._resolve_features():
-                if self.checkorder:
-                    if self._prevrecord and self._prevrecord > obj:
-                        msg = 'sorting error: {} > {}'.format(
-                            self._prevrecord.slug, obj.slug,
-                        )
-                        raise AnnotationSortingError(msg)
-                self._prevrecord = obj
-                self._counter += 1
-                yield obj
-
     def _handle_special(self, line):
         if line.startswith('##'):
             record = Directive(line)
@@ -189,8 +514,142 @@ class GFF3Reader():
         self.records.append(record)
 
     def _handle_feature(self, line):
-        feature = Feature.from_gff3(line)
-        self.regions.add_feature(feature)
+        feature = Feature.from_gff3(line, trusted=self.trusted,
+                                    symbols=self.symbols)
+        self.stats.features += 1
+        if self._spill is not None:
+            self._spill.add(feature, line)
+            self.stats.spilled += 1
+            return
+        self._bufferedchars += len(line)
+        self._lastfeature = feature
+        self._add_feature(feature)
+
+    def _overbudget(self, fraction=1.0):
+        if self.max_records:
+            if self._buffered > self.max_records * fraction:
+                return True
+        if self.max_memory:
+            estimate = self._bufferedchars * MEMORY_PER_CHAR
+            if estimate > self.max_memory * fraction:
+                return True
+        return False
+
+    def _flush_complete(self):
+        """
+        Resolve and yield complete feature graphs of sorted input.
+
+        In sorted input, a feature graph is complete if its top-level feature
+        ends before the start of the most recent feature, since the children
+        of a feature must fall within its bounds (when parsing strictly).
+        Top-level multi-features have no such bound. Complete graphs can only
+        be emitted if they sort before every incomplete graph.
+        """
+        if not self.assumesorted or not self.strict:
+            return
+        last = self._lastfeature
+        sort_key = tag.select.sort_key
+        complete, bound = list(), (4, last._seqid, last.start)
+        for record in self.records:
+            if not isinstance(record, Feature):
+                continue
+            nodes, ids = self._graph_nodes(record)
+            if nodes is None or record.is_multi or (
+                record._seqid == last._seqid and record.end > last.start
+            ):
+                bound = min(bound, sort_key(record))
+            else:
+                complete.append((record, nodes, ids))
+        complete = [c for c in complete if sort_key(c[0]) < bound]
+        if len(complete) == 0:
+            return
+
+        # Resolve the complete graphs, along with any directives and comments
+        # preceding them, setting aside everything else
+        flushed = set(id(record) for record, nodes, ids in complete)
+        records, featsbyid, featsbyparent = \
+            self.records, self.featsbyid, self.featsbyparent
+        buffered, numnodes = self._buffered, 0
+        self.records = [
+            r for r in records if isinstance(r, (Directive, Comment))
+        ]
+        flushed.update(id(record) for record in self.records)
+        self.featsbyid = dict()
+        self.featsbyparent = defaultdict(list)
+        for record, nodes, ids in complete:
+            self.records.append(record)
+            numnodes += nodes
+            for featureid in ids:
+                self.featsbyid[featureid] = featsbyid.pop(featureid)
+                if featureid in featsbyparent:
+                    children = featsbyparent.pop(featureid)
+                    self.featsbyparent[featureid] = children
+        with tag.stages.stage('resolve'):
+            resolved = self._resolve_records(infer=False)
+        self.records = [r for r in records if id(r) not in flushed]
+        self.featsbyid, self.featsbyparent = featsbyid, featsbyparent
+        self._buffered = buffered - numnodes
+        self._bufferedchars = self._bufferedchars * self._buffered // buffered
+        self.stats.flushes += 1
+        for obj in self._emit(resolved):
+            yield obj
+
+    def _graph_nodes(self, record):
+        """
+        Count the lines of a buffered feature graph and collect its IDs.
+
+        Returns :code:`(None, None)` if any feature of the graph has a parent
+        outside of the graph.
+        """
+        featureid = record.get_attribute('ID')
+        if featureid is None:
+            return 1, ()
+        ids = [featureid]
+        idset = set(ids)
+        nodes = 1 + len(record.siblings or ())
+        parentids = set()
+        i = 0
+        while i < len(ids):
+            for child in self.featsbyparent.get(ids[i], ()):
+                nodes += 1
+                childparents = child.get_attribute('Parent')
+                if isinstance(childparents, list):
+                    parentids.update(childparents)
+                childid = child.get_attribute('ID')
+                if childid is not None and childid not in idset:
+                    ids.append(childid)
+                    idset.add(childid)
+            i += 1
+        if not parentids.issubset(idset):
+            return None, None
+        return nodes, ids
+
+    def _start_spill(self):
+        """Move all buffered features to disk, and spill all later ones."""
+        self._spill = SpillFile(self.tempdir)
+        spilled = set()
+        features = list()
+        for record in self.records:
+            if isinstance(record, Feature):
+                features.append(record)
+                features.extend(record.siblings or ())
+        for children in self.featsbyparent.values():
+            features.extend(children)
+        for feature in features:
+            if id(feature) not in spilled:
+                spilled.add(id(feature))
+                self._spill.add(feature)
+        self.stats.spilled += len(spilled)
+        self.records = [r for r in self.records if not isinstance(r, Feature)]
+        self.featsbyid = dict()
+        self.featsbyparent = defaultdict(list)
+        self._buffered = 0
+        self._bufferedchars = 0
+
+    def _add_feature(self, feature):
+        self._buffered += 1
+        if not self.trusted:
+            self.regions.add_feature(feature)
         featureid = feature.get_attribute('ID')
         parentid = feature.get_attribute('Parent')
         if parentid is None:
@@ -212,14 +671,108 @@ class GFF3Reader():
                     )
                     raise FeatureTypeDisagreementError(msg)
                 other.add_sibling(feature)
+                self.stats.merged += 1
             else:
                 self.featsbyid[featureid] = feature
 
     def _resolve_features(self):
         """Resolve Parent/ID relationships and yield all top-level features."""
+        with tag.stages.stage('resolve'):
+            if self._spill is None:
+                records = self._resolve_records()
+            else:
+                records = self._resolve_spill()
+        for record in records:
+            yield record
+        self._reset()
+
+    def _resolve_spill(self):
+        """
+        Resolve the spilled feature graphs, a batch at a time.
+
+        Each batch is resolved and sorted as usual and stored in a sorted run
+        file (see :code:`tag.select.merge`). The runs are then merged along
+        with the records held in memory, :code:`RUN_FANIN` runs at a time.
+        """
+        spill, self._spill = self._spill, None
+        others = self.records
+        runs = list()
+
+        def resolve_batch(lines):
+            self.records = list()
+            self.featsbyid = dict()
+            self.featsbyparent = defaultdict(list)
+            for line in lines:
+                feature = Feature.from_gff3(
+                    line, trusted=self.trusted, symbols=self.symbols
+                )
+                self._add_feature(feature)
+            records = self._resolve_records(infer=False)
+            runfile = os.path.join(
+                spill.dirname, 'run{}'.format(len(runs) + 1)
+            )
+            # Small blocks keep the memory needed to merge many runs low
+            tag.select._write_run(
+                tag.select._keyed(records), runfile, blocksize=RUN_BLOCK_SIZE
+            )
+            runs.append(tag.select._read_run(runfile))
+
+        batch, chars = list(), 0
+        for lines in spill.graphs():
+            batch.extend(lines)
+            chars += sum(len(line) for line in lines)
+            self._buffered, self._bufferedchars = len(batch), chars
+            if self._overbudget(fraction=0.5):
+                resolve_batch(batch)
+                batch, chars = list(), 0
+        if batch:
+            resolve_batch(batch)
+
+        self.records = others
+        records = self._resolve_records()
+        runs.append(tag.select._keyed(records))
+        return self._merge_runs(runs, spill)
+
+    def _merge_runs(self, runs, spill):
+        try:
+            runcount = len(runs)
+            while len(runs) > RUN_FANIN:
+                merged = list()
+                for i in range(0, len(runs), RUN_FANIN):
+                    group = runs[i:i + RUN_FANIN]
+                    runcount += 1
+                    runfile = os.path.join(
+                        spill.dirname, 'run{}'.format(runcount)
+                    )
+                    tag.select._write_run(
+                        heapq.merge(*group, key=itemgetter(0)), runfile,
+                        blocksize=RUN_BLOCK_SIZE
+                    )
+                    merged.append(tag.select._read_run(runfile))
+                runs = merged
+            for key, record in heapq.merge(*runs, key=itemgetter(0)):
+                yield record
+        finally:
+            spill.close()
+
+    def _resolve_records(self, infer=True):
+        buffered = len(self.records)
+        for children in self.featsbyparent.values():
+            buffered += len(children)
+        self.stats.peakbuffered = max(self.stats.peakbuffered, buffered)
 
         for parentid in self.featsbyparent:
+            if parentid not in self.featsbyid:
+                raise MissingParentError(
+                    'parent feature "{}" not found'.format(parentid)
+                )
             parent = self.featsbyid[parentid]
+            if self.trusted:
+                if parent.children is None:
+                    parent.children = list()
+                parent.children.extend(self.featsbyparent[parentid])
+                parent.children.sort()
+                continue
             for child in self.featsbyparent[parentid]:
                 parent.add_child(child, rangecheck=self.strict)
 
@@ -239,8 +792,9 @@ class GFF3Reader():
                 record.siblings = None
             parent = newrep.pseudoify()
             self.records[n] = parent
+            self.stats.pseudofeatures += 1
 
-        if not self.assumesorted:
+        if infer and not self.assumesorted:
             for seqid in self.regions.inferred:
                 if seqid not in self.regions.declared:
                     seqrange = self.regions.inferred[seqid]
@@ -249,10 +803,10 @@ class GFF3Reader():
                     )
                     seqregion = Directive(srstring)
                     self.records.append(seqregion)
+                    self.stats.inferredregions += 1
 
-        for record in sorted(self.records):
-            yield record
-        self._reset()
+        with tag.stages.stage('sort'):
+            return sorted(self.records)
 
     def _reset(self):
         """Clear internal data structure."""
@@ -260,3 +814,6 @@ class GFF3Reader():
         self.featsbyid = dict()
         self.featsbyparent = defaultdict(list)
         self.countsbytype = dict()
+        self._buffered = 0
+        self._bufferedchars = 0
+        self._lastfeature = None
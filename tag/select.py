@@ -8,8 +8,12 @@
 # -----------------------------------------------------------------------------
 
 import heapq
-from itertools import chain
+from operator import itemgetter
+import os
+import shutil
+import tempfile
 import tag
+from tag.stages import timed
 
 
 def features(entrystream, type=None, traverse=False):
@@ -23,27 +27,29 @@ def features(entrystream, type=None, traverse=False):
                      to :code:`True` to search each feature graph for the
                      specified feature type
     """
-    def _typecheck(feat):
-        if isinstance(type, str):
-            return feat.type == type
-        return feat.type in type
-
     for feature in entry_type_filter(entrystream, tag.Feature):
         if traverse:
             if type is None:
                 message = 'cannot traverse without a specific feature type'
                 raise ValueError(message)
-            if _typecheck(feature):
+            if _typecheck(feature, type):
                 yield feature
             else:
                 for subfeature in feature:
-                    if _typecheck(subfeature):
+                    if _typecheck(subfeature, type):
                         yield subfeature
         else:
-            if not type or _typecheck(feature):
+            if not type or _typecheck(feature, type):
                 yield feature
 
 
+def _typecheck(feature, type):
+    """Check a feature against a single type or a collection of types."""
+    if isinstance(type, str):
+        return feature.type == type
+    return feature.type in type
+
+
 def window(featurestream, seqid, start=None, end=None, strict=True):
     """
     Pull features out of the designated genomic interval.
@@ -108,10 +114,293 @@ def entry_type_filter(entrystream, entryclass):
             yield entry
 
 
-def merge(*sorted_streams):
-    """Efficiently merge sorted annotation streams."""
-    heap = list()
-    heapq.heapify(heap)
-    streams = chain(sorted_streams)
-    for record in heapq.merge(heap, *streams):
-        yield record
+_TYPE_KEYS = dict()
+
+
+def _type_key(ftype):
+    """Sort key ordering feature types in reverse lexicographic order."""
+    key = _TYPE_KEYS.get(ftype)
+    if key is None:
+        # The trailing 0 sorts after any character, so that a type sorts
+        # before its own prefixes
+        key = tuple(-ord(c) for c in ftype) + (0,)
+        _TYPE_KEYS[ftype] = key
+    return key
+
+
+def sort_key(entry):
+    """
+    Compute a sort key for a GFF3 entry.
+
+    Sorting entries by key gives the same order as sorting the entries
+    themselves: the :code:`##gff-version` directive first, then
+    :code:`##sequence-region` directives, other directives, comments,
+    features, and finally sequences. Features are ordered by sequence ID,
+    coordinates, type (in reverse), and source. Comparing keys is much
+    cheaper than comparing entries, so the key of each entry should be
+    computed once and reused.
+
+    >>> gene = tag.Feature('chr1', 'gene', 999, 5000)
+    >>> mrna = tag.Feature('chr1', 'mRNA', 999, 5000)
+    >>> (sort_key(gene) < sort_key(mrna)) == (gene < mrna)
+    True
+    """
+    if isinstance(entry, tag.Feature):
+        rng = entry._range
+        ftype = entry.type if entry._pseudo else entry._type
+        return (4, entry._seqid, rng._start, rng._end, _type_key(ftype),
+                entry._source)
+    elif isinstance(entry, tag.Directive):
+        if entry.type == 'gff-version':
+            return (0,)
+        elif entry.type == 'sequence-region':
+            return (1, entry.seqid, entry.range._start, entry.range._end)
+        return (2, entry._rawdata)
+    elif isinstance(entry, tag.Comment):
+        return (3, entry._rawdata)
+    return (5, entry.seqid)
+
+
+def check_sorted(entrystream, label='stream'):
+    """
+    Pass entries through, checking that the features are sorted.
+
+    A ValueError identifying the stream by :code:`label` is raised at the
+    first feature that sorts before its predecessor.
+    """
+    prevkey, prevfeature = None, None
+    for entry in entrystream:
+        if isinstance(entry, tag.Feature):
+            key = sort_key(entry)
+            if prevkey is not None and key < prevkey:
+                message = '{} is not sorted: {} follows {}'.format(
+                    label, entry.slug, prevfeature.slug
+                )
+                raise ValueError(message)
+            prevkey, prevfeature = key, entry
+        yield entry
+
+
+def _keyed(entrystream):
+    for entry in entrystream:
+        yield sort_key(entry), entry
+
+
+def _write_run(keyedstream, filename, blocksize=tag.cache.BLOCK_SIZE):
+    """Store a sorted stream of keyed entries in a temporary run file."""
+    block = list()
+    with open(filename, 'wb') as fh:
+        for key, entry in keyedstream:
+            block.append((key, tag.cache.encode(entry)))
+            if len(block) == blocksize:
+                tag.cache._write_block(fh, block)
+                block = list()
+        if block:
+            tag.cache._write_block(fh, block)
+
+
+def _read_run(filename):
+    """Stream keyed entries back out of a run file, then delete it."""
+    decode = tag.cache.decode
+    size = os.path.getsize(filename)
+    with open(filename, 'rb') as fh:
+        while fh.tell() < size:
+            for key, record in tag.cache._read_block(fh):
+                yield key, decode(record)
+    os.unlink(filename)
+
+
+@timed('merge')
+def merge(*sorted_streams, fanin=None, validate=False, tempdir=None,
+          keyed=False):
+    """
+    Efficiently merge sorted annotation streams.
+
+    Entries are compared by sort key (see :code:`sort_key`), computed once
+    per entry. Entries with equal keys are kept in the order of their
+    streams.
+
+    When more than :code:`fanin` streams are provided, the streams are
+    merged in groups of :code:`fanin` into temporary run files in
+    :code:`tempdir`, and the runs are then merged, repeatedly if needed.
+    Only :code:`fanin` streams are read at a time, which avoids running out
+    of file handles when merging hundreds of files if each stream opens its
+    file lazily. With :code:`validate=True`, a ValueError is raised if the
+    features of any stream are not sorted. With :code:`keyed=True`, a
+    :code:`(key, entry)` tuple is yielded for each entry, so that consumers
+    can reuse the sort keys.
+
+    >>> reader1 = tag.GFF3Reader(tag.tests.data_stream('ex-red-1.gff3'))
+    >>> reader2 = tag.GFF3Reader(tag.tests.data_stream('ex-red-2.gff3'))
+    >>> for entry in merge(reader1, reader2, validate=True):
+    ...     if isinstance(entry, tag.Feature):
+    ...         print(entry.slug)
+    CDS@chr[11, 19]
+    CDS@chr[21, 29]
+    CDS@chr[41, 49]
+    CDS@chr[51, 59]
+    CDS@chr[71, 79]
+    CDS@chr[81, 89]
+    CDS@chr[101, 109]
+    CDS@chr[111, 119]
+    """
+    streams = list(sorted_streams)
+    if validate:
+        streams = [
+            check_sorted(stream, label='stream {}'.format(i + 1))
+            for i, stream in enumerate(streams)
+        ]
+    if fanin is None or len(streams) <= fanin:
+        if keyed:
+            streams = [_keyed(stream) for stream in streams]
+            for pair in heapq.merge(*streams, key=itemgetter(0)):
+                yield pair
+            return
+        for record in heapq.merge(*streams, key=sort_key):
+            yield record
+        return
+
+    # Keys are stored in the run files so they are computed only once
+    assert fanin > 1, 'merge fan-in must be at least 2'
+    streams = [_keyed(stream) for stream in streams]
+    rundir = tempfile.mkdtemp(prefix='tag-merge-', dir=tempdir)
+    try:
+        runcount = 0
+        while len(streams) > fanin:
+            runs = list()
+            for i in range(0, len(streams), fanin):
+                group = streams[i:i + fanin]
+                runcount += 1
+                runfile = os.path.join(rundir, 'run{}'.format(runcount))
+                _write_run(heapq.merge(*group, key=itemgetter(0)), runfile)
+                runs.append(_read_run(runfile))
+            streams = runs
+        for key, record in heapq.merge(*streams, key=itemgetter(0)):
+            yield (key, record) if keyed else record
+    finally:
+        shutil.rmtree(rundir, ignore_errors=True)
+
+
+def _toplevel_nodes(feature):
+    """The top-level feature, or each part of a top-level multi-feature."""
+    if feature.is_pseudo:
+        return feature.children
+    return [feature]
+
+
+def label_features(entrystream, attribute, value):
+    """
+    Record a value, such as a file name, in an attribute of each feature.
+
+    The value is added to the attribute of each top-level feature (or of each
+    part of a top-level multi-feature), in addition to any existing values.
+    """
+    for entry in entrystream:
+        if isinstance(entry, tag.Feature):
+            for node in _toplevel_nodes(entry):
+                node.add_attribute(attribute, value, append=True)
+        yield entry
+
+
+def graph_signature(feature, ignore=('ID', 'Parent')):
+    """
+    Compute a hashable signature of an entire feature graph.
+
+    The signature covers the structure of the graph and every field and
+    attribute of every feature in it, except for the attributes listed in
+    :code:`ignore`. By default ID and Parent are ignored, since feature IDs
+    typically differ between sources even for identical features, and the
+    relationships they encode are captured by the graph structure.
+    Identical feature graphs have equal signatures.
+    """
+    nodes = list(feature)
+    index = dict((node, i) for i, node in enumerate(nodes))
+    # Multi-features are identified by their first member rather than by
+    # their representative, which depends on the order of the input
+    multis = dict()
+    for i, node in enumerate(nodes):
+        if node.multi_rep is not None:
+            multis.setdefault(node.multi_rep, i)
+    signature = list()
+    for node in nodes:
+        attrs = tuple(sorted(
+            (key, value if isinstance(value, str) else tuple(sorted(value)))
+            for key, value in node._attrs.items() if key not in ignore
+        ))
+        children = ()
+        if node.children:
+            children = tuple(sorted(index[child] for child in node.children))
+        multirep = multis.get(node.multi_rep, -1)
+        signature.append((
+            node._seqid, node._source, node._type, node._range._start,
+            node._range._end, node._score.value, node._strand, node._phase,
+            attrs, children, multirep,
+        ))
+    return tuple(signature)
+
+
+@timed('collapse_duplicates')
+def collapse_duplicates(entrystream, attribute=None, maxbuffer=64):
+    """
+    Drop duplicate feature graphs from a sorted entry stream.
+
+    Feature graphs are duplicates if they have the same signature (see
+    :code:`graph_signature`). In a sorted stream, duplicates share the same
+    sort position: sequence ID, coordinates, type, and source (see
+    :code:`Feature.like`). Only features at the current position are
+    buffered, up to :code:`maxbuffer` distinct graphs, so memory consumption
+    does not grow with the size of the stream. If more distinct graphs share
+    a position, the oldest is emitted early and any later duplicates of it are
+    not detected.
+
+    If an :code:`attribute` is given (see :code:`label_features`), its values
+    are ignored when comparing graphs, and the values of each dropped
+    duplicate are added to the feature that is kept.
+
+    >>> reader1 = tag.GFF3Reader(tag.tests.data_stream('ex-red-1.gff3'))
+    >>> reader2 = tag.GFF3Reader(tag.tests.data_stream('ex-red-1.gff3'))
+    >>> merger = merge(label_features(reader1, 'merged_from', 'a'),
+    ...                label_features(reader2, 'merged_from', 'b'))
+    >>> for entry in collapse_duplicates(merger, attribute='merged_from'):
+    ...     if isinstance(entry, tag.Feature):
+    ...         print(entry.slug, entry.get_attribute('merged_from'))
+    CDS@chr[11, 19] ['a', 'b']
+    CDS@chr[41, 49] ['a', 'b']
+    CDS@chr[71, 79] ['a', 'b']
+    CDS@chr[101, 109] ['a', 'b']
+    """
+    ignore = ('ID', 'Parent')
+    if attribute is not None:
+        ignore += (attribute,)
+    position = None
+    buffer = dict()
+    for entry in entrystream:
+        if not isinstance(entry, tag.Feature):
+            for feature in buffer.values():
+                yield feature
+            buffer = dict()
+            position = None
+            yield entry
+            continue
+
+        key = sort_key(entry)
+        if key != position:
+            for feature in buffer.values():
+                yield feature
+            buffer = dict()
+            position = key
+        signature = graph_signature(entry, ignore=ignore)
+        kept = buffer.get(signature)
+        if kept is None:
+            if len(buffer) == maxbuffer:
+                oldest = next(iter(buffer))
+                yield buffer.pop(oldest)
+            buffer[signature] = entry
+        elif attribute is not None:
+            keptnodes = _toplevel_nodes(kept)
+            for node, dupnode in zip(keptnodes, _toplevel_nodes(entry)):
+                values = dupnode.get_attribute(attribute, as_list=True)
+                for value in values or []:
+                    node.add_attribute(attribute, value, append=True)
+    for feature in buffer.values():
+        yield feature
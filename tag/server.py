@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+"""
+Local HTTP service for region and ID queries against loaded annotations.
+
+Annotations are loaded once into an :code:`Index` and a :code:`NamedIndex`,
+and queries are answered over HTTP/1.1 with keep-alive connections. Requests
+are handled by a fixed pool of worker threads. Coordinates in requests and
+responses are 1-based and inclusive, as in GFF3.
+
+- :code:`GET /region?seqid=S&start=X&end=Y&strict=1`: features in a region;
+  with :code:`strict=0` (the default) overlapping features are returned, and
+  with :code:`strict=1` only contained features; omit :code:`end` to query
+  a single position
+- :code:`POST /regions`: batch region query; the request body is a JSON list
+  of objects with the same keys as the parameters of :code:`/region`
+- :code:`GET /feature?id=NAME`: feature by ID (or other attribute, see
+  :code:`AnnotationService`)
+- :code:`GET /seqids`: sequence IDs and their extents
+
+Responses are in GFF3 by default. Request JSON by adding :code:`format=json`
+to the query string or with an :code:`Accept: application/json` header.
+
+The service is read-only: annotations are loaded from GFF3 files at startup
+and cannot be updated while it runs. An :code:`AnnotationStore` (see
+:code:`tag.store`) is not served by :code:`tag serve`; query it directly.
+
+>>> import http.client
+>>> import threading
+>>> service = AnnotationService()
+>>> service.load(tag.tests.data_file('pcan-123.gff3.gz'))
+>>> server = AnnotationServer(service, port=0)
+>>> thread = threading.Thread(target=server.serve_forever, daemon=True)
+>>> thread.start()
+>>> conn = http.client.HTTPConnection('127.0.0.1', server.server_port)
+>>> conn.request('GET', '/region?seqid=scaffold_123&start=5001&end=6000')
+>>> gff3 = conn.getresponse().read().decode()
+>>> gff3.split('\\n')[1].split('\\t')[:5]
+['scaffold_123', 'EVM_PASA', 'gene', '5583', '5894']
+>>> conn.request('GET', '/feature?id=PCAN011a001813&format=json')
+>>> feature = json.loads(conn.getresponse().read().decode())
+>>> feature['type'], feature['start'], feature['end']
+('gene', 200029, 201298)
+>>> conn.close()
+>>> server.shutdown()
+>>> server.server_close()
+>>> thread.join()
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import tag
+from urllib.parse import urlsplit, parse_qs
+
+
+def feature_to_json(feature):
+    """Represent a feature graph as a JSON-serializable dictionary."""
+    data = dict(
+        seqid=feature.seqid, source=feature.source, type=feature.type,
+        start=feature.start + 1, end=feature.end, score=feature.score,
+        strand=feature.strand, phase=feature.phase,
+        attributes=dict(
+            (key, feature.get_attribute(key))
+            for key in feature.get_attribute_keys()
+        ),
+    )
+    if feature.is_pseudo:
+        data['pseudo'] = True
+    if feature.children:
+        data['children'] = [feature_to_json(c) for c in feature.children]
+    return data
+
+
+class QueryError(ValueError):
+    pass
+
+
+def _check_region(seqid, start, end=None):
+    """Reject a region (or a position, if end is None) outside the sequence."""
+    if end is None:
+        if start < 1:
+            raise QueryError('invalid position {}:{}'.format(seqid, start))
+    elif start < 1 or end < start:
+        msg = 'invalid region {}:{}-{}'.format(seqid, start, end)
+        raise QueryError(msg)
+
+
+class AnnotationService(object):
+    """
+    Annotations loaded into an interval index and a name index.
+
+    Features are indexed by name using the given :code:`attribute` (ID by
+    default). The query methods use 1-based inclusive coordinates. Up to
+    :code:`cachesize` region query results are cached (see
+    :code:`tag.index.Index`).
+    """
+
+    def __init__(self, attribute='ID', cachesize=0):
+        self.attribute = attribute
+        self.index = tag.index.Index(cachesize=cachesize)
+        self.names = tag.index.NamedIndex()
+
+    def load(self, infile, strict=True):
+        """Load the specified GFF3 file into both indexes."""
+        reader = tag.GFF3Reader(infilename=infile, strict=strict)
+        self.consume(reader)
+
+    def consume(self, entrystream):
+        """Load a stream of entries into both indexes."""
+        entries = list(entrystream)
+        self.index.consume(entries)
+        self.names.consume(entries, attribute=self.attribute)
+
+    def region(self, seqid, start, end=None, strict=False):
+        """Query for features in a region or at a position."""
+        _check_region(seqid, start, end)
+        if seqid not in self.index:
+            return list()
+        if end is None:
+            return self.index.query(seqid, start - 1)
+        return self.index.query(seqid, start - 1, end, strict=strict)
+
+    def regions(self, queries):
+        """
+        Query for features in many regions at once.
+
+        Each query is a tuple of arguments to :code:`region`. Results are
+        returned in the same order as the queries.
+        """
+        batches = {True: list(), False: list()}
+        for i, (seqid, start, end, strict) in enumerate(queries):
+            _check_region(seqid, start, end)
+            if end is None:
+                # Point queries ignore strictness; match region() for caching
+                strict = True
+            batches[bool(strict)].append((i, (seqid, start - 1, end)))
+        results = [None] * len(queries)
+        for strict, batch in batches.items():
+            if not batch:
+                continue
+            regions = [region for i, region in batch]
+            found = self.index.query_many(regions, strict=strict)
+            for (i, region), features in zip(batch, found):
+                results[i] = features
+        return results
+
+    def feature(self, name):
+        """Retrieve a feature by name, or None if it is not defined."""
+        if name not in self.names:
+            return None
+        return self.names[name]
+
+    def seqids(self):
+        result = list()
+        for seqid in self.index.seqids:
+            start, end = self.index.extent(seqid)
+            result.append(dict(seqid=seqid, start=start + 1, end=end))
+        return result
+
+
+def _region_args(params):
+    """Parse region query parameters from a dict of strings."""
+    try:
+        seqid = params['seqid']
+        start = int(params['start'])
+        end = params.get('end')
+        end = int(end) if end is not None else None
+    except KeyError as e:
+        raise QueryError('missing parameter {}'.format(e))
+    except (TypeError, ValueError) as e:
+        raise QueryError('invalid coordinate: {}'.format(e))
+    strict = str(params.get('strict', '0')).lower() in ('1', 'true', 'yes')
+    return seqid, start, end, strict
+
+
+class AnnotationRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'tag'
+    # Headers and body are sent separately; without TCP_NODELAY, Nagle's
+    # algorithm delays every response on a keep-alive connection
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _respond(self, status, body, contenttype):
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', contenttype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _respond_json(self, status, data):
+        self._respond(status, json.dumps(data), 'application/json')
+
+    def _respond_gff3(self, blocks):
+        lines = ['##gff-version 3']
+        for comment, features in blocks:
+            if comment is not None:
+                lines.append('# ' + comment)
+            for feature in features:
+                lines.append(repr(feature))
+                if feature.is_complex:
+                    lines.append('###')
+        self._respond(200, '\n'.join(lines) + '\n', 'text/plain')
+
+    def _wants_json(self, params):
+        if 'format' in params:
+            return params['format'] == 'json'
+        return 'application/json' in self.headers.get('Accept', '')
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+        service = self.server.service
+        try:
+            if url.path == '/region':
+                features = service.region(*_region_args(params))
+                if self._wants_json(params):
+                    data = [feature_to_json(f) for f in features]
+                    self._respond_json(200, data)
+                else:
+                    self._respond_gff3([(None, features)])
+            elif url.path == '/feature':
+                if 'id' not in params:
+                    raise QueryError('missing parameter "id"')
+                feature = service.feature(params['id'])
+                if feature is None:
+                    msg = 'no feature "{}"'.format(params['id'])
+                    self._respond_json(404, dict(error=msg))
+                elif self._wants_json(params):
+                    self._respond_json(200, feature_to_json(feature))
+                else:
+                    self._respond_gff3([(None, [feature])])
+            elif url.path == '/seqids':
+                self._respond_json(200, service.seqids())
+            else:
+                msg = 'unknown path "{}"'.format(url.path)
+                self._respond_json(404, dict(error=msg))
+        except QueryError as e:
+            self._respond_json(400, dict(error=str(e)))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        params = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if url.path != '/regions':
+            msg = 'unknown path "{}"'.format(url.path)
+            self._respond_json(404, dict(error=msg))
+            return
+        try:
+            try:
+                queries = json.loads(body.decode('utf-8'))
+            except ValueError:
+                raise QueryError('request body must be a JSON list')
+            if not isinstance(queries, list):
+                raise QueryError('request body must be a JSON list')
+            args = list()
+            for query in queries:
+                if not isinstance(query, dict):
+                    raise QueryError('each region must be a JSON object')
+                args.append(_region_args(query))
+            results = zip(args, self.server.service.regions(args))
+        except QueryError as e:
+            self._respond_json(400, dict(error=str(e)))
+            return
+        if self._wants_json(params):
+            data = [[feature_to_json(f) for f in fs] for _, fs in results]
+            self._respond_json(200, data)
+        else:
+            blocks = list()
+            for (seqid, start, end, strict), features in results:
+                region = '{}:{}-{}'.format(seqid, start, end or start)
+                blocks.append((region, features))
+            self._respond_gff3(blocks)
+
+
+class AnnotationServer(HTTPServer):
+    """
+    HTTP server answering queries against an :code:`AnnotationService`.
+
+    Connections are handled by a pool of :code:`threads` worker threads.
+    Connections are kept alive between requests, and closed after
+    :code:`timeout` seconds of inactivity to free up worker threads.
+    """
+
+    def __init__(self, service, host='127.0.0.1', port=8000, threads=8,
+                 timeout=5.0, verbose=False):
+        handler = type('Handler', (AnnotationRequestHandler,),
+                       dict(timeout=timeout))
+        HTTPServer.__init__(self, (host, port), handler)
+        self.service = service
+        self.verbose = verbose
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pragma: no cover
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+"""
+Lightweight instrumentation of processing stages.
+
+The reader, writer, and stream filters report when they start and stop
+working by way of the hooks in this module. By default no timer is active and
+the hooks do nothing. Calling :code:`enable` installs a :code:`StageTimer`
+that records wall time, CPU time, and peak memory for each stage.
+
+Stages nest: when the writer pulls an entry from the reader, time is charged
+to the reader until the entry is returned, and to the writer otherwise. Each
+stage is therefore charged only for the work it does itself. Time spent
+outside of any instrumented stage is charged to :code:`other`.
+
+>>> timer = tag.stages.enable()
+>>> reader = tag.GFF3Reader(tag.tests.data_stream('pdom-withseq.gff3'))
+>>> for entry in tag.transcript.primary_mrna(reader):
+...     pass
+>>> tag.stages.disable()
+>>> sorted(timer.stats)
+['other', 'parse', 'primary_mrna', 'resolve', 'sort']
+>>> timer.stats['resolve'].calls
+1
+"""
+
+from functools import wraps
+import sys
+import time
+import tracemalloc
+import tag
+
+
+_timer = None
+
+
+class StageStats(object):
+    """Cumulative statistics for a single stage."""
+
+    __slots__ = ('calls', 'wall', 'cpu', 'peakmem')
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peakmem = 0
+
+
+class StageTimer(object):
+    """
+    Record wall time, CPU time, and peak memory for nested stages.
+
+    Peak memory is measured with :code:`tracemalloc`, which slows down memory
+    allocation considerably. Set :code:`memory` to False to record only
+    timings.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stats = dict(other=StageStats())
+        self.stack = ['other']
+        self._tracing = False
+        self._wall = None
+        self._cpu = None
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def stop(self):
+        self._switch()
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _switch(self):
+        """Charge resources used since the last switch to the active stage."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        stats = self.stats[self.stack[-1]]
+        stats.wall += wall - self._wall
+        stats.cpu += cpu - self._cpu
+        if self.memory and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            stats.peakmem = max(stats.peakmem, peak)
+            if hasattr(tracemalloc, 'reset_peak'):  # pragma: no branch
+                tracemalloc.reset_peak()
+        self._wall, self._cpu = wall, cpu
+
+    def push(self, name):
+        self._switch()
+        self.stack.append(name)
+        if name not in self.stats:
+            self.stats[name] = StageStats()
+        self.stats[name].calls += 1
+
+    def pop(self):
+        self._switch()
+        self.stack.pop()
+
+    def report(self, outstream=None):
+        """Print a table of per-stage statistics (to stderr by default)."""
+        if outstream is None:
+            outstream = sys.stderr
+        template = '{:<16} {:>10} {:>10} {:>10} {:>10}'
+        print(template.format('stage', 'calls', 'wall(s)', 'cpu(s)',
+                              'peakmem'), file=outstream)
+        order = sorted(self.stats, key=lambda s: self.stats[s].wall,
+                       reverse=True)
+        for name in order:
+            stats = self.stats[name]
+            peak = '{:.1f}MB'.format(stats.peakmem / 1e6)
+            if not self.memory:
+                peak = '-'
+            print(template.format(
+                name, stats.calls, '{:.3f}'.format(stats.wall),
+                '{:.3f}'.format(stats.cpu), peak
+            ), file=outstream)
+
+
+class _Stage(object):
+    __slots__ = ('name', 'timer')
+
+    def __init__(self, name):
+        self.name = name
+        self.timer = None
+
+    def __enter__(self):
+        self.timer = _timer
+        if self.timer is not None:
+            self.timer.push(self.name)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.timer is not None:
+            self.timer.pop()
+
+
+def enable(memory=True):
+    """Install and start a new stage timer, and return it."""
+    global _timer
+    _timer = StageTimer(memory=memory)
+    _timer.start()
+    return _timer
+
+
+def disable():
+    """Stop and uninstall the active stage timer, if any."""
+    global _timer
+    if _timer is not None:
+        _timer.stop()
+    _timer = None
+
+
+def stage(name):
+    """Context manager charging the enclosed code to the named stage."""
+    return _Stage(name)
+
+
+def _timed_iter(timer, name, iterator):
+    iterator = iter(iterator)
+    while True:
+        timer.push(name)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timer.pop()
+        yield item
+
+
+def iterate(name, iterable):
+    """
+    Charge the work of producing each item of an iterable to the named stage.
+
+    When no timer is active the iterable is returned as is.
+    """
+    if _timer is None:
+        return iterable
+    return _timed_iter(_timer, name, iterable)
+
+
+def timed(name):
+    """Decorator charging the work of a generator function to a stage."""
+    def decorator(genfunc):
+        @wraps(genfunc)
+        def wrapper(*args, **kwargs):
+            return iterate(name, genfunc(*args, **kwargs))
+        return wrapper
+    return decorator
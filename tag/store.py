@@ -0,0 +1,417 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import marshal
+import os
+import struct
+import threading
+import tag
+from tag.cache import encode, decode
+
+
+FORMAT_VERSION = 1
+BATCH_SIZE = 1000
+
+
+def _read_record(fh):
+    """Read a record, or return None at the end of the (possibly torn) file."""
+    header = fh.read(8)
+    if len(header) < 8:
+        return None
+    size, = struct.unpack('<Q', header)
+    data = fh.read(size)
+    if len(data) < size:
+        return None
+    try:
+        return marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_record(fh, record):
+    data = marshal.dumps(record)
+    fh.write(struct.pack('<Q', len(data)) + data)
+
+
+class AnnotationStore(object):
+    """
+    Persistent index of feature graphs supporting incremental updates.
+
+    Top-level feature graphs are stored by name (the value of the
+    :code:`attribute` of the top-level feature, or its slug if it has none)
+    and can be added, replaced, and deleted by name or by region, and
+    queried by name or by region as with :code:`tag.index.Index`.
+
+    The store is a directory of append-only segment files. Each update is
+    appended to the newest segment as a single record and applied to the
+    in-memory index, so it takes time proportional to the size of the
+    update rather than of the annotation. When a segment grows beyond
+    :code:`segmentsize` bytes a new one is started, and once there are more
+    than :code:`maxsegments` segments they are merged in a background
+    thread by writing the current feature graphs to a new base segment.
+    Queries and updates continue while segments are compacted, and see
+    every update applied before them. On opening, the segments are replayed
+    from the most recent base segment; a record left incomplete by an
+    interrupted write is discarded.
+
+    With :code:`sync=True`, each update is flushed to disk before it is
+    applied. A store must not be opened by more than one process at a time.
+    Features returned by queries must not be modified in place: use
+    :code:`replace` instead.
+
+    >>> import shutil
+    >>> import tempfile
+    >>> storedir = tempfile.mkdtemp()
+    >>> store = AnnotationStore(storedir)
+    >>> store.consume_file(tag.tests.data_file('pcan-123.gff3.gz'))
+    >>> len(store)
+    70
+    >>> print(store['PCAN011a001813'].slug)
+    gene@scaffold_123[200029, 201298]
+    >>> store.delete('PCAN011a001813')
+    >>> gene = tag.Feature('scaffold_123', 'gene', 1000, 2000, strand='+',
+    ...                    attrstr='ID=gene1;Note=added')
+    >>> store.add(gene)
+    >>> store.delete_region('scaffold_125', 19000, 87000, strict=False)
+    ['PCAN011a001858', 'PCAN011a001859', 'PCAN011a001860']
+    >>> store.close()
+    >>> store = AnnotationStore(storedir)
+    >>> len(store), store['gene1'].get_attribute('Note')
+    (67, 'added')
+    >>> store.compact()  # a base segment, and a new one for updates
+    >>> store.segments
+    2
+    >>> store.close()
+    >>> shutil.rmtree(storedir)
+    """
+
+    def __init__(self, path, attribute='ID', segmentsize=1 << 26,
+                 maxsegments=8, sync=False):
+        self.path = path
+        self.attribute = attribute
+        self.segmentsize = segmentsize
+        self.maxsegments = maxsegments
+        self.sync = sync
+        self.index = tag.index.Index()
+        self._features = dict()
+        self._names = dict()
+        self._segments = list()
+        self._active = None
+        self._lock = threading.RLock()
+        self._compactor = None
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._load()
+
+    def _segment_path(self, number):
+        return os.path.join(self.path, '{:08d}.seg'.format(number))
+
+    def _load(self):
+        numbers = list()
+        for filename in os.listdir(self.path):
+            if filename.endswith('.tmp'):
+                # Left over from an interrupted compaction
+                os.remove(os.path.join(self.path, filename))
+            elif filename.endswith('.seg') and filename[:-4].isdigit():
+                numbers.append(int(filename[:-4]))
+        numbers.sort()
+
+        kinds = dict()
+        for number in numbers:
+            with open(self._segment_path(number), 'rb') as fh:
+                header = _read_record(fh)
+            if header is None:
+                kinds[number] = None
+            elif header[:2] != ('tag-store', FORMAT_VERSION):
+                raise ValueError('invalid store segment {}'.format(number))
+            else:
+                kinds[number] = header[2]
+        bases = [n for n in numbers if kinds[n] == 'base']
+        first = bases[-1] if bases else None
+        for number in numbers:
+            stale = first is not None and number < first
+            if kinds[number] is None or stale:
+                os.remove(self._segment_path(number))
+            else:
+                self._replay(number)
+                self._segments.append(number)
+
+        if self._segments:
+            number = self._segments[-1]
+            self._active = open(self._segment_path(number), 'ab')
+        else:
+            self._roll()
+
+    def _replay(self, number):
+        segfile = self._segment_path(number)
+        with open(segfile, 'rb') as fh:
+            _read_record(fh)
+            offset = fh.tell()
+            while True:
+                record = _read_record(fh)
+                if record is None:
+                    break
+                for operation in record:
+                    self._apply(operation)
+                offset = fh.tell()
+        if offset < os.path.getsize(segfile):
+            with open(segfile, 'r+b') as fh:
+                fh.truncate(offset)
+
+    def _roll(self, kind='delta'):
+        """Start a new segment for subsequent updates."""
+        if self._active is not None:
+            self._active.close()
+        number = self._segments[-1] + 1 if self._segments else 1
+        self._active = open(self._segment_path(number), 'wb')
+        _write_record(self._active, ('tag-store', FORMAT_VERSION, kind))
+        self._active.flush()
+        self._segments.append(number)
+
+    def _apply(self, operation):
+        name = operation[1]
+        old = self._features.pop(name, None)
+        if old is not None:
+            self.index.remove_feature(old)
+            del self._names[old]
+        if operation[0] == 'put':
+            feature = operation[2]
+            if isinstance(feature, tuple):
+                feature = decode(feature)
+            self.index.consume_feature(feature)
+            self._features[name] = feature
+            self._names[feature] = name
+
+    @staticmethod
+    def _check(feature):
+        """Check that a feature graph can be indexed before storing it."""
+        if not isinstance(feature, tag.Feature):
+            raise ValueError('expected Feature object')
+        if feature.start >= feature.end:
+            raise ValueError('cannot index empty feature ' + feature.slug)
+
+    def _commit(self, operations):
+        """
+        Append a batch of updates to the store and apply them.
+
+        Features are checked before anything is written, so that a record
+        that cannot be applied is never stored.
+        """
+        if not operations:
+            return
+        record = list()
+        for operation in operations:
+            if operation[0] == 'put':
+                self._check(operation[2])
+                record.append(('put', operation[1], encode(operation[2])))
+            else:
+                record.append(operation)
+        with self._lock:
+            _write_record(self._active, tuple(record))
+            self._active.flush()
+            if self.sync:
+                os.fsync(self._active.fileno())
+            for operation in operations:
+                self._apply(operation)
+            if self._active.tell() >= self.segmentsize:
+                self._roll()
+                if len(self._segments) > self.maxsegments:
+                    self.compact(wait=False)
+
+    def name(self, feature):
+        """The name under which a feature graph is stored."""
+        name = feature.get_attribute(self.attribute, as_string=True)
+        if name is None:
+            name = feature.slug
+        return name
+
+    def add(self, feature):
+        """Add a new top-level feature graph to the store."""
+        name = self.name(feature)
+        with self._lock:
+            if name in self:
+                raise ValueError('duplicate feature name "{}"'.format(name))
+            self._commit([('put', name, feature)])
+
+    def replace(self, feature, name=None):
+        """
+        Replace a feature graph in the store.
+
+        By default, the feature graph stored under the feature's own name is
+        replaced; to rename a feature graph, specify its current name. The
+        new name must not be in use by another feature graph.
+        """
+        newname = self.name(feature)
+        name = newname if name is None else name
+        with self._lock:
+            if name not in self:
+                raise IndexError(name)
+            operations = list()
+            if name != newname:
+                if newname in self:
+                    message = 'duplicate feature name "{}"'.format(newname)
+                    raise ValueError(message)
+                operations.append(('del', name))
+            operations.append(('put', newname, feature))
+            self._commit(operations)
+
+    def delete(self, name):
+        """Delete the feature graph with the given name."""
+        with self._lock:
+            if name not in self:
+                raise IndexError(name)
+            self._commit([('del', name)])
+
+    def delete_region(self, seqid, start, end=None, strict=True):
+        """
+        Delete the feature graphs in the specified range.
+
+        The range is interpreted as for :code:`tag.index.Index.query`.
+        Returns the names of the deleted feature graphs, in order of
+        position.
+        """
+        with self._lock:
+            features = self.query(seqid, start, end, strict=strict)
+            names = [self._names[feature] for feature in features]
+            self._commit([('del', name) for name in names])
+        return names
+
+    def consume(self, entrystream):
+        """
+        Add or replace all top-level feature graphs in a stream of entries.
+
+        Updates are appended in batches of :code:`BATCH_SIZE` feature graphs.
+        """
+        operations = list()
+        for feature in tag.select.features(entrystream):
+            operations.append(('put', self.name(feature), feature))
+            if len(operations) == BATCH_SIZE:
+                self._commit(operations)
+                operations = list()
+        self._commit(operations)
+
+    def consume_file(self, infile):
+        """Add or replace all feature graphs in the specified GFF3 file."""
+        reader = tag.reader.GFF3Reader(infilename=infile)
+        self.consume(reader)
+
+    def query(self, seqid, start, end=None, strict=True):
+        """Query the store for feature graphs in the specified range."""
+        with self._lock:
+            if seqid not in self.index:
+                return list()
+            return self.index.query(seqid, start, end, strict=strict)
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._features:
+                raise IndexError(name)
+            return self._features[name]
+
+    def __contains__(self, name):
+        return name in self._features
+
+    def __len__(self):
+        return len(self._features)
+
+    def __iter__(self):
+        """Iterate over the stored feature graphs in sorted order."""
+        with self._lock:
+            features = list(self._features.values())
+        features.sort(key=tag.select.sort_key)
+        for feature in features:
+            yield feature
+
+    @property
+    def names(self):
+        with self._lock:
+            names = sorted(self._features.keys())
+        for name in names:
+            yield name
+
+    @property
+    def segments(self):
+        """The number of segment files in the store."""
+        with self._lock:
+            return len(self._segments)
+
+    def compact(self, wait=True):
+        """
+        Merge all segments into a single base segment.
+
+        Subsequent updates are appended to a new segment, while the feature
+        graphs currently in the store are written to the base segment in a
+        background thread. With :code:`wait=False`, returns without waiting
+        for the thread to finish, and without starting a new compaction if
+        one is already running.
+        """
+        with self._lock:
+            running = self._compactor
+        if running is not None:
+            if not wait:
+                return
+            running.join()
+        with self._lock:
+            if self._compactor is None:
+                self._roll()
+                sealed = self._segments[:-1]
+                features = list(self._features.items())
+                self._compactor = threading.Thread(
+                    target=self._compact, args=(sealed, features)
+                )
+                self._compactor.daemon = True
+                self._compactor.start()
+            compactor = self._compactor
+        if wait:
+            compactor.join()
+
+    def _compact(self, sealed, features):
+        # Features are never modified in place, so the snapshot can be
+        # written without holding the lock
+        features.sort(key=lambda item: tag.select.sort_key(item[1]))
+        target = sealed[-1]
+        tmpfile = self._segment_path(target) + '.tmp'
+        try:
+            with open(tmpfile, 'wb') as fh:
+                _write_record(fh, ('tag-store', FORMAT_VERSION, 'base'))
+                for i in range(0, len(features), BATCH_SIZE):
+                    batch = features[i:i + BATCH_SIZE]
+                    _write_record(fh, tuple(
+                        ('put', name, encode(feature))
+                        for name, feature in batch
+                    ))
+                fh.flush()
+                os.fsync(fh.fileno())
+            with self._lock:
+                os.replace(tmpfile, self._segment_path(target))
+                for number in sealed[:-1]:
+                    os.remove(self._segment_path(number))
+                    self._segments.remove(number)
+        finally:
+            if os.path.exists(tmpfile):
+                os.remove(tmpfile)
+            with self._lock:
+                self._compactor = None
+
+    def close(self):
+        """Wait for any compaction to finish and close the store."""
+        with self._lock:
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+"""
+Sweep-line algorithms for comparing sorted annotation streams.
+
+Both streams are read once, in order, and only the features of one stream
+that may still overlap the current feature of the other are kept in memory.
+Features are compared in sorted order (see :code:`tag.select.sort_key`), so
+input must be sorted, as for :code:`tag.select.merge`.
+"""
+
+from itertools import groupby
+import heapq
+from operator import attrgetter
+import tag
+from tag.stages import timed
+
+
+def _typecheck(feature, type):
+    if isinstance(type, str):
+        return feature.type == type
+    return feature.type in type
+
+
+def sorted_features(entrystream, type=None):
+    """
+    Pull features out of a sorted entry stream, in sorted order.
+
+    By default top-level features are selected. If a feature type (or a
+    collection of types) is specified, each feature graph is searched for
+    features of that type. Subfeatures of overlapping graphs can be out of
+    order, so they are held in a heap until no later graph can contain a
+    feature that sorts before them.
+
+    >>> reader = tag.GFF3Reader(tag.tests.data_stream('grape-cpgat.gff3'))
+    >>> for exon in list(sorted_features(reader, type='exon'))[:3]:
+    ...     print(exon.slug)
+    exon@chr8[72, 167]
+    exon@chr8[349, 522]
+    exon@chr8[611, 702]
+    """
+    if type is None:
+        for feature in tag.select.features(entrystream):
+            yield feature
+        return
+
+    sort_key = tag.select.sort_key
+    heap = list()
+    counter = 0
+    for feature in tag.select.features(entrystream):
+        # Everything in a later graph sorts at or after this position
+        position = (4, feature._seqid, feature.start)
+        while heap and heap[0][0][:3] < position:
+            yield heapq.heappop(heap)[2]
+        for subfeature in feature:
+            if _typecheck(subfeature, type):
+                counter += 1
+                heapq.heappush(
+                    heap, (sort_key(subfeature), counter, subfeature)
+                )
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+@timed('intersect')
+def intersect(astream, bstream, minbp=1, minperc=0.0, strand=False,
+              atype=None, btype=None, validate=False):
+    """
+    Find the features of one sorted stream overlapping those of another.
+
+    For each feature of :code:`astream`, yields a tuple of the feature and a
+    list of the features of :code:`bstream` it overlaps, in sorted order.
+    Features of any type (see :code:`sorted_features`) can be selected from
+    either stream with :code:`atype` and :code:`btype`.
+
+    Overlaps must be at least :code:`minbp` bp and, if :code:`minperc` is
+    set, cover at least that fraction of both features, as in
+    :code:`tag.range.Range.overlap_atleast`. With :code:`strand=True`, only
+    features on the same strand are considered overlapping. With
+    :code:`validate=True`, a ValueError is raised if either stream is not
+    sorted.
+
+    Memory is bounded by the number of features of :code:`bstream` that
+    overlap a single feature of :code:`astream`, plus those overlapping
+    features still to come.
+
+    >>> glimmer = tag.GFF3Reader(
+    ...     tag.tests.data_stream('Ye.glimmer.min.gff3.gz')
+    ... )
+    >>> prodigal = tag.GFF3Reader(
+    ...     tag.tests.data_stream('Ye.prodigal.min.gff3.gz')
+    ... )
+    >>> for cds, overlaps in list(intersect(glimmer, prodigal))[:3]:
+    ...     print(cds.slug, len(overlaps), overlaps[-1].slug)
+    CDS@NC_008791.1[592, 1287] 2 CDS@NC_008791.1[1284, 1550]
+    CDS@NC_008791.1[1284, 1472] 2 CDS@NC_008791.1[1284, 1550]
+    CDS@NC_008791.1[1710, 2108] 1 CDS@NC_008791.1[1599, 2108]
+    """
+    assert minbp >= 1, 'must require at least 1bp overlap'
+    if validate:
+        astream = tag.select.check_sorted(astream, label='stream A')
+        bstream = tag.select.check_sorted(bstream, label='stream B')
+    bfeatures = sorted_features(bstream, type=btype)
+    nextb = next(bfeatures, None)
+    active = list()
+    for feature in sorted_features(astream, type=atype):
+        seqid, start, end = feature._seqid, feature.start, feature.end
+        if active and active[0]._seqid != seqid:
+            active = list()
+        while nextb is not None and nextb._seqid < seqid:
+            nextb = next(bfeatures, None)
+        while nextb is not None and nextb._seqid == seqid and \
+                nextb.start < end:
+            active.append(nextb)
+            nextb = next(bfeatures, None)
+        # Features of astream are sorted by start, so features of bstream
+        # ending before this one starts will never overlap again
+        active = [other for other in active if other.end > start]
+
+        overlaps = list()
+        length = end - start
+        for other in active:
+            if other.start >= end:
+                continue
+            if strand and other.strand != feature.strand:
+                continue
+            extent = min(end, other.end) - max(start, other.start)
+            if extent < minbp:
+                continue
+            if minperc and (extent / length < minperc or
+                            extent / (other.end - other.start) < minperc):
+                continue
+            overlaps.append(other)
+        yield feature, overlaps
+
+
+@timed('closest')
+def closest(astream, bstream, k=1, strand=False, direction=None, atype=None,
+            btype=None, validate=False):
+    """
+    Find the features of one sorted stream closest to those of another.
+
+    For each feature of :code:`astream`, yields a tuple of the feature and a
+    list of up to :code:`k` tuples of a feature of :code:`bstream` and its
+    distance, closest first (see :code:`tag.index.Index.nearest`). With
+    :code:`strand=True`, only features on the same strand are reported, and
+    :code:`direction` (:code:`upstream` or :code:`downstream`) is relative
+    to the strand of each feature of :code:`astream`; otherwise it is
+    relative to the reference sequence. Feature types and validation are
+    handled as for :code:`intersect`.
+
+    Features of :code:`bstream` are loaded into sorted arrays (see
+    :code:`tag.index.FeatureArrays`) one sequence at a time, so memory is
+    bounded by the number of features of :code:`bstream` on a single
+    sequence, and the features of :code:`astream` on each sequence are
+    answered in a single sweep over the arrays.
+
+    >>> glimmer = tag.GFF3Reader(
+    ...     tag.tests.data_stream('Ye.glimmer.min.gff3.gz')
+    ... )
+    >>> prodigal = tag.GFF3Reader(
+    ...     tag.tests.data_stream('Ye.prodigal.min.gff3.gz')
+    ... )
+    >>> results = closest(glimmer, prodigal, k=2, direction='downstream')
+    >>> for cds, neighbors in list(results)[:3]:
+    ...     print(cds.slug, [(other.start + 1, d) for other, d in neighbors])
+    CDS@NC_008791.1[592, 1287] [(628, 0), (1284, 0)]
+    CDS@NC_008791.1[1284, 1472] [(628, 0), (1284, 0)]
+    CDS@NC_008791.1[1710, 2108] [(1599, 0), (2291, 183)]
+    """
+    if validate:
+        astream = tag.select.check_sorted(astream, label='stream A')
+        bstream = tag.select.check_sorted(bstream, label='stream B')
+    bfeatures = sorted_features(bstream, type=btype)
+    nextb = next(bfeatures, None)
+    afeatures = sorted_features(astream, type=atype)
+    for seqid, group in groupby(afeatures, key=attrgetter('_seqid')):
+        while nextb is not None and nextb._seqid < seqid:
+            nextb = next(bfeatures, None)
+        others = list()
+        while nextb is not None and nextb._seqid == seqid:
+            others.append(nextb)
+            nextb = next(bfeatures, None)
+        if not strand:
+            arrays = tag.index.FeatureArrays(others)
+            queries = ((f.start, f.end, f) for f in group)
+            for feature, neighbors in arrays.nearest(queries, k, None,
+                                                     direction):
+                yield feature, neighbors
+            continue
+        # The queries on each strand are answered in a separate sweep over
+        # the features on that strand, and the results put back in order
+        group = list(group)
+        results = dict()
+        for fstrand in set(f.strand for f in group):
+            arrays = tag.index.FeatureArrays(
+                f for f in others if f.strand == fstrand
+            )
+            queries = [
+                (f.start, f.end, f) for f in group if f.strand == fstrand
+            ]
+            for feature, neighbors in arrays.nearest(queries, k, fstrand,
+                                                     direction):
+                results[id(feature)] = neighbors
+        for feature in group:
+            yield feature, results[id(feature)]
+
+
+def _diff_locus(olds, news, ignore):
+    """Match the feature graphs of a single locus in two annotations."""
+    signature = tag.select.graph_signature
+    unmatched = dict()
+    for key, feature in olds:
+        sig = signature(feature, ignore=ignore)
+        unmatched.setdefault(sig, list()).append((key, feature))
+    results, added = list(), list()
+    for key, feature in news:
+        matches = unmatched.get(signature(feature, ignore=ignore))
+        if matches:
+            oldkey, old = matches.pop(0)
+            results.append((key, 'unchanged', old, feature))
+        else:
+            added.append((key, feature))
+    removed = sorted(
+        (entry for entries in unmatched.values() for entry in entries),
+        key=lambda entry: entry[0]
+    )
+
+    # Pair up graphs of the same type and strand that overlap but differ
+    for key, feature in added:
+        for i, (oldkey, old) in enumerate(removed):
+            if old.type == feature.type and old.strand == feature.strand \
+                    and old.start < feature.end and feature.start < old.end:
+                results.append((key, 'changed', old, feature))
+                del removed[i]
+                break
+        else:
+            results.append((key, 'added', None, feature))
+    for key, feature in removed:
+        results.append((key, 'removed', feature, None))
+    results.sort(key=lambda result: (result[0], result[1]))
+    for key, status, old, new in results:
+        yield status, old, new
+
+
+@timed('diff')
+def diff(oldstream, newstream, ignore=('ID', 'Parent'), validate=False):
+    """
+    Compare two versions of a sorted annotation, one locus at a time.
+
+    Top-level feature graphs of both streams are grouped into loci of
+    overlapping graphs. Within each locus, graphs are matched by a structural
+    hash (see :code:`tag.select.graph_signature`) that ignores the attributes
+    listed in :code:`ignore`: by default ID and Parent, so that renumbered
+    IDs (such as those assigned by :code:`tag.GFF3Writer`) are not reported
+    as differences. Remaining graphs of the same type and strand that overlap
+    are paired as changed.
+
+    Yields a tuple of a status and the old and new versions of each graph:
+    :code:`unchanged` and :code:`changed` with both, :code:`removed` with only
+    the old version, and :code:`added` with only the new version (the other
+    is :code:`None`). Results are yielded in sorted order (by the new version
+    where there is one). With :code:`validate=True`, a ValueError is raised
+    if either stream is not sorted.
+
+    Memory is bounded by the number of feature graphs in a single locus.
+
+    >>> old = tag.GFF3Reader(tag.tests.data_stream('grape-cpgat.gff3'))
+    >>> new = tag.GFF3Reader(
+    ...     tag.tests.data_stream('grape-cpgat-shuffled.gff3')
+    ... )
+    >>> [status for status, oldgene, newgene in diff(old, new)]
+    ['unchanged', 'unchanged', 'unchanged']
+    >>> old = tag.GFF3Reader(tag.tests.data_stream('eden.gff3'))
+    >>> new = tag.GFF3Reader(tag.tests.data_stream('eden-mod.gff3'))
+    >>> for status, oldgene, newgene in diff(old, new):
+    ...     print(status, oldgene.get_attribute('Name'),
+    ...           newgene.get_attribute('Name'))
+    changed EDEN ['Aragorn', 'Gandalf']
+    """
+    if validate:
+        oldstream = tag.select.check_sorted(oldstream, label='old stream')
+        newstream = tag.select.check_sorted(newstream, label='new stream')
+    sort_key = tag.select.sort_key
+
+    def keyed(stream, origin):
+        for feature in tag.select.features(stream):
+            yield sort_key(feature), origin, feature
+
+    merged = heapq.merge(
+        keyed(oldstream, 0), keyed(newstream, 1), key=lambda item: item[0]
+    )
+    loci = (list(), list())
+    seqid, end = None, 0
+    for key, origin, feature in merged:
+        if feature._seqid != seqid or feature.start >= end:
+            for result in _diff_locus(loci[0], loci[1], ignore):
+                yield result
+            loci = (list(), list())
+            seqid, end = feature._seqid, feature.end
+        end = max(end, feature.end)
+        loci[origin].append((key, feature))
+    for result in _diff_locus(loci[0], loci[1], ignore):
+        yield result
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+from __future__ import print_function
+import random
+import tag
+
+
+def _gff3(seqid, ftype, start, end, strand, attrs, phase='.'):
+    """Format a single GFF3 line; start and end are 0-based half-open."""
+    return '\t'.join([
+        seqid, 'tag::synth', ftype, str(start + 1), str(end), '.', strand,
+        phase, attrs,
+    ])
+
+
+class GenomeSynthesizer(object):
+    """
+    Generate synthetic genome annotations in GFF3 format.
+
+    Data are generated deterministically from the random :code:`seed`, and
+    are produced line by line so that arbitrarily large outputs can be
+    streamed directly to a file. Memory consumption is bounded by the size of
+    a single gene (or a single shuffle window, see below).
+
+    :param seqs: number of sequences
+    :param seqlen: length of each sequence
+    :param density: number of genes per Mb of sequence
+    :param isoforms: maximum number of mRNAs per gene
+    :param exons: maximum number of exons per mRNA
+    :param multicds: encode the CDS of each mRNA as a multi-feature (several
+                     lines sharing a single ID); otherwise, each CDS segment
+                     is an independent feature without an ID
+    :param matches: number of :code:`cDNA_match` alignments (multi-features)
+                    per Mb of sequence
+    :param overlap: probability that a gene overlaps the previous gene
+    :param shuffle: if > 0, emit top-level feature graphs in shuffled order
+                    within windows of this size, and emit the lines of each
+                    feature graph in shuffled order; by default, output is
+                    sorted
+    :param separators: print a :code:`###` separator after each top-level
+                       feature graph
+    :param fasta: include random sequences in a :code:`##FASTA` section
+
+    >>> synth = GenomeSynthesizer(seqs=1, seqlen=20000, density=100, seed=1)
+    >>> lines = list(synth)
+    >>> lines[1]
+    '##sequence-region seq1 1 20000'
+    >>> reader = tag.GFF3Reader(lines)
+    >>> genes = list(tag.select.features(reader, type='gene'))
+    >>> len(genes)
+    1
+    >>> synth.counts['gene'], synth.counts['mRNA'], synth.counts['match']
+    (1, 3, 0)
+    """
+
+    def __init__(self, seqs=1, seqlen=1000000, density=100, isoforms=3,
+                 exons=6, multicds=True, matches=10, overlap=0.05,
+                 shuffle=0, separators=True, fasta=False, seed=42):
+        self.seqs = seqs
+        self.seqlen = seqlen
+        self.density = density
+        self.isoforms = isoforms
+        self.exons = exons
+        self.multicds = multicds
+        self.matches = matches
+        self.overlap = overlap
+        self.shuffle = shuffle
+        self.separators = separators
+        self.fasta = fasta
+        self.seed = seed
+        self.counts = dict(gene=0, mRNA=0, CDS=0, match=0)
+
+    def _nextid(self, prefix):
+        self.counts[prefix] += 1
+        return '{}{}'.format(prefix, self.counts[prefix])
+
+    @property
+    def seqids(self):
+        """Sequence IDs, zero-padded so that they sort lexicographically."""
+        width = len(str(self.seqs))
+        return ['seq{:0{}d}'.format(i + 1, width) for i in range(self.seqs)]
+
+    def __iter__(self):
+        self.counts = dict(gene=0, mRNA=0, CDS=0, match=0)
+        yield '##gff-version 3'
+        for seqid in self.seqids:
+            yield '##sequence-region {} 1 {}'.format(seqid, self.seqlen)
+
+        for seqid in self.seqids:
+            rng = random.Random('{}:{}'.format(self.seed, seqid))
+            graphs = self._graphs(seqid, rng)
+            if self.shuffle > 0:
+                graphs = self._shuffled(graphs, rng)
+            for lines in graphs:
+                for line in lines:
+                    yield line
+                if self.separators:
+                    yield '###'
+
+        if self.fasta:
+            yield '##FASTA'
+            for seqid in self.seqids:
+                rng = random.Random('{}:{}:seq'.format(self.seed, seqid))
+                yield '>' + seqid
+                for start in range(0, self.seqlen, 80):
+                    width = min(80, self.seqlen - start)
+                    yield ''.join(rng.choices('ACGT', k=width))
+
+    def write(self, outstream):
+        """Write the synthetic annotation to the given output stream."""
+        for line in self:
+            print(line, file=outstream)
+
+    def _shuffled(self, graphs, rng):
+        window = list()
+        for lines in graphs:
+            rng.shuffle(lines)
+            window.append(lines)
+            if len(window) == self.shuffle:
+                rng.shuffle(window)
+                for shuffled in window:
+                    yield shuffled
+                window = list()
+        rng.shuffle(window)
+        for shuffled in window:
+            yield shuffled
+
+    def _graphs(self, seqid, rng):
+        """
+        Generate feature graphs for a single sequence in sorted order.
+
+        Genes are laid out from left to right. Alignments are placed at
+        random positions and held in a buffer (sorted by position) until the
+        gene layout has moved past them.
+        """
+        meanlen = 1000 + self.exons * 400
+        meanspacing = 1e6 / self.density if self.density > 0 else 2 * 1e9
+        numaligns = int(round(self.seqlen / 1e6 * self.matches))
+        aligns = sorted(
+            rng.randrange(0, max(1, self.seqlen - 2000))
+            for _ in range(numaligns)
+        )
+        aligns.reverse()
+
+        cursor = int(rng.uniform(0, meanspacing))
+        prevstart, prevend = None, None
+        while True:
+            if prevstart is not None and rng.random() < self.overlap:
+                start = rng.randint(prevstart, prevend - 1)
+            else:
+                start = cursor
+            length = int(rng.uniform(0.5, 1.5) * meanlen)
+            if start + length > self.seqlen:
+                break
+            while aligns and aligns[-1] <= start:
+                yield self._alignment(seqid, aligns.pop(), rng)
+            yield self._gene(seqid, start, start + length, rng)
+            prevstart, prevend = start, start + length
+            cursor = max(cursor, start + length)
+            cursor += int(rng.uniform(0, 2) * max(0, meanspacing - meanlen))
+            cursor += 1
+        while aligns:
+            yield self._alignment(seqid, aligns.pop(), rng)
+
+    def _exons(self, start, end, count, rng):
+        """Partition an interval into the given number of exons."""
+        count = max(1, min(count, (end - start) // 60))
+        cuts = sorted(rng.sample(range(start + 30, end - 30), 2 * count - 2))
+        bounds = [start] + cuts + [end]
+        return [(bounds[i], bounds[i + 1]) for i in range(0, len(bounds), 2)]
+
+    def _gene(self, seqid, start, end, rng):
+        strand = rng.choice('+-')
+        geneid = self._nextid('gene')
+        lines = [_gff3(seqid, 'gene', start, end, strand,
+                       'ID={};Name=Synth{}'.format(geneid, geneid[4:]))]
+        exons = self._exons(start, end, rng.randint(1, self.exons), rng)
+        for i in range(rng.randint(1, self.isoforms)):
+            if i == 0 or len(exons) < 3:
+                isoexons = exons
+            else:
+                inner = [e for e in exons[1:-1] if rng.random() < 0.7]
+                isoexons = [exons[0]] + inner + [exons[-1]]
+            lines.extend(self._mrna(seqid, geneid, isoexons, strand, rng))
+        return lines
+
+    def _mrna(self, seqid, geneid, exons, strand, rng):
+        mrnaid = self._nextid('mRNA')
+        start, end = exons[0][0], exons[-1][1]
+        lines = [_gff3(seqid, 'mRNA', start, end, strand,
+                       'ID={};Parent={}'.format(mrnaid, geneid))]
+        for exstart, exend in exons:
+            lines.append(_gff3(seqid, 'exon', exstart, exend, strand,
+                               'Parent=' + mrnaid))
+
+        # Trim UTRs from the terminal exons to define the coding sequence
+        cds = list(exons)
+        utr5 = rng.randint(0, (cds[0][1] - cds[0][0]) // 3)
+        utr3 = rng.randint(0, (cds[-1][1] - cds[-1][0]) // 3)
+        cds[0] = (cds[0][0] + utr5, cds[0][1])
+        cds[-1] = (cds[-1][0], cds[-1][1] - utr3)
+        cdsattrs = 'Parent=' + mrnaid
+        if self.multicds:
+            cdsattrs = 'ID={};Parent={}'.format(self._nextid('CDS'), mrnaid)
+        ordered = cds if strand == '+' else list(reversed(cds))
+        translated = 0
+        phases = dict()
+        for segstart, segend in ordered:
+            phases[segstart] = str((3 - translated % 3) % 3)
+            translated += segend - segstart
+        for segstart, segend in cds:
+            lines.append(_gff3(seqid, 'CDS', segstart, segend, strand,
+                               cdsattrs, phase=phases[segstart]))
+        return lines
+
+    def _alignment(self, seqid, start, rng):
+        matchid = self._nextid('match')
+        strand = rng.choice('+-')
+        lines = list()
+        qstart = 1
+        segstart = start
+        for _ in range(rng.randint(1, 4)):
+            seglen = rng.randint(50, 400)
+            segend = min(segstart + seglen, self.seqlen)
+            if segend <= segstart:
+                break
+            attrs = 'ID={};Target={} {} {} +'.format(
+                matchid, 'cdna' + matchid[5:], qstart,
+                qstart + segend - segstart - 1
+            )
+            lines.append(_gff3(seqid, 'cDNA_match', segstart, segend, strand,
+                               attrs))
+            qstart += segend - segstart
+            segstart = segend + rng.randint(50, 500)
+        return lines
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+from __future__ import division
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+import tag
+
+
+STRANDS = ('.', '+', '-')
+
+
+def _require_numpy():
+    if numpy is None:  # pragma: no cover
+        raise ImportError('FeatureTable requires NumPy: pip install numpy')
+
+
+def _id_and_parents(attrstring):
+    """Pull the ID and Parent values out of a raw attribute string."""
+    fid, parents = None, None
+    for kvp in attrstring.split(';'):
+        if kvp.startswith('ID='):
+            fid = kvp[3:]
+        elif kvp.startswith('Parent='):
+            parents = kvp[7:].split(',')
+    return fid, parents
+
+
+class _Encoder(object):
+    """Assign an integer code to each distinct string value."""
+
+    def __init__(self):
+        self.codes = dict()
+        self.values = list()
+
+    def __call__(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class FeatureTable(object):
+    """
+    Columnar representation of genome features, backed by NumPy arrays.
+
+    Each row of the table corresponds to a single feature entry (a single line
+    of GFF3). Sequence IDs, feature types, and sources are stored as integer
+    codes into the :code:`seqids`, :code:`types`, and :code:`sources` lists.
+    Coordinates are 0-based half-open, as with :code:`Range`. Strand is stored
+    as a code into :code:`tag.table.STRANDS`, a missing phase as -1, and a
+    missing score as NaN. The :code:`parent` column holds the row index of each
+    feature's (first) parent, or -1 for top-level features. Raw attribute
+    strings are concatenated, and :code:`attr_offset` holds the boundaries of
+    each row's attributes.
+
+    Tables can be built directly from GFF3 data with :code:`from_file` or
+    :code:`from_stream`, which never create :code:`Feature` objects, or from
+    feature graphs with :code:`from_features`. The :code:`features` method
+    converts the table back into feature graphs on demand.
+
+    This class requires NumPy, which is an optional dependency of **tag**.
+    """
+
+    def __init__(self, seqids, types, sources, seqid, type, source, start,
+                 end, strand, phase, score, score_int, parent, attrdata,
+                 attr_offset):
+        _require_numpy()
+        self.seqids = seqids
+        self.types = types
+        self.sources = sources
+        self.seqid = seqid
+        self.type = type
+        self.source = source
+        self.start = start
+        self.end = end
+        self.strand = strand
+        self.phase = phase
+        self.score = score
+        self.score_int = score_int
+        self.parent = parent
+        self.attrdata = attrdata
+        self.attr_offset = attr_offset
+
+    @staticmethod
+    def _from_rows(rows, parents):
+        seqids, types, sources = _Encoder(), _Encoder(), _Encoder()
+        columns = [list() for _ in range(9)]
+        attrs = list()
+        offsets = [0]
+        for row in rows:
+            seqid, source, ftype, start, end, score, strand, phase, attr = row
+            columns[0].append(seqids(seqid))
+            columns[1].append(types(ftype))
+            columns[2].append(sources(source))
+            columns[3].append(start)
+            columns[4].append(end)
+            columns[5].append(STRANDS.index(strand))
+            columns[6].append(-1 if phase is None else phase)
+            columns[7].append(float('nan') if score is None else score)
+            columns[8].append(isinstance(score, int))
+            attrs.append(attr)
+            offsets.append(offsets[-1] + len(attr))
+
+        return FeatureTable(
+            seqids.values, types.values, sources.values,
+            numpy.array(columns[0], dtype=numpy.int32),
+            numpy.array(columns[1], dtype=numpy.int32),
+            numpy.array(columns[2], dtype=numpy.int32),
+            numpy.array(columns[3], dtype=numpy.int64),
+            numpy.array(columns[4], dtype=numpy.int64),
+            numpy.array(columns[5], dtype=numpy.int8),
+            numpy.array(columns[6], dtype=numpy.int8),
+            numpy.array(columns[7], dtype=numpy.float64),
+            numpy.array(columns[8], dtype=bool),
+            numpy.array(parents, dtype=numpy.int64), ''.join(attrs),
+            numpy.array(offsets, dtype=numpy.int64),
+        )
+
+    @staticmethod
+    def from_stream(instream):
+        """Build a table directly from a stream of GFF3 lines."""
+        _require_numpy()
+        rows, ids, parentids = list(), dict(), list()
+        for line in tag.reader.clean_lines(instream):
+            if line == '##FASTA':
+                break
+            if line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            assert len(fields) == 9
+            phase = None if fields[7] == '.' else int(fields[7])
+            score = tag.Score.from_str(fields[5]).value
+            attrstring = '' if fields[8] == '.' else fields[8]
+            fid, pids = _id_and_parents(attrstring)
+            if fid is not None and fid not in ids:
+                ids[fid] = len(rows)
+            parentids.append(pids[0] if pids else None)
+            rows.append((
+                fields[0], fields[1], fields[2], int(fields[3]) - 1,
+                int(fields[4]), score, fields[6], phase, attrstring,
+            ))
+        parents = list()
+        for pid in parentids:
+            if pid is not None and pid not in ids:
+                raise tag.reader.MissingParentError(
+                    'parent feature "{}" not found'.format(pid)
+                )
+            parents.append(-1 if pid is None else ids[pid])
+        return FeatureTable._from_rows(rows, parents)
+
+    @staticmethod
+    def from_file(infilename):
+        """Build a table directly from a GFF3 file."""
+        with tag.open(infilename, 'r') as instream:
+            return FeatureTable.from_stream(instream)
+
+    @staticmethod
+    def from_features(entrystream):
+        """Build a table from a stream of feature graphs."""
+        _require_numpy()
+        rows, parents = list(), list()
+        for feature in tag.select.features(entrystream):
+            rowindex = dict()
+            for subfeature in feature:
+                rowindex[subfeature] = len(rows)
+                parents.append(-1)
+                attrstring = subfeature.attributes
+                rows.append((
+                    subfeature.seqid, subfeature.source, subfeature.type,
+                    subfeature.start, subfeature.end, subfeature.score,
+                    subfeature.strand, subfeature.phase,
+                    '' if attrstring == '.' else attrstring,
+                ))
+            for subfeature, row in rowindex.items():
+                for child in subfeature.children or []:
+                    childrow = rowindex[child]
+                    if parents[childrow] == -1:
+                        parents[childrow] = row
+        return FeatureTable._from_rows(rows, parents)
+
+    def __len__(self):
+        return len(self.start)
+
+    def attributes(self, row):
+        """Raw attribute string of the given row."""
+        return self.attrdata[self.attr_offset[row]:self.attr_offset[row + 1]]
+
+    def feature(self, row):
+        """Create a :code:`Feature` object (sans subfeatures) for a row."""
+        score = None
+        if not numpy.isnan(self.score[row]):
+            score = self.score[row].item()
+            if self.score_int[row]:
+                score = int(score)
+        phase = self.phase[row].item()
+        return tag.Feature(
+            self.seqids[self.seqid[row]], self.types[self.type[row]],
+            self.start[row].item(), self.end[row].item(),
+            source=self.sources[self.source[row]], score=score,
+            strand=STRANDS[self.strand[row]],
+            phase=None if phase == -1 else phase,
+            attrstr=self.attributes(row),
+        )
+
+    def features(self, strict=True):
+        """
+        Convert the table to feature graphs.
+
+        ID/Parent relationships are resolved exactly as they are by
+        :code:`GFF3Reader`, and top-level features are yielded in sorted order.
+        """
+        lines = (str(self.feature(row)) for row in range(len(self)))
+        reader = tag.GFF3Reader(instream=lines, strict=strict)
+        for entry in tag.select.features(reader):
+            yield entry
+
+    def _code(self, values, value):
+        return values.index(value) if value in values else -1
+
+    def type_mask(self, type):
+        """Boolean mask selecting rows of the given type(s)."""
+        if isinstance(type, str):
+            type = [type]
+        codes = [self._code(self.types, t) for t in type]
+        return numpy.isin(self.type, codes)
+
+    def window_mask(self, seqid, start=None, end=None, strict=True):
+        """
+        Boolean mask selecting rows from the specified genomic interval.
+
+        Semantics are the same as for :code:`tag.select.window`.
+        """
+        mask = self.seqid == self._code(self.seqids, seqid)
+        if start and end:
+            if strict:
+                mask &= (self.start >= start) & (self.end <= end)
+            else:
+                mask &= (self.start < end) & (self.end > start)
+        return mask
+
+    def select(self, mask):
+        """
+        Create a new table containing only the rows selected by the mask.
+
+        Parent indices are remapped to the new table, or set to -1 if the
+        parent is not selected.
+        """
+        rows = numpy.flatnonzero(mask)
+        newindex = numpy.full(len(self) + 1, -1, dtype=numpy.int64)
+        newindex[rows] = numpy.arange(len(rows))
+        parent = newindex[self.parent[rows]]
+        lengths = self.attr_offset[rows + 1] - self.attr_offset[rows]
+        offsets = numpy.zeros(len(rows) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=offsets[1:])
+        attrdata = ''.join([self.attributes(r) for r in rows])
+        return FeatureTable(
+            self.seqids, self.types, self.sources, self.seqid[rows],
+            self.type[rows], self.source[rows], self.start[rows],
+            self.end[rows], self.strand[rows], self.phase[rows],
+            self.score[rows], self.score_int[rows], parent, attrdata, offsets,
+        )
+
+    def type_counts(self):
+        """Number of rows of each feature type."""
+        counts = numpy.bincount(self.type, minlength=len(self.types))
+        return dict(
+            (t, int(c)) for t, c in zip(self.types, counts) if c > 0
+        )
+
+    def lengths(self, type=None):
+        """Array of feature lengths, optionally for the given type(s) only."""
+        lengths = self.end - self.start
+        if type is not None:
+            lengths = lengths[self.type_mask(type)]
+        return lengths
+
+    def length_stats(self, type=None):
+        """Count, total, minimum, maximum, mean, and median feature length."""
+        lengths = self.lengths(type=type)
+        if len(lengths) == 0:
+            return dict(count=0, total=0, min=None, max=None, mean=None,
+                        median=None)
+        return dict(
+            count=len(lengths), total=int(lengths.sum()),
+            min=int(lengths.min()), max=int(lengths.max()),
+            mean=float(lengths.mean()), median=float(numpy.median(lengths)),
+        )
+
+    def coverage(self, type=None):
+        """
+        Number of nucleotides covered by features on each sequence.
+
+        Overlapping features are only counted once, as with :code:`tag occ`.
+        """
+        rows = numpy.arange(len(self))
+        if type is not None:
+            rows = numpy.flatnonzero(self.type_mask(type))
+        order = numpy.lexsort((self.start[rows], self.seqid[rows]))
+        rows = rows[order]
+        seqid, start, end = self.seqid[rows], self.start[rows], self.end[rows]
+        bounds = numpy.flatnonzero(seqid[1:] != seqid[:-1]) + 1
+        bounds = numpy.concatenate(([0], bounds, [len(rows)]))
+
+        result = dict()
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            if first == last:
+                continue
+            starts = start[first:last]
+            maxends = numpy.maximum.accumulate(end[first:last])
+            newblock = numpy.ones(len(starts), dtype=bool)
+            newblock[1:] = starts[1:] > maxends[:-1]
+            blockstarts = numpy.flatnonzero(newblock)
+            blockends = numpy.append(blockstarts[1:] - 1, len(starts) - 1)
+            covered = maxends[blockends] - starts[blockstarts]
+            result[self.seqids[seqid[first]]] = int(covered.sum())
+        return result
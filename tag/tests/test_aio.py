@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import asyncio
+from io import StringIO
+import pytest
+import tag
+from tag import GFF3Reader, GFF3Writer
+from tag.aio import AsyncGFF3Reader, AsyncGFF3Writer
+from tag.tests import data_file, data_stream
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(reader):
+    return [entry async for entry in reader]
+
+
+async def alines(infile):
+    for line in data_stream(infile):
+        yield line.encode()
+
+
+def sync_output(reader):
+    output = StringIO()
+    writer = GFF3Writer(reader, outfile=output)
+    writer.write()
+    return output.getvalue()
+
+
+@pytest.mark.parametrize('infile,kwargs', [
+    ('grape-cpgat-unsorted.gff3', dict()),
+    ('pdom-withseq.gff3', dict()),
+    ('amel-cdna-multi.gff3', dict()),
+    ('bogus-aligns.gff3', dict()),
+    ('Ypes-signalp-prot.gff3.gz', dict()),
+    ('amel-cdna-multi-out.gff3', dict(assumesorted=True)),
+    ('mito-trna.gff3', dict(strict=False)),
+    ('grape-cpgat-unsorted.gff3', dict(max_records=4)),
+    ('psyllid-100k.gff3', dict(assumesorted=True, max_memory=20000)),
+])
+def test_reader(infile, kwargs):
+    reader = GFF3Reader(infilename=data_file(infile), **kwargs)
+    expected = sync_output(reader)
+
+    areader = AsyncGFF3Reader(infilename=data_file(infile), batchsize=7,
+                              **kwargs)
+    assert sync_output(run(collect(areader))) == expected
+    assert areader.stats.asdict() == reader.stats.asdict()
+
+    areader = AsyncGFF3Reader(instream=data_stream(infile), **kwargs)
+    assert sync_output(run(collect(areader))) == expected
+
+
+def test_reader_async_instream():
+    expected = sync_output(GFF3Reader(data_stream('pdom-withseq.gff3')))
+    areader = AsyncGFF3Reader(instream=alines('pdom-withseq.gff3'),
+                              batchsize=10)
+    assert sync_output(run(collect(areader))) == expected
+
+
+def test_reader_budget(tmpdir):
+    infile = data_file('grape-cpgat-unsorted.gff3')
+    areader = AsyncGFF3Reader(infilename=infile, max_records=4)
+    run(collect(areader))
+    assert areader.stats.spilled > 0
+
+    with pytest.raises(ValueError) as ve:
+        cache = tag.cache.AnnotationCache(cachedir=str(tmpdir))
+        AsyncGFF3Reader(infilename=infile, cache=cache)
+    assert 'caching is not supported' in str(ve)
+
+
+def test_reader_budget_directives():
+    infile = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+    reader = GFF3Reader(infilename=infile, assumesorted=True)
+    expected = [repr(e) for e in reader]
+    areader = AsyncGFF3Reader(infilename=infile, assumesorted=True,
+                              max_records=50)
+    assert [repr(e) for e in run(collect(areader))] == expected
+    assert areader.stats.flushes > 0
+
+
+def test_reader_sorting_error():
+    infile = data_file('grape-cpgat-unsorted.gff3')
+    areader = AsyncGFF3Reader(infilename=infile, assumesorted=True)
+    with pytest.raises(tag.reader.AnnotationSortingError):
+        run(collect(areader))
+
+
+def test_writer(tmpdir):
+    infile = data_file('grape-cpgat-unsorted.gff3')
+    expected = sync_output(GFF3Reader(infilename=infile))
+
+    outfile = str(tmpdir.join('out.gff3.gz'))
+    areader = AsyncGFF3Reader(infilename=infile)
+    writer = AsyncGFF3Writer(areader, outfile=outfile, batchsize=3)
+    run(writer.write())
+    with tag.open(outfile, 'r') as fh:
+        assert fh.read() == expected
+    assert writer.stats.lines == expected.count('\n')
+    assert writer.stats.bytes == len(expected)
+
+    output = StringIO()
+    writer = AsyncGFF3Writer(GFF3Reader(infilename=infile), outfile=output)
+    writer.retainids = True
+    writer.complex_separators = False
+    assert writer.retainids and not writer.complex_separators
+    run(writer.write())
+    syncwriter = GFF3Writer(GFF3Reader(infilename=infile), StringIO())
+    syncwriter.retainids = True
+    syncwriter.complex_separators = False
+    syncwriter.write()
+    assert output.getvalue() == syncwriter.outfile.getvalue()
+
+
+def test_writer_stream(capsys):
+    async def serve():
+        received = list()
+
+        async def handle(streamreader, streamwriter):
+            received.append(await streamreader.read())
+            streamwriter.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        streamreader, streamwriter = await asyncio.open_connection(
+            '127.0.0.1', port
+        )
+        infile = data_file('pdom-withseq.gff3')
+        writer = AsyncGFF3Writer(AsyncGFF3Reader(infilename=infile),
+                                 outfile=streamwriter)
+        await writer.write()
+        streamwriter.close()
+        while not received:
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        return received[0].decode()
+
+    expected = sync_output(GFF3Reader(data_stream('pdom-withseq.gff3')))
+    assert run(serve()) == expected
+
+    run(AsyncGFF3Writer([tag.Directive('##gff-version 3')]).write())
+    terminal = capsys.readouterr()
+    assert terminal.out == '##gff-version 3\n'
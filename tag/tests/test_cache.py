@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import os
+import pytest
+import shutil
+import tag
+from tag.cache import AnnotationCache
+from tag.tests import data_file, data_stream
+
+
+def cached_files(cache):
+    return [f for f in os.listdir(cache.cachedir) if f.endswith('.tagc')]
+
+
+def reader_regions(reader):
+    declared = dict(
+        (seqid, repr(region))
+        for seqid, region in reader.regions.declared.items()
+    )
+    inferred = dict(
+        (seqid, (rng.start, rng.end))
+        for seqid, rng in reader.regions.inferred.items()
+    )
+    return declared, inferred
+
+
+@pytest.mark.parametrize('infile', [
+    'grape-cpgat.gff3',
+    'pbar-withseq.gff3',
+    'amel-cdna-multi.gff3',
+    'psyllid-cdnamatch.gff3',
+    'Ye.prodigal.gff3.gz',
+])
+def test_cache_roundtrip(infile, tmpdir):
+    cache = AnnotationCache(cachedir=str(tmpdir))
+    reader = tag.GFF3Reader(infilename=data_file(infile))
+    expected = [repr(e) for e in reader]
+    stats, regions = reader.stats.asdict(), reader_regions(reader)
+
+    for _ in range(2):
+        reader = tag.GFF3Reader(infilename=data_file(infile), cache=cache)
+        assert [repr(e) for e in reader] == expected
+        assert reader.stats.asdict() == stats
+        assert reader_regions(reader) == regions
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # On a cache hit, the input is never opened, and the statistics and
+    # regions are available before the first entry
+    reader = tag.GFF3Reader(infilename=data_file(infile), cache=cache)
+    entries = iter(reader)
+    next(entries)
+    assert reader.instream is None
+    assert reader.stats.asdict() == stats
+    assert reader_regions(reader) == regions
+    entries.close()
+
+    reader = tag.GFF3Reader(infilename=data_file(infile), cache=cache)
+    writer = tag.GFF3Writer(reader, outfile=str(tmpdir.join('out1.gff3')))
+    writer.write()
+    del writer
+    reader = tag.GFF3Reader(infilename=data_file(infile))
+    writer = tag.GFF3Writer(reader, outfile=str(tmpdir.join('out2.gff3')))
+    writer.write()
+    del writer
+    assert tmpdir.join('out1.gff3').read() == tmpdir.join('out2.gff3').read()
+
+
+def test_cache_invalidation(tmpdir):
+    cache = AnnotationCache(cachedir=str(tmpdir.mkdir('cache')))
+    infile = str(tmpdir.join('grape.gff3'))
+    shutil.copy(data_file('grape-cpgat.gff3'), infile)
+
+    list(tag.GFF3Reader(infilename=infile, cache=cache))
+    list(tag.GFF3Reader(infilename=infile, cache=cache, strict=False))
+    assert (cache.hits, cache.misses) == (0, 2)
+    list(tag.GFF3Reader(infilename=infile, cache=cache))
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    shutil.copy(data_file('grape-cpgat-shuffled.gff3'), infile)
+    entries = list(tag.GFF3Reader(infilename=infile, cache=cache))
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert len(cached_files(cache)) == 3
+
+
+def test_cache_incomplete(tmpdir):
+    cache = AnnotationCache(cachedir=str(tmpdir))
+    reader = tag.GFF3Reader(infilename=data_file('pcan-123.gff3.gz'),
+                            cache=cache)
+    entries = iter(reader)
+    next(entries)
+    entries.close()
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_cache_eviction(tmpdir):
+    cache = AnnotationCache(cachedir=str(tmpdir), maxsize=1)
+    for infile in ('grape-cpgat.gff3', 'pcan-123.gff3.gz'):
+        list(tag.GFF3Reader(infilename=data_file(infile), cache=cache))
+        assert len(cached_files(cache)) == 0
+
+    cache.maxsize = 1 << 20
+    for infile in ('grape-cpgat.gff3', 'pcan-123.gff3.gz'):
+        list(tag.GFF3Reader(infilename=data_file(infile), cache=cache))
+    assert len(cached_files(cache)) == 2
+    cache.clear()
+    assert len(cached_files(cache)) == 0
+
+
+def test_cache_instream(tmpdir):
+    cache = AnnotationCache(cachedir=str(tmpdir))
+    reader = tag.GFF3Reader(data_stream('grape-cpgat.gff3'), cache=cache)
+    assert len(list(reader)) == 5
+    assert (cache.hits, cache.misses) == (0, 0)
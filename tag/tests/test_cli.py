@@ -52,6 +52,19 @@ def test_gff3_strict(capsys):
     assert terminal.out == testout
 
 
+def test_gff3_budget(capsys, tmpdir):
+    infile = data_file('pcan-123.gff3.gz')
+    arglist = ['gff3', '-i', infile]
+    tag.cli.gff3.main(tag.cli.parser().parse_args(arglist))
+    expected = capsys.readouterr().out
+
+    for budget in (['--max-records', '20'], ['--max-memory', '100K']):
+        arglist = ['gff3', '-i', '--temp-dir', str(tmpdir)] + budget + [infile]
+        tag.cli.gff3.main(tag.cli.parser().parse_args(arglist))
+        assert capsys.readouterr().out == expected
+    assert tmpdir.listdir() == []
+
+
 @pytest.mark.parametrize('gff3,ftype,expected_output', [
     ('oluc-20kb.gff3', 'CDS', '14100\n'),
     ('bogus-aligns.gff3', 'cDNA_match', '7006\n'),
@@ -140,3 +153,225 @@ def test_pep2nuc_missing_id(capsys):
     terminal = capsys.readouterr()
     msg = '[tag::pep2nuc] WARNING: protein identifier "cds000008" not defined'
     assert msg in terminal.err
+
+
+def test_gff3_trusted(capsys):
+    arglist = ['gff3', '--trusted', data_file('mito-trna-out.gff3')]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.gff3.main(args)
+    terminal = capsys.readouterr()
+    testout = data_stream('mito-trna-out.gff3').read()
+    assert terminal.out == testout
+
+
+def test_gff3_cache(capsys, tmpdir):
+    infile = data_file('mito-trna.gff3')
+    arglist = ['gff3', '-r', '--cache', str(tmpdir), infile]
+    args = tag.cli.parser().parse_args(arglist)
+    testout = data_stream('mito-trna-out.gff3').read()
+    for _ in range(2):
+        tag.cli.gff3.main(args)
+        terminal = capsys.readouterr()
+        assert terminal.out == testout
+    assert len(tmpdir.listdir()) == 1
+
+
+def test_synth(capsys, tmpdir):
+    arglist = ['synth', '-l', '50000', '-n', '2', '-s', '7']
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.synth.main(args)
+    terminal = capsys.readouterr()
+    assert terminal.out.startswith('##gff-version 3\n')
+
+    outfile = str(tmpdir.join('synth.gff3.gz'))
+    args = tag.cli.parser().parse_args(arglist + ['-o', outfile])
+    tag.cli.synth.main(args)
+    with tag.open(outfile, 'r') as infile:
+        assert infile.read() == terminal.out
+
+
+def test_time_stages(capsys):
+    arglist = ['--time-stages', 'pmrna', data_file('pdom-withseq.gff3')]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.__main__.main(args)
+    terminal = capsys.readouterr()
+    stages = [line.split()[0] for line in terminal.err.strip().split('\n')]
+    assert stages[0] == 'stage'
+    assert sorted(stages[1:]) == [
+        'other', 'parse', 'primary_mrna', 'resolve', 'sort', 'write'
+    ]
+    assert tag.stages._timer is None
+
+
+def test_profile(capsys, tmpdir):
+    import pstats
+    statsfile = str(tmpdir.join('gff3.prof'))
+    infile = data_file('mito-trna.gff3')
+    arglist = ['--profile', statsfile, 'gff3', '-r', infile]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.__main__.main(args)
+    terminal = capsys.readouterr()
+    assert terminal.out == data_stream('mito-trna-out.gff3').read()
+    stats = pstats.Stats(statsfile)
+    functions = [func for filename, line, func in stats.stats]
+    assert '_resolve_features' in functions
+
+
+def test_merge_file_list(capsys, tmpdir):
+    infiles = sorted(glob.glob(data_file('ex-red-?.gff3')))
+    filelist = tmpdir.join('files.txt')
+    filelist.write('# inputs\n' + '\n'.join(infiles[1:]) + '\n\n')
+    arglist = ['merge', '--fan-in', '2', '--check-sorted', '--temp-dir',
+               str(tmpdir), '--file-list', str(filelist), infiles[0]]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.merge.main(args)
+    terminal = capsys.readouterr()
+    exp_out = data_stream('ex-red-merged.gff3').read()
+    assert terminal.out.strip() == exp_out.strip()
+    assert tmpdir.listdir() == [filelist]
+
+    args = tag.cli.parser().parse_args(['merge'])
+    with pytest.raises(ValueError) as ve:
+        tag.cli.merge.main(args)
+    assert 'no input files provided' in str(ve)
+
+
+def test_merge_unique(capsys):
+    infiles = [data_file('ex-red-1.gff3'), data_file('ex-red-2.gff3')]
+    arglist = ['merge', '--unique'] + infiles + infiles[:1]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.merge.main(args)
+    terminal = capsys.readouterr()
+    lines = terminal.out.strip().split('\n')
+    assert len([line for line in lines if '\tCDS\t' in line]) == 8
+    for infile in infiles:
+        origin = 'merged_from=' + infile
+        assert len([line for line in lines if line.endswith(origin)]) == 4
+
+
+@pytest.mark.parametrize('options', [
+    ['--sorted'],
+    ['--processes', '2', '--chunk-size', '1'],
+])
+def test_pmrna_streaming(options, capsys):
+    arglist = ['pmrna'] + options + [data_file('nanosplice.gff3')]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.pmrna.main(args)
+    terminal = capsys.readouterr()
+    exp_out = data_stream('nanosplice-primary.gff3').read()
+    if '--sorted' in options:
+        # Sequence regions are only inferred when the whole file is loaded
+        exp_out = '\n'.join(
+            line for line in exp_out.split('\n')
+            if not line.startswith('##sequence-region')
+        )
+    assert terminal.out.strip() == exp_out.strip()
+
+
+@pytest.mark.parametrize('options,count', [
+    ([], 4205),
+    (['--mode', 'nonoverlap'], 193),
+    (['--mode', 'count'], 4398),
+    (['--min-perc', '0.9', '--same-strand'], 3798),
+])
+def test_intersect(options, count, capsys):
+    arglist = ['intersect'] + options + [
+        data_file('Ye.glimmer.gff3.gz'), data_file('Ye.prodigal.gff3.gz'),
+    ]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.intersect.main(args)
+    terminal = capsys.readouterr()
+    lines = [ln for ln in terminal.out.split('\n') if '\tCDS\t' in ln]
+    assert len(lines) == count
+    if 'count' in options:
+        counts = [int(ln.split('overlap_count=')[1]) for ln in lines]
+        assert counts.count(0) == 193
+
+
+def test_closest(capsys):
+    arglist = [
+        'closest', '--num', '2', '--id-attr', 'Name',
+        data_file('Ye.prodigal.min.gff3.gz'),
+        data_file('Ye.glimmer.min.gff3.gz'),
+    ]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.closest.main(args)
+    terminal = capsys.readouterr()
+    lines = [ln for ln in terminal.out.split('\n') if '\tCDS\t' in ln]
+    assert len(lines) == 10
+    assert 'closest=orf00003,orf00002;closest_distance=0,127' in lines[2]
+
+
+def test_split(tmpdir):
+    pattern = str(tmpdir.join('{}.gff3.gz'))
+    arglist = ['split', '--size', '1K', '--max-open', '1', '--out', pattern,
+               data_file('pcan-123.gff3.gz')]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.split.main(args)
+    outfiles = sorted(glob.glob(str(tmpdir.join('*.gff3.gz'))))
+    assert len(outfiles) > 3
+    genes = 0
+    for outfile in outfiles:
+        reader = tag.GFF3Reader(infilename=outfile)
+        genes += len(list(tag.select.features(reader, type='gene')))
+    assert genes == 70
+
+    assert tag.cli.split.size('2M') == 2 * 1024 * 1024
+    assert tag.cli.split.size('1.5k') == 1536
+    for value in ('0', 'bogus'):
+        with pytest.raises(Exception):
+            tag.cli.split.size(value)
+
+
+def test_diff(capsys, tmpdir):
+    details = str(tmpdir.join('details.gff3'))
+    arglist = ['diff', '--details', details, data_file('eden.gff3'),
+               data_file('eden-mod.gff3')]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.diff.main(args)
+    terminal = capsys.readouterr()
+    assert terminal.out.split('\n')[-2] == 'total\t0\t1\t0\t0'
+    with open(details, 'r') as infile:
+        assert 'Name=Aragorn,Gandalf;diff=changed' in infile.read()
+
+    arglist = ['diff', '--ignore', 'Name', data_file('Ye.prodigal.gff3.gz'),
+               data_file('Ye.glimmer.gff3.gz')]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.diff.main(args)
+    terminal = capsys.readouterr()
+    header, seq1, seq2, total, _ = terminal.out.split('\n')
+    assert header == 'seqid\tunchanged\tchanged\tadded\tremoved'
+    assert seq1 == 'NC_008791.1\t0\t73\t12\t12'
+    assert seq2 == 'NC_008800.1\t0\t4027\t286\t141'
+    assert total == 'total\t0\t4100\t298\t153'
+
+
+def test_validate(capsys, tmpdir):
+    arglist = ['validate', data_file('pcan-123.gff3.gz')]
+    args = tag.cli.parser().parse_args(arglist)
+    tag.cli.validate.main(args)
+    terminal = capsys.readouterr()
+    assert terminal.out == ''
+
+    infile = data_file('vcar-out-of-bounds.gff3')
+    arglist = ['validate', '--max-errors', '3', infile]
+    args = tag.cli.parser().parse_args(arglist)
+    with pytest.raises(SystemExit) as se:
+        tag.cli.validate.main(args)
+    assert se.value.code == 1
+    terminal = capsys.readouterr()
+    outlines = terminal.out.strip().split('\n')
+    assert len(outlines) == 3
+    assert outlines[0] == (
+        infile + ':3: feature gene@NW_003307548.1[95396, 100541] out-of-bounds'
+    )
+    assert 'stopped after 3 errors' in terminal.err
+
+    outfile = str(tmpdir.join('errors.txt'))
+    arglist = ['validate', '-s', '-o', outfile,
+               data_file('grape-cpgat-unsorted.gff3')]
+    args = tag.cli.parser().parse_args(arglist)
+    with pytest.raises(SystemExit):
+        tag.cli.validate.main(args)
+    with open(outfile, 'r') as infh:
+        assert 'sorting error' in infh.read()
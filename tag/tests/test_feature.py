@@ -15,6 +15,7 @@ from tag import Range
 from tag import Score
 from tag import Sequence
 from tag import select
+from tag.reader import SymbolTable
 from tag.tests import data_file, data_stream
 
 
@@ -77,6 +78,12 @@ def test_basic():
         f999 = Feature.from_gff3('\t'.join(gff3))
     assert 'invalid strand "$"' in str(ve)
 
+    symbols = SymbolTable()
+    for kwargs in (dict(), dict(symbols=symbols), dict(trusted=True)):
+        with pytest.raises(AssertionError) as ae:
+            Feature.from_gff3('chr1\tfoo', **kwargs)
+        assert 'expected 9 tab-separated columns, found 2' in str(ae)
+
     f2 = Feature(
         'chr', 'gene', 1000, 2000, strand='+', attrstr='ID=gene1;Name=EDEN'
     )
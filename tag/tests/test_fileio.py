@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import bz2
+import gzip
+import lzma
+import pytest
+import struct
+import tag
+import zlib
+from tag.fileio import GzipReader, GzipWriter, MmapReader
+from tag.tests import data_file
+
+
+def test_reader_matches_gzip():
+    infile = data_file('pcan-123.gff3.gz')
+    with gzip.open(infile, 'rt') as fh:
+        expected = list(fh)
+    with GzipReader(infile, blocksize=997) as fh:
+        assert list(fh) == expected
+
+
+def test_reader_multi_member(tmpdir):
+    outfile = str(tmpdir.join('multi.gz'))
+    with open(outfile, 'wb') as fh:
+        fh.write(gzip.compress(b'one\ntw'))
+        fh.write(gzip.compress(b'o\nthree'))
+    with GzipReader(outfile) as fh:
+        assert fh.readline() == 'one\n'
+        assert fh.read() == 'two\nthree'
+        assert fh.readline() == ''
+
+
+def test_reader_newlines(tmpdir):
+    outfile = str(tmpdir.join('crlf.gz'))
+    with open(outfile, 'wb') as fh:
+        fh.write(gzip.compress(b'a\r\nb\rc\r\n\xc3\xa9\r\n'))
+    for blocksize in (1, 2, 3, 1024):
+        with GzipReader(outfile, blocksize=blocksize, maxblocks=2) as fh:
+            assert list(fh) == ['a\n', 'b\n', 'c\n', '\xe9\n']
+
+
+def test_reader_truncated(tmpdir):
+    outfile = str(tmpdir.join('trunc.gz'))
+    data = gzip.compress(b'chr1\tgene\n' * 1000)
+    with open(outfile, 'wb') as fh:
+        fh.write(data[:len(data) // 2])
+    with pytest.raises(EOFError) as ee:
+        with GzipReader(outfile) as fh:
+            list(fh)
+    assert 'ended before the end-of-stream marker' in str(ee)
+
+
+def test_reader_close_early():
+    infile = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+    fh = GzipReader(infile, blocksize=1024, maxblocks=1)
+    assert next(fh).startswith('#')
+    fh.close()
+    fh._thread.join(timeout=5)
+    assert not fh._thread.is_alive()
+    assert fh._raw.closed
+
+
+@pytest.mark.parametrize('bgzf,threads', [
+    (False, None),
+    (True, 1),
+    (True, 3),
+])
+def test_writer(bgzf, threads, tmpdir):
+    outfile = str(tmpdir.join('out.gz'))
+    lines = ['line {}\n'.format(i) for i in range(50000)]
+    with GzipWriter(outfile, bgzf=bgzf, threads=threads,
+                    blocksize=10000) as fh:
+        fh.writelines(lines)
+    with gzip.open(outfile, 'rt') as fh:
+        assert list(fh) == lines
+
+
+def test_writer_bgzf_blocks(tmpdir):
+    outfile = str(tmpdir.join('out.gff3.bgz'))
+    with tag.open(outfile, 'w') as fh:
+        fh.write('x' * 100000)
+    with open(outfile, 'rb') as fh:
+        data = fh.read()
+    offset, sizes = 0, list()
+    while offset < len(data):
+        assert data[offset + 12:offset + 16] == b'BC\x02\x00'
+        bsize, = struct.unpack('<H', data[offset + 16:offset + 18])
+        end = offset + bsize + 1
+        isize, = struct.unpack('<I', data[end - 4:end])
+        sizes.append(isize)
+        offset += bsize + 1
+    assert offset == len(data)
+    assert sizes == [65280, 34720, 0]
+
+
+def test_writer_closed(tmpdir):
+    fh = GzipWriter(str(tmpdir.join('out.gz')))
+    fh.close()
+    fh.close()
+    fh.flush()
+    with pytest.raises(ValueError) as ve:
+        fh.write('data\n')
+    assert 'closed file' in str(ve)
+
+
+def test_gff3_roundtrip(tmpdir):
+    infile = data_file('pcan-123.gff3.gz')
+    outfile = str(tmpdir.join('pcan.gff3.gz'))
+    writer = tag.GFF3Writer(tag.GFF3Reader(infilename=infile), outfile=outfile)
+    writer.retainids = True
+    writer.write()
+    writer.outfile.close()
+    entries = list(tag.GFF3Reader(infilename=outfile))
+    assert len(entries) == len(list(tag.GFF3Reader(infilename=infile)))
+
+
+@pytest.mark.parametrize('ext', ['txt', 'gz', 'bgz', 'bz2', 'xz'])
+def test_append(ext, tmpdir):
+    outfile = str(tmpdir.join('out.' + ext))
+    with tag.open(outfile, 'w') as fh:
+        fh.write('one\n')
+    with tag.open(outfile, 'a') as fh:
+        fh.write('two\n')
+    with tag.open(outfile, 'r') as fh:
+        assert list(fh) == ['one\n', 'two\n']
+
+
+@pytest.mark.parametrize('ext,module', [
+    ('bz2', bz2),
+    ('xz', lzma),
+])
+def test_codecs(ext, module, tmpdir):
+    outfile = str(tmpdir.join('pcan.gff3.' + ext))
+    reader = tag.GFF3Reader(infilename=data_file('pcan-123.gff3.gz'))
+    writer = tag.GFF3Writer(reader, outfile=outfile)
+    writer.retainids = True
+    writer.write()
+    writer.outfile.close()
+    assert tag.fileio.detect_codec(outfile).suffixes == ('.' + ext,)
+    with module.open(outfile, 'rt') as fh:
+        expected = list(fh)
+    with tag.open(outfile, 'r', buffersize=1000) as fh:
+        assert list(fh) == expected
+
+    # Detection by magic bytes rather than by file name
+    misnamed = str(tmpdir.join('pcan.gff3'))
+    with open(outfile, 'rb') as infh, open(misnamed, 'wb') as outfh:
+        outfh.write(infh.read())
+    entries = list(tag.GFF3Reader(infilename=misnamed))
+    assert len(list(tag.select.features(entries))) == 70
+
+
+def test_codec_detection(tmpdir):
+    plain = str(tmpdir.join('plain.gff3.gz'))
+    with open(plain, 'w') as fh:
+        fh.write('##gff-version 3\n')
+    assert tag.fileio.detect_codec(plain) is None
+    with tag.open(plain, 'r') as fh:
+        assert fh.read() == '##gff-version 3\n'
+
+    empty = str(tmpdir.join('empty.gff3'))
+    open(empty, 'w').close()
+    assert tag.fileio.detect_codec(empty) is None
+    with tag.open(empty, 'r') as fh:
+        assert list(fh) == []
+    assert tag.fileio.detect_codec(str(tmpdir)) is None
+
+
+def test_open_mode(tmpdir):
+    infile = data_file('gzipdata.gff3.gz')
+    with open(infile, 'rb') as fh:
+        data = fh.read()
+    outfile = str(tmpdir.join('copy.gff3.gz'))
+    with open(outfile, 'wb') as fh:
+        fh.write(data)
+    with tag.fileio.open(outfile, 'rt') as fh:
+        assert isinstance(fh, GzipReader)
+        assert fh.read() == gzip.decompress(data).decode()
+    for mode in ('rb', 'wb', 'r+', 'x'):
+        with pytest.raises(ValueError, match='invalid mode'):
+            tag.fileio.open(outfile, mode)
+        with pytest.raises(ValueError, match='invalid mode'):
+            tag.open(outfile, mode)
+    with open(outfile, 'rb') as fh:
+        assert fh.read() == data
+
+
+def test_register_codec(tmpdir):
+    codec = tag.fileio.Codec.streaming(
+        'deflate', b'\x78\x9c', ('.zz',), zlib.decompressobj, zlib.compressobj
+    )
+    tag.fileio.register_codec(codec)
+    try:
+        outfile = str(tmpdir.join('out.zz'))
+        with tag.open(outfile, 'w') as fh:
+            fh.write('one\ntwo\n')
+        with open(outfile, 'rb') as fh:
+            assert fh.read(2) == b'\x78\x9c'
+        with tag.open(outfile, 'r') as fh:
+            assert list(fh) == ['one\n', 'two\n']
+    finally:
+        tag.fileio._codecs.remove(codec)
+
+
+def test_zstd_missing(tmpdir):
+    if tag.fileio.zstd is not None or tag.fileio.zstandard is not None:
+        pytest.skip('Zstandard support is available')
+    outfile = str(tmpdir.join('out.gff3.zst'))
+    with pytest.raises(ImportError) as ie:
+        tag.open(outfile, 'w')
+    assert 'pip install zstandard' in str(ie)
+    with open(outfile, 'wb') as fh:
+        fh.write(b'\x28\xb5\x2f\xfd\x00\x00')
+    with pytest.raises(ImportError):
+        tag.open(outfile, 'r')
+
+
+@pytest.mark.parametrize('data,expected', [
+    (b'one\ntwo\nthree', ['one\n', 'two\n', 'three']),
+    (b'a\r\nb\rc\r\n\xc3\xa9\r\n', ['a\n', 'b\n', 'c\n', '\xe9\n']),
+    (b'', []),
+])
+def test_mmap_reader(data, expected, tmpdir):
+    infile = str(tmpdir.join('in.txt'))
+    with open(infile, 'wb') as fh:
+        fh.write(data)
+    for blocksize in (1, 2, 1024):
+        with MmapReader(infile, blocksize=blocksize) as fh:
+            assert list(fh) == expected
+    with tag.fileio.open(infile, 'r', usemmap=True) as fh:
+        assert isinstance(fh, MmapReader)
+        assert fh.readline() == (expected[0] if expected else '')
+        assert fh.read() == ''.join(expected[1:])
+    fh.close()
+
+
+def test_mmap_threshold(tmpdir, monkeypatch):
+    infile = data_file('grape-cpgat.gff3')
+    expected = [repr(e) for e in tag.GFF3Reader(infilename=infile)]
+    monkeypatch.setattr(tag.fileio, 'MMAP_THRESHOLD', 1000)
+    reader = tag.GFF3Reader(infilename=infile)
+    assert isinstance(reader.instream, MmapReader)
+    assert [repr(e) for e in reader] == expected
@@ -8,6 +8,7 @@
 # -----------------------------------------------------------------------------
 
 import pytest
+import random
 import tag
 from tag.tests import data_file, data_stream
 
@@ -89,6 +90,74 @@ def test_query():
     assert len(index.query('NW_015379189.1', 5000, 15000, strict=False)) == 4
 
 
+def test_remove_feature():
+    index = tag.index.Index(cachesize=10)
+    index.consume_file(data_file('osat-twoscaf.gff3.gz'))
+    features = index.query('NW_015379189.1', 5000, 15000, strict=False)
+    assert len(index.nearest('NW_015379189.1', 5000, k=10)) == 5
+    index.remove_feature(features[0])
+    assert index.query('NW_015379189.1', 5000, 15000, strict=False) == \
+        features[1:]
+    assert len(index.nearest('NW_015379189.1', 5000, k=10)) == 4
+    with pytest.raises(ValueError):
+        index.remove_feature(features[0])
+
+    for feature in list(tag.select.features(index)):
+        if feature.seqid == 'NW_015379189.1':
+            index.remove_feature(feature)
+    assert 'NW_015379189.1' not in index
+    with pytest.raises(ValueError) as ve:
+        index.remove_feature(features[1])
+    assert 'feature not in index' in str(ve)
+
+
+@pytest.mark.parametrize('strict', [True, False])
+def test_query_many(strict):
+    index = tag.index.Index()
+    index.consume_file(data_file('pcan-123.gff3.gz'))
+    rng = random.Random(1)
+    regions = [('chrZ', 100, 200)]
+    for seqid in index.seqids:
+        start, end = index.extent(seqid)
+        for _ in range(200):
+            qstart = rng.randint(start, end)
+            qend = qstart + rng.choice([1, 500, 5000, 50000])
+            regions.append((seqid, qstart, qend))
+            regions.append((seqid, qstart))
+    rng.shuffle(regions)
+    results = index.query_many(regions, strict=strict)
+    assert 'chrZ' not in index
+    for region, features in zip(regions, results):
+        if region[0] == 'chrZ':
+            assert features == []
+            continue
+        expected = index.query(*region, strict=strict)
+        assert [f.slug for f in features] == [f.slug for f in expected]
+
+
+def test_query_cache():
+    index = tag.index.Index(cachesize=2)
+    index.consume_file(data_file('osat-twoscaf.gff3.gz'))
+    seqid = 'NW_015379189.1'
+    first = index.query(seqid, 5000, 15000, strict=False)
+    first.pop()
+    assert len(index.query(seqid, 5000, 15000, strict=False)) == 4
+    assert (index.cache_hits, index.cache_misses) == (1, 1)
+
+    index.query_many([(seqid, 5000), (seqid, 5000, 15000)], strict=False)
+    assert (index.cache_hits, index.cache_misses) == (2, 2)
+    index.query(seqid, 1, 2)
+    assert len(index._cache) == 2
+    index.query(seqid, 5000, 15000, strict=False)
+    assert (index.cache_hits, index.cache_misses) == (2, 4)
+
+    feature = tag.Feature(seqid, 'gene', 6000, 7000)
+    index.consume_feature(feature)
+    assert len(index._cache) == 0
+    results = index.query_many([(seqid, 5000, 15000)], strict=False)
+    assert len(results[0]) == 5
+
+
 def test_named_index():
     index = tag.index.NamedIndex()
     index.consume_file(data_file('pdom-withseq.gff3'))
@@ -112,3 +181,140 @@ def test_named_index_name():
         'XP_001415362.1', 'XP_001415363.1', 'XP_001415708.1', 'XP_001415709.1',
         'XP_001415710.1', 'XP_001415711.1'
     ]
+
+
+@pytest.mark.parametrize('infile,attribute', [
+    ('grape-cpgat-shuffled.gff3', 'ID'),
+    ('amel-cdna-multi.gff3', 'ID'),
+    ('oluc-20kb.gff3', 'Name'),
+    ('pdom-withseq.gff3', 'ID'),
+])
+def test_named_index_lazy(infile, attribute):
+    index = tag.index.NamedIndex()
+    index.consume_file(data_file(infile), attribute=attribute)
+    lazy = tag.index.NamedIndex(lazy=True, cachesize=2)
+    lazy.consume_file(data_file(infile), attribute=attribute)
+    assert list(lazy.names) == list(index.names)
+    assert lazy.data == dict()
+    for name in index.names:
+        assert name in lazy
+        assert repr(lazy[name]) == repr(index[name])
+    assert len(lazy._cache) <= 2
+    assert 'bogus' not in lazy
+    with pytest.raises(IndexError):
+        lazy['bogus']
+
+
+def test_named_index_lazy_blocks():
+    index = tag.index.NamedIndex(lazy=True)
+    index.consume_file(data_file('grape-cpgat.gff3'))
+    assert len(index._blocks) == 3
+    gene = index['chr8.g2']
+    assert gene.children[0] is index['chr8.g2.t1']
+
+    # Interleaved graphs are parsed together
+    index = tag.index.NamedIndex(lazy=True)
+    index.consume_file(data_file('grape-cpgat-shuffled.gff3'))
+    assert len(index._blocks) == 1
+
+    with pytest.raises(ValueError) as ve:
+        index.consume_file(data_file('pcan-123.gff3.gz'))
+    assert 'requires an uncompressed file' in str(ve)
+
+
+def nearest_brute_force(features, start, end, k, strand, direction):
+    end = end or start + 1
+    hits = list()
+    for feature in features:
+        if strand and feature.strand != strand:
+            continue
+        if feature.start < end and feature.end > start:
+            distance, side = 0, None
+        elif feature.end <= start:
+            distance, side = start - feature.end + 1, 'left'
+        else:
+            distance, side = feature.start - end + 1, 'right'
+        if side and direction:
+            upstream = (side == 'left') == (strand != '-')
+            if upstream != (direction == 'upstream'):
+                continue
+        hits.append((distance, tag.select.sort_key(feature)))
+    return sorted(hits)[:k]
+
+
+@pytest.mark.parametrize('k,strand,direction', [
+    (1, None, None),
+    (3, None, None),
+    (2, '+', 'upstream'),
+    (2, '-', 'upstream'),
+    (4, '-', 'downstream'),
+    (1, None, 'downstream'),
+])
+def test_nearest(k, strand, direction):
+    index = tag.index.Index()
+    index.consume_file(data_file('pcan-123.gff3.gz'))
+    rng = random.Random(k)
+    regions = list()
+    for seqid in index.seqids:
+        features = [interval.data for interval in index[seqid]]
+        start, end = index.extent(seqid)
+        for _ in range(40):
+            qstart = rng.randint(start - 1000, end + 1000)
+            qend = None
+            if rng.random() < 0.5:
+                qend = qstart + rng.randint(1, 2000)
+            regions.append((seqid, qstart, qend))
+            result = index.nearest(seqid, qstart, qend, k=k, strand=strand,
+                                   direction=direction)
+            observed = [
+                (distance, tag.select.sort_key(feature))
+                for feature, distance in result
+            ]
+            assert observed == nearest_brute_force(
+                features, qstart, qend, k, strand, direction
+            )
+    regions.append(('bogus', 100, 200))
+    results = index.nearest_many(regions, k=k, strand=strand,
+                                 direction=direction)
+    assert results[-1] == []
+    assert 'bogus' not in index
+    for region, result in zip(regions, results):
+        assert result == index.nearest(*region, k=k, strand=strand,
+                                       direction=direction)
+
+
+@pytest.mark.parametrize('strand,direction', [
+    (None, None),
+    ('+', None),
+    ('-', 'downstream'),
+    ('.', 'upstream'),
+])
+def test_nearest_spanning(strand, direction):
+    """Features spanning the whole sequence do not slow down searches."""
+    rng = random.Random(3)
+    features = [tag.Feature('chr', 'region', 0, 1000000)]
+    for _ in range(500):
+        start = rng.randint(0, 990000)
+        features.append(tag.Feature('chr', 'gene', start,
+                                    start + rng.randint(50, 5000),
+                                    strand=rng.choice('+-')))
+    index = tag.index.Index()
+    index.consume(features)
+    queries = sorted(
+        (start, start + rng.randint(1, 3000), i)
+        for i, start in enumerate(rng.randint(0, 1000000) for _ in range(200))
+    )
+    arrays = tag.index.FeatureArrays(
+        f for f in features if strand is None or f.strand == strand
+    )
+    sweep = dict(arrays.nearest(queries, 3, strand, direction))
+    for qstart, qend, i in queries:
+        expected = nearest_brute_force(features, qstart, qend, 3, strand,
+                                       direction)
+        for result in (index.nearest('chr', qstart, qend, k=3, strand=strand,
+                                     direction=direction), sweep[i]):
+            observed = [
+                (distance, tag.select.sort_key(feature))
+                for feature, distance in result
+            ]
+            assert observed == expected
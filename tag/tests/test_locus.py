@@ -109,3 +109,41 @@ def test_apis_mellifera(ftype, minperc, numloci):
     locusstream = tag.locus.loci(instream, featuretype=ftype, minperc=minperc)
     ranges = [r for s, r, f in locusstream]
     assert len(ranges) == numloci
+
+
+def test_cluster(ye_in):
+    merger = tag.select.merge(*ye_in, keyed=True)
+    keyed = [(key, entry) for key, entry in merger if key[0] == 4]
+    loci = list(tag.locus.cluster(keyed, minbp=1, minperc=0.0))
+    assert [(s, b, e) for s, b, e, f in loci[:4]] == [
+        ('NC_008791.1', 591, 1550),
+        ('NC_008791.1', 1598, 2147),
+        ('NC_008791.1', 2290, 2839),
+        ('NC_008791.1', 3351, 4320),
+    ]
+    assert sum(len(f) for s, b, e, f in loci) == len(keyed)
+    assert list(tag.locus.cluster([])) == []
+    assert list(tag.locus.loci([])) == []
+
+    with pytest.raises(AssertionError) as ae:
+        list(tag.locus.cluster(keyed, minbp=0))
+    assert 'must require at least 1bp overlap' in str(ae)
+
+
+def test_locus_featuretype_list(ye_in):
+    callgenes, glimmer, prodigal = ye_in
+    loci = list(tag.locus.loci(glimmer, prodigal, featuretype=['CDS', 'gene']))
+    assert len(loci) == 10
+    types = set(f.type for seqid, rng, features in loci for f in features)
+    assert types == set(['CDS'])
+
+
+def test_locus_buffer_deprecated():
+    gene = tag.Feature('chr1', 'gene', 1000, 2000)
+    with pytest.deprecated_call():
+        locus = tag.locus.LocusBuffer(gene)
+    overlap = tag.Feature('chr1', 'gene', 1500, 2500)
+    assert locus.test(overlap, minperc=0.0)
+    locus.add(overlap)
+    assert locus.range == tag.Range(1000, 2500)
+    assert not locus.test(tag.Feature('chr2', 'gene', 1500, 2500))
@@ -7,10 +7,12 @@
 # under the BSD 3-clause license: see LICENSE.
 # -----------------------------------------------------------------------------
 
+import os
 import pytest
 import tag
 from tag import Range, Comment, Directive, Feature, Sequence, GFF3Reader
-from tag.reader import DuplicatedRegionError, FeatureTypeDisagreementError
+from tag.reader import AnnotationSortingError, DuplicatedRegionError
+from tag.reader import FeatureTypeDisagreementError, MissingParentError
 from tag.tests import data_file, data_stream
 
 
@@ -230,6 +232,19 @@ def test_multi_feat_type_mismatch():
     assert ' CDS vs exon' in str(ftde) or 'exon vs CDS' in str(ftde)
 
 
+@pytest.mark.parametrize('trusted', [False, True])
+def test_missing_parent(trusted):
+    gff3 = [
+        '##gff-version   3',
+        'chr\tvim\tgene\t1\t100\t.\t+\t.\tID=gene1',
+        'chr\tvim\tmRNA\t1\t100\t.\t+\t.\tID=mRNA1;Parent=gene2',
+    ]
+    reader = GFF3Reader(instream=gff3, trusted=trusted)
+    with pytest.raises(MissingParentError) as mpe:
+        list(reader)
+    assert 'parent feature "gene2" not found' in str(mpe)
+
+
 @pytest.mark.parametrize('infile,check,positions', [
     ('grape-cpgat-unsorted.gff3', True, [72, 10538, 22053]),
     ('grape-cpgat-unsorted.gff3', False, [10538, 72, 22053]),
@@ -241,3 +256,180 @@ def test_no_sort(infile, check, positions):
     genes = tag.select.features(reader, type='gene')
     testpos = [gene.start + 1 for gene in genes]
     assert testpos == positions
+
+
+@pytest.mark.parametrize('infile', [
+    'grape-cpgat-sorted.gff3',
+    'pcan-123.gff3.gz',
+    'amel-cdna-multi.gff3',
+])
+def test_trusted(infile):
+    reader = GFF3Reader(infilename=data_file(infile))
+    entries = [repr(e) for e in tag.select.features(reader)]
+    reader = GFF3Reader(infilename=data_file(infile), trusted=True)
+    trusted_entries = [repr(e) for e in tag.select.features(reader)]
+    assert trusted_entries == entries
+
+
+def test_trusted_skips_validation():
+    reader = GFF3Reader(infilename=data_file('vcar-out-of-bounds.gff3'),
+                        trusted=True)
+    records = [r for r in reader]
+    assert len(list(tag.select.features(records))) == 3
+
+    reader = GFF3Reader(infilename=data_file('otau-no-seqreg.gff3'),
+                        trusted=True)
+    assert list(tag.select.directives(reader, type='sequence-region')) == []
+
+
+def test_symbols():
+    infile = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+    reader = GFF3Reader(infilename=infile)
+    features = [f for g in tag.select.features(reader) for f in g]
+    assert len(set(id(f.seqid) for f in features)) == 232
+    assert len(set(id(f.source) for f in features)) == len(set(
+        f.source for f in features
+    ))
+    keys = set(id(k) for f in features for k in f._attrs if k == 'gbkey')
+    assert len(keys) == 1
+    assert 'CDS' in reader.symbols and 'gbkey' in reader.symbols
+    assert 'Gene' not in reader.symbols
+
+    symbols = tag.reader.SymbolTable(attrvalues=['gbkey'])
+    reader = GFF3Reader(infilename=infile, symbols=symbols)
+    features = [f for g in tag.select.features(reader) for f in g]
+    gbkeys = [f.get_attribute('gbkey') for f in features]
+    assert len(set(id(v) for v in gbkeys if v == 'Gene')) == 1
+    reader = GFF3Reader(infilename=infile, symbols=symbols, trusted=True)
+    features = [f for g in tag.select.features(reader) for f in g]
+    assert features[0].seqid is symbols[features[0].seqid]
+
+    reader = GFF3Reader(infilename=infile, symbols=False)
+    features = [f for g in tag.select.features(reader) for f in g]
+    assert reader.symbols is None
+    assert len(set(id(f.seqid) for f in features)) == len(features)
+
+
+def test_stats():
+    reader = GFF3Reader(infilename=data_file('bogus-aligns.gff3'))
+    entries = list(reader)
+    stats = reader.stats.asdict()
+    assert stats['lines'] == 14
+    assert stats['features'] == 8
+    assert stats['merged'] == 4
+    assert stats['pseudofeatures'] == 4
+    assert stats['flushes'] == 0
+    assert stats['peakbuffered'] == 6
+
+    reader = GFF3Reader(infilename=data_file('Ypes-signalp-prot.gff3.gz'))
+    entries = list(reader)
+    assert reader.stats.inferredregions == 31
+
+
+def test_stats_flushes():
+    synth = tag.synth.GenomeSynthesizer(seqs=2, seqlen=100000)
+    lines = list(synth)
+    reader = GFF3Reader(lines, assumesorted=True)
+    entries = list(reader)
+    numgraphs = synth.counts['gene'] + synth.counts['match']
+    assert reader.stats.lines == len(lines)
+    assert reader.stats.bytes == sum(len(line) for line in lines)
+    assert reader.stats.flushes == numgraphs
+    peak = reader.stats.peakbuffered
+
+    nosep = [line for line in lines if line != '###']
+    reader = GFF3Reader(nosep, assumesorted=True)
+    entries = list(reader)
+    assert reader.stats.flushes == 0
+    assert reader.stats.peakbuffered > 10 * peak
+
+
+@pytest.mark.parametrize('infile,assumesorted,budget', [
+    ('grape-cpgat.gff3', False, dict(max_records=5)),
+    ('grape-cpgat-unsorted.gff3', False, dict(max_records=1)),
+    ('psyllid-cdnamatch.gff3', False, dict(max_records=3)),
+    ('pcan-123.gff3.gz', True, dict(max_records=50)),
+    ('pcan-123.gff3.gz', False, dict(max_memory=100000)),
+    ('GCF_001639295.1_ASM163929v1_genomic.gff.gz', True,
+     dict(max_records=200)),
+])
+def test_memory_budget(infile, assumesorted, budget, tmpdir):
+    reader = GFF3Reader(infilename=data_file(infile),
+                        assumesorted=assumesorted)
+    expected = [repr(e) for e in tag.select.features(reader)]
+    peak = reader.stats.peakbuffered
+
+    reader = GFF3Reader(infilename=data_file(infile), tempdir=str(tmpdir),
+                        assumesorted=assumesorted, **budget)
+    entries = list(reader)
+    assert entries[0].type == 'gff-version'
+    assert [repr(e) for e in tag.select.features(entries)] == expected
+    assert reader.stats.flushes > 0 or reader.stats.spilled > 0
+    assert reader.stats.peakbuffered < peak
+    assert tmpdir.listdir() == []
+
+
+def test_memory_budget_early_flush():
+    synth = tag.synth.GenomeSynthesizer(seqs=2, seqlen=400000, matches=0)
+    nosep = [line for line in synth if line != '###']
+    reader = GFF3Reader(nosep, assumesorted=True)
+    expected = [repr(e) for e in reader]
+    peak = reader.stats.peakbuffered
+
+    reader = GFF3Reader(nosep, assumesorted=True, max_records=100)
+    assert [repr(e) for e in reader] == expected
+    assert reader.stats.spilled == 0
+    assert reader.stats.flushes > 1
+    assert reader.stats.peakbuffered < peak / 4
+
+
+@pytest.mark.parametrize('budget', [5, 50, 200])
+def test_memory_budget_directives(budget):
+    """Directives between features are emitted as without a budget."""
+    infile = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+    reader = GFF3Reader(infilename=infile, assumesorted=True)
+    expected = [repr(e) for e in reader]
+
+    reader = GFF3Reader(infilename=infile, assumesorted=True,
+                        max_records=budget)
+    entries = list(reader)
+    assert [repr(e) for e in entries] == expected
+    assert reader.stats.flushes > 0
+    assert list(tag.select.check_sorted(entries)) == entries
+
+
+def test_memory_budget_directives_stream():
+    """Late directives are only known in advance when reading a file."""
+    infile = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+    instream = tag.open(infile, 'r')
+    reader = GFF3Reader(instream, assumesorted=True, max_records=50)
+    with pytest.raises(AnnotationSortingError) as ase:
+        list(reader)
+    assert '> sequence NZ_LWMV01000' in str(ase)
+
+
+def test_memory_budget_fanin(monkeypatch, tmpdir):
+    """Spilled runs are merged a few at a time to limit open files."""
+    resource = pytest.importorskip('resource')
+    synth = tag.synth.GenomeSynthesizer(seqs=2, seqlen=200000, matches=0)
+    nosep = [line for line in synth if line != '###']
+    expected = [repr(e) for e in GFF3Reader(nosep)]
+
+    monkeypatch.setattr(tag.reader, 'RUN_FANIN', 4)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    openfiles = len(os.listdir('/proc/self/fd'))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (openfiles + 16, hard))
+    try:
+        reader = GFF3Reader(nosep, max_records=20, tempdir=str(tmpdir))
+        observed = [repr(e) for e in reader]
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert observed == expected
+    assert tmpdir.listdir() == []
+
+
+def test_memory_budget_sorting_error():
+    instream = data_stream('grape-cpgat-unsorted.gff3')
+    reader = GFF3Reader(instream, assumesorted=True, max_records=4)
+    with pytest.raises(AnnotationSortingError):
+        entries = list(reader)
@@ -8,6 +8,7 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import print_function
+import glob
 import pytest
 import tag
 from tag import GFF3Reader
@@ -88,3 +89,98 @@ def test_merge():
     for mergefeat, testfeat in zip(merge_stream, test_stream):
         print(mergefeat, testfeat, sep='\n', end='\n\n')
         assert mergefeat.like(testfeat)
+
+
+def test_sort_key():
+    entries = list(GFF3Reader(infilename=data_file('pdom-withseq.gff3')))
+    entries += list(GFF3Reader(infilename=data_file('grape-cpgat.gff3')))
+    entries.append(tag.Comment('# a comment'))
+    entries.append(tag.Directive('##species Polistes dominula'))
+    keysorted = sorted(entries, key=tag.select.sort_key)
+    assert [repr(e) for e in keysorted] == [repr(e) for e in sorted(entries)]
+
+    mrna = tag.Feature('chr', 'mRNA', 10, 20)
+    mrnax = tag.Feature('chr', 'mRNA_x', 10, 20)
+    key = tag.select.sort_key
+    assert (key(mrnax) < key(mrna)) == (mrnax < mrna) is True
+
+
+def test_merge_cascade(tmpdir):
+    infiles = glob.glob(data_file('Ye.*.min.gff3.gz'))
+    infiles += [data_file('ex-red-{}.gff3'.format(i)) for i in (1, 2, 3)]
+
+    def readers():
+        return [GFF3Reader(infilename=fn, assumesorted=True)
+                for fn in infiles]
+
+    direct = [repr(e) for e in tag.select.merge(*readers())]
+    cascade = tag.select.merge(*readers(), fanin=2, tempdir=str(tmpdir))
+    assert [repr(e) for e in cascade] == direct
+    assert tmpdir.listdir() == []
+
+    for fanin in (None, 2):
+        merger = tag.select.merge(*readers(), fanin=fanin, keyed=True)
+        pairs = list(merger)
+        assert [repr(e) for k, e in pairs] == direct
+        assert all(k == tag.select.sort_key(e) for k, e in pairs)
+
+
+def test_merge_validate():
+    reader1 = GFF3Reader(infilename=data_file('ex-red-1.gff3'))
+    reader2 = GFF3Reader(
+        infilename=data_file('pbar-withseq.gff3'), assumesorted=True
+    )
+    features = [f for f in reader2 if isinstance(f, tag.Feature)]
+    merger = tag.select.merge(reader1, features[::-1], validate=True)
+    with pytest.raises(ValueError) as ve:
+        list(merger)
+    assert 'stream 2 is not sorted' in str(ve)
+
+
+def test_graph_signature():
+    reader1 = GFF3Reader(infilename=data_file('pbar-withseq.gff3'))
+    reader2 = GFF3Reader(infilename=data_file('pbar-withseq.gff3'))
+    genes1 = list(tag.select.features(reader1, type='gene'))
+    genes2 = list(tag.select.features(reader2, type='gene'))
+    sig = tag.select.graph_signature
+    assert sig(genes1[0]) == sig(genes2[0])
+    assert sig(genes1[0]) != sig(genes1[1])
+
+    genes2[0].add_attribute('ID', 'renamed')
+    assert sig(genes1[0]) == sig(genes2[0])
+    genes2[0].add_attribute('Note', 'extra')
+    assert sig(genes1[0]) != sig(genes2[0])
+    assert sig(genes1[0]) == sig(genes2[0], ignore=('ID', 'Parent', 'Note'))
+    mrna = genes2[0].children[0]
+    mrna.set_coord(mrna.start, mrna.end - 1)
+    assert sig(genes1[0], ignore=('ID', 'Parent', 'Note')) != \
+        sig(genes2[0], ignore=('ID', 'Parent', 'Note'))
+
+
+def test_collapse_duplicates():
+    infiles = ['pbar-withseq.gff3', 'pbar-withseq.gff3', 'ex-red-1.gff3']
+    streams = [
+        tag.select.label_features(
+            GFF3Reader(infilename=data_file(fn)), 'from', str(i)
+        )
+        for i, fn in enumerate(infiles)
+    ]
+    merger = tag.select.merge(*streams)
+    entries = list(tag.select.collapse_duplicates(merger, attribute='from'))
+    features = list(tag.select.features(entries))
+    assert len(features) == 3 + 4
+    origins = [f.get_attribute('from', as_string=True) for f in features]
+    assert origins.count('0,1') == 3
+    assert origins.count('2') == 4
+
+    # Identical multi-features in a bounded buffer
+    reader1 = GFF3Reader(infilename=data_file('bogus-aligns.gff3'))
+    reader2 = GFF3Reader(infilename=data_file('bogus-aligns.gff3'))
+    merger = tag.select.merge(reader1, reader2)
+    features = tag.select.features(
+        tag.select.collapse_duplicates(merger, maxbuffer=1)
+    )
+    expected = tag.select.features(
+        GFF3Reader(infilename=data_file('bogus-aligns.gff3'))
+    )
+    assert [repr(f) for f in features] == [repr(f) for f in expected]
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import json
+import pytest
+import tag
+from tag.tests import data_file
+import threading
+
+
+@pytest.fixture(scope='module')
+def server():
+    arglist = [
+        'serve', '--port', '0', '--threads', '4', '--cache-size', '100',
+        data_file('pcan-123.gff3.gz'), data_file('grape-cpgat.gff3'),
+    ]
+    args = tag.cli.parser().parse_args(arglist)
+    server = tag.cli.serve.build_server(args)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port)
+    conn.request(method, path, body=body, headers=headers or dict())
+    response = conn.getresponse()
+    data = response.read().decode()
+    conn.close()
+    return response.status, data
+
+
+def test_region(server):
+    path = '/region?seqid=scaffold_125&start=19000&end=87000'
+    status, data = request(server, 'GET', path)
+    assert status == 200
+    lines = data.strip().split('\n')
+    assert lines[0] == '##gff-version 3'
+    genes = [ln.split('\t')[3] for ln in lines if '\tgene\t' in ln]
+    assert genes == ['18994', '57450', '86995']
+
+    status, data = request(server, 'GET', path + '&strict=1&format=json')
+    assert [f['start'] for f in json.loads(data)] == [57450]
+
+    status, data = request(server, 'GET', '/region?seqid=chr8&start=100',
+                           headers={'Accept': 'application/json'})
+    features = json.loads(data)
+    assert len(features) == 1
+    assert features[0]['attributes']['ID'] == 'chr8.g1'
+    assert [c['type'] for c in features[0]['children']] == ['mRNA']
+
+    status, data = request(server, 'GET',
+                           '/region?seqid=bogus&start=1&end=1000')
+    assert status == 200
+    assert data == '##gff-version 3\n'
+
+
+@pytest.mark.parametrize('path,message', [
+    ('/region?seqid=chr8&end=1000', 'missing parameter'),
+    ('/region?seqid=chr8&start=one', 'invalid coordinate'),
+    ('/region?seqid=chr8&start=1000&end=10', 'invalid region'),
+    ('/region?seqid=chr8&start=0&end=10', 'invalid region'),
+    ('/region?seqid=chr8&start=0', 'invalid position'),
+    ('/region?seqid=chr8&start=-5', 'invalid position'),
+    ('/region?seqid=bogus&start=0', 'invalid position'),
+    ('/feature', 'missing parameter'),
+])
+def test_bad_request(server, path, message):
+    status, data = request(server, 'GET', path)
+    assert status == 400
+    assert message in json.loads(data)['error']
+
+
+def test_batch(server):
+    regions = [
+        dict(seqid='scaffold_123', start=5001, end=6000),
+        dict(seqid='chr8', start=10000, end=12000, strict=True),
+    ]
+    status, data = request(server, 'POST', '/regions?format=json',
+                           body=json.dumps(regions))
+    results = json.loads(data)
+    assert [len(r) for r in results] == [1, 1]
+    assert results[1][0]['start'] == 10538
+
+    status, data = request(server, 'POST', '/regions',
+                           body=json.dumps(regions))
+    assert '# scaffold_123:5001-6000\n' in data
+    assert '# chr8:10000-12000\n' in data
+
+    for body in ('{"seqid": "chr8"}', 'bogus', '["chr8"]'):
+        status, data = request(server, 'POST', '/regions', body=body)
+        assert status == 400
+
+
+def test_service_regions():
+    service = tag.server.AnnotationService(cachesize=10)
+    service.load(data_file('pcan-123.gff3.gz'))
+    queries = [
+        ('scaffold_125', 19000, 87000, False),
+        ('scaffold_125', 19000, 87000, True),
+        ('scaffold_123', 5584, None, True),
+        ('chrZ', 1, 100, False),
+    ]
+    results = service.regions(queries)
+    assert results == [service.region(*query) for query in queries]
+    assert [len(features) for features in results] == [3, 1, 1, 0]
+    assert service.index.cache_hits == 3
+    with pytest.raises(tag.server.QueryError) as qe:
+        service.regions([('scaffold_125', 500, 100, False)])
+    assert 'invalid region' in str(qe)
+    with pytest.raises(tag.server.QueryError) as qe:
+        service.regions([('scaffold_125', 0, None, False)])
+    assert 'invalid position' in str(qe)
+
+
+def test_feature(server):
+    status, data = request(server, 'GET', '/feature?id=PCAN011a001813')
+    assert status == 200
+    assert '\tgene\t200029\t201298\t' in data
+
+    status, data = request(server, 'GET', '/feature?id=bogus')
+    assert status == 404
+
+    status, data = request(server, 'GET', '/seqids')
+    seqids = [s['seqid'] for s in json.loads(data)]
+    assert seqids == ['chr8', 'scaffold_123', 'scaffold_124', 'scaffold_125']
+
+    for method in ('GET', 'POST'):
+        status, data = request(server, method, '/bogus')
+        assert status == 404
+
+
+def test_keepalive(server):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port)
+    conn.request('GET', '/seqids')
+    response = conn.getresponse()
+    response.read()
+    sock = conn.sock
+    for _ in range(5):
+        conn.request('GET', '/feature?id=PCAN011a001813&format=json')
+        response = conn.getresponse()
+        assert json.loads(response.read().decode())['type'] == 'gene'
+        assert conn.sock is sock
+    conn.close()
+
+
+def test_concurrent(server):
+    def query(i):
+        start = 1 + i * 10000
+        path = '/region?seqid=scaffold_124&start={}&end={}&format=json'
+        return request(server, 'GET', path.format(start, start + 50000))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(query, range(40)))
+    assert all(status == 200 for status, data in responses)
+    expected = [query(i)[1] for i in range(40)]
+    assert [data for status, data in responses] == expected
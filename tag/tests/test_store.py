@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import io
+import os
+import pytest
+import threading
+import tag
+from tag.store import AnnotationStore
+from tag.tests import data_file, data_stream
+
+
+def synthetic(**kwargs):
+    outstream = io.StringIO()
+    tag.synth.GenomeSynthesizer(**kwargs).write(outstream)
+    outstream.seek(0)
+    return list(tag.GFF3Reader(outstream))
+
+
+def contents(store):
+    return [(store.name(feature), repr(feature)) for feature in store]
+
+
+def test_store_updates(tmpdir):
+    storedir = str(tmpdir.join('store'))
+    with AnnotationStore(storedir) as store:
+        store.consume_file(data_file('pcan-123.gff3.gz'))
+        assert len(store) == 70
+        assert 'PCAN011a001813' in store
+
+        gene = store['PCAN011a001813']
+        with pytest.raises(ValueError) as ve:
+            store.add(gene)
+        assert 'duplicate feature name' in str(ve)
+
+        newgene = tag.Feature('scaffold_123', 'gene', 100, 500, strand='+')
+        newgene.add_attribute('ID', 'newgene')
+        store.add(newgene)
+        assert store.query('scaffold_123', 0, 1000) == [newgene]
+
+        moved = tag.Feature('scaffold_123', 'gene', 1000, 1500, strand='+')
+        moved.add_attribute('ID', 'movedgene')
+        store.replace(moved, name='newgene')
+        assert 'newgene' not in store
+        assert store.query('scaffold_123', 0, 1000) == list()
+        assert store.query('scaffold_123', 0, 2000) == [moved]
+        with pytest.raises(IndexError):
+            store.replace(newgene)
+
+        store.delete('movedgene')
+        with pytest.raises(IndexError):
+            store.delete('movedgene')
+        with pytest.raises(IndexError):
+            store['movedgene']
+
+        deleted = store.delete_region('scaffold_125', 0, 100000)
+        assert len(deleted) == 4
+        assert store.query('scaffold_125', 0, 100000) == list()
+        assert store.query('bogus', 0, 100000) == list()
+        expected = contents(store)
+        names = list(store.names)
+        hits = [repr(f) for f in store.query('scaffold_125', 0, 200000)]
+        assert len(hits) > 0
+
+    with AnnotationStore(storedir) as store:
+        assert contents(store) == expected
+        assert list(store.names) == names
+        assert len(store.query('scaffold_125', 0, 100000)) == 0
+        assert [repr(f) for f in store.query('scaffold_125', 0, 200000)] == \
+            hits
+
+
+def test_store_conflicts(tmpdir):
+    storedir = str(tmpdir)
+    with AnnotationStore(storedir) as store:
+        store.consume_file(data_file('pcan-123.gff3.gz'))
+        gene = tag.Feature('scaffold_123', 'gene', 100, 500, strand='+',
+                           attrstr='ID=PCAN011a001814')
+        with pytest.raises(ValueError) as ve:
+            store.replace(gene, name='PCAN011a001813')
+        assert 'duplicate feature name "PCAN011a001814"' in str(ve)
+        assert 'PCAN011a001813' in store
+
+        # Features that cannot be indexed are rejected before being stored
+        empty = tag.Feature('scaffold_123', 'gene', 100, 100,
+                            attrstr='ID=empty')
+        with pytest.raises(ValueError) as ve:
+            store.add(empty)
+        assert 'cannot index empty feature' in str(ve)
+        with pytest.raises(ValueError):
+            store.consume([gene, empty])
+        assert store['PCAN011a001814'] is not gene
+        expected = contents(store)
+    with AnnotationStore(storedir) as store:
+        assert contents(store) == expected
+
+        # Concurrent additions of the same name: exactly one succeeds
+        for i in range(20):
+            errors = list()
+
+            def add():
+                newgene = tag.Feature('scaffold_123', 'gene', 100, 500,
+                                      attrstr='ID=race{}'.format(i))
+                try:
+                    store.add(newgene)
+                except ValueError:
+                    errors.append(newgene)
+
+            threads = [threading.Thread(target=add) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(errors) == 3
+        assert len(store) == len(expected) + 20
+
+
+def test_store_unnamed(tmpdir):
+    features = list(tag.select.features(tag.GFF3Reader(
+        data_stream('grape-cpgat.gff3')
+    )))
+    with AnnotationStore(str(tmpdir), attribute='Note') as store:
+        store.consume(features)
+        assert list(store.names) == sorted(f.slug for f in features)
+        assert store[features[1].slug] is features[1]
+
+
+def test_store_torn_write(tmpdir):
+    storedir = str(tmpdir)
+    with AnnotationStore(storedir) as store:
+        store.consume_file(data_file('pcan-123.gff3.gz'))
+        store.delete('PCAN011a001813')
+        expected = contents(store)
+    segfile = os.path.join(storedir, '00000001.seg')
+    size = os.path.getsize(segfile)
+    with open(segfile, 'ab') as fh:
+        fh.write(b'\xff\x00\x00\x00\x00\x00\x00\x00partial')
+
+    with AnnotationStore(storedir) as store:
+        assert os.path.getsize(segfile) == size
+        assert contents(store) == expected
+        store.delete('PCAN011a001814')
+        expected = contents(store)
+    with AnnotationStore(storedir) as store:
+        assert contents(store) == expected
+
+
+def test_store_compaction(tmpdir):
+    storedir = str(tmpdir)
+    entries = synthetic(seqs=3, seqlen=200000)
+    features = list(tag.select.features(entries))
+    with AnnotationStore(storedir, segmentsize=10000, maxsegments=4) as store:
+        store.consume(entries)
+        for feature in features[::3]:
+            store.delete(store.name(feature))
+        store.compact()
+        expected = contents(store)
+        assert len(store) == len(features) - len(features[::3])
+        assert store.segments <= 4
+    segfiles = sorted(os.listdir(storedir))
+    assert len(segfiles) <= 4
+
+    # An older segment left over from an interrupted compaction is ignored
+    with open(os.path.join(storedir, '00000000.seg'), 'wb') as fh:
+        tag.store._write_record(fh, ('tag-store', 1, 'delta'))
+        tag.store._write_record(fh, (('del', store.name(features[1])),))
+    with AnnotationStore(storedir) as store:
+        assert contents(store) == expected
+    assert sorted(os.listdir(storedir)) == segfiles
+
+
+def test_store_concurrent_compaction(tmpdir):
+    storedir = str(tmpdir)
+    entries = synthetic(seqs=2, seqlen=500000)
+    features = list(tag.select.features(entries))
+    store = AnnotationStore(storedir)
+    store.consume(entries)
+
+    def update():
+        for feature in features[::2]:
+            store.delete(store.name(feature))
+
+    updater = threading.Thread(target=update)
+    updater.start()
+    store.compact(wait=False)
+    seqid = features[0].seqid
+    while updater.is_alive():
+        hits = store.query(seqid, 0, 500000)
+        assert all(store.name(f) in store for f in hits)
+    updater.join()
+    store.compact()
+    expected = [repr(f) for f in features[1::2]]
+    assert [repr(f) for f in store] == expected
+    store.close()
+
+    store = AnnotationStore(storedir)
+    assert [repr(f) for f in store] == expected
+    store.close()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import io
+import pytest
+import tag
+from tag.tests import data_file, data_stream
+
+
+def synthetic(**kwargs):
+    outstream = io.StringIO()
+    tag.synth.GenomeSynthesizer(**kwargs).write(outstream)
+    outstream.seek(0)
+    return list(tag.GFF3Reader(outstream))
+
+
+def expected_overlaps(afeatures, bfeatures, minbp=1, minperc=0.0,
+                      strand=False):
+    index = tag.index.Index()
+    index.consume(bfeatures)
+    for feature in afeatures:
+        overlaps = list()
+        if feature.seqid in index:
+            candidates = index.query(
+                feature.seqid, feature.start, feature.end, strict=False
+            )
+            for other in sorted(candidates, key=tag.select.sort_key):
+                if strand and feature.strand != other.strand:
+                    continue
+                if feature.range.overlap_atleast(other.range, minbp, minperc):
+                    overlaps.append(other)
+        yield feature, overlaps
+
+
+def test_sorted_features():
+    entries = synthetic(seqs=2, seqlen=200000, overlap=0.3)
+    exons = list(tag.sweep.sorted_features(entries, type='exon'))
+    expected = list(tag.select.features(entries, type='exon', traverse=True))
+    assert len(exons) == len(expected)
+    assert exons == sorted(expected, key=tag.select.sort_key)
+
+    types = ('exon', 'CDS')
+    features = list(tag.sweep.sorted_features(entries, type=types))
+    assert set(f.type for f in features) == set(types)
+    assert features == sorted(features, key=tag.select.sort_key)
+
+
+@pytest.mark.parametrize('minbp,minperc,strand', [
+    (1, 0.0, False),
+    (100, 0.0, False),
+    (1, 0.5, False),
+    (1, 0.0, True),
+])
+def test_intersect(minbp, minperc, strand):
+    glimmer = list(tag.GFF3Reader(data_stream('Ye.glimmer.gff3.gz')))
+    prodigal = list(tag.GFF3Reader(data_stream('Ye.prodigal.gff3.gz')))
+    result = list(tag.sweep.intersect(
+        glimmer, prodigal, minbp=minbp, minperc=minperc, strand=strand
+    ))
+    afeatures = list(tag.select.features(glimmer))
+    bfeatures = list(tag.select.features(prodigal))
+    expected = expected_overlaps(afeatures, bfeatures, minbp, minperc, strand)
+    expected = list(expected)
+    assert result == expected
+
+
+def test_intersect_types():
+    aentries = synthetic(seqs=2, seqlen=100000, overlap=0.3)
+    bentries = synthetic(seqs=3, seqlen=100000, overlap=0.3, seed=7)
+    result = list(tag.sweep.intersect(
+        aentries, bentries, atype='exon', btype='CDS'
+    ))
+    afeatures = tag.sweep.sorted_features(aentries, type='exon')
+    bfeatures = list(tag.sweep.sorted_features(bentries, type='CDS'))
+    expected = expected_overlaps(afeatures, bfeatures)
+    # Identical CDS segments shared by isoforms can be reported in any order
+    for (feature, overlaps), (expfeat, expoverlaps) in zip(result, expected):
+        assert feature is expfeat
+        assert set(map(id, overlaps)) == set(map(id, expoverlaps))
+    assert sum(1 for feature, overlaps in result if overlaps) > 0
+
+
+def test_intersect_unsorted():
+    entries = list(tag.GFF3Reader(data_stream('grape-cpgat.gff3')))
+    with pytest.raises(ValueError) as ve:
+        list(tag.sweep.intersect(entries[::-1], entries, validate=True))
+    assert 'stream A is not sorted' in str(ve)
+
+
+def test_closest():
+    aentries = synthetic(seqs=3, seqlen=100000, density=20)
+    bentries = synthetic(seqs=2, seqlen=100000, density=50, seed=7)
+    region = tag.Feature('seq1', 'region', 0, 100000, strand='+')
+    bentries = sorted(bentries + [region], key=tag.select.sort_key)
+    index = tag.index.Index()
+    index.consume(tag.select.features(bentries))
+    result = list(tag.sweep.closest(
+        aentries, bentries, k=2, strand=True, direction='upstream'
+    ))
+    assert len(result) == len(list(tag.select.features(aentries)))
+    for feature, neighbors in result:
+        expected = index.nearest(
+            feature.seqid, feature.start, feature.end, k=2,
+            strand=feature.strand, direction='upstream'
+        )
+        assert neighbors == expected
+        if feature.seqid == 'seq3':
+            assert neighbors == []
+    assert sum(1 for feature, neighbors in result if neighbors) > 0
+
+
+def test_diff():
+    old = synthetic(seqs=2, seqlen=200000, overlap=0.3)
+    # Same annotation with renumbered IDs, then modified
+    outstream = io.StringIO()
+    tag.GFF3Writer(synthetic(seqs=2, seqlen=200000, overlap=0.3),
+                   outstream).write()
+    outstream.seek(0)
+    new = list(tag.GFF3Reader(outstream))
+    oldfeatures = list(tag.select.features(old))
+    newfeatures = list(tag.select.features(new))
+    new.remove(newfeatures[3])
+    newfeatures[5].add_attribute('Note', 'modified')
+    repeat = tag.Feature('seq2', 'repeat_region', 1000, 1500)
+    new = sorted(new + [repeat], key=tag.select.sort_key)
+
+    result = list(tag.sweep.diff(old, new, validate=True))
+    statuses = [status for status, oldgraph, newgraph in result]
+    assert len(result) == len(oldfeatures) + 1
+    assert statuses.count('unchanged') == len(oldfeatures) - 2
+    assert ('removed', oldfeatures[3], None) in result
+    assert ('changed', oldfeatures[5], newfeatures[5]) in result
+    assert ('added', None, repeat) in result
+    keys = [tag.select.sort_key(newgraph or oldgraph)
+            for status, oldgraph, newgraph in result]
+    assert keys == sorted(keys)
+
+    result = tag.sweep.diff(old, new, ignore=('ID', 'Parent', 'Note'))
+    statuses = [status for status, oldgraph, newgraph in result]
+    assert statuses.count('changed') == 0
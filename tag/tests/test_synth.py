@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+from collections import Counter
+import pytest
+import tag
+from tag.synth import GenomeSynthesizer
+
+
+def test_deterministic():
+    synth = GenomeSynthesizer(seqs=2, seqlen=100000, seed=1)
+    assert list(synth) == list(GenomeSynthesizer(seqs=2, seqlen=100000,
+                                                 seed=1))
+    assert list(synth) == list(synth)
+    assert list(synth) != list(GenomeSynthesizer(seqs=2, seqlen=100000,
+                                                 seed=2))
+
+
+@pytest.mark.parametrize('shuffle,separators', [
+    (0, True),
+    (0, False),
+    (25, True),
+    (25, False),
+])
+def test_parse(shuffle, separators):
+    synth = GenomeSynthesizer(seqs=3, seqlen=200000, shuffle=shuffle,
+                              separators=separators, seed=3)
+    reader = tag.GFF3Reader(list(synth))
+    features = list(tag.select.features(reader))
+    types = Counter(f.type for f in features)
+    assert types['gene'] == synth.counts['gene']
+    assert types['cDNA_match'] == synth.counts['match']
+    assert set(f.seqid for f in features) == set(['seq1', 'seq2', 'seq3'])
+    for gene in tag.select.features(features, type='gene'):
+        for mrna in gene.children:
+            cds = [f for f in mrna.children if f.type == 'CDS']
+            assert len(set(f.multi_rep for f in cds)) == 1
+
+
+def test_sorted():
+    lines = list(GenomeSynthesizer(seqs=12, seqlen=50000, overlap=0.5))
+    reader = tag.GFF3Reader(lines, assumesorted=True)
+    entries = list(reader)
+    assert entries == sorted(entries)
+
+    lines = list(GenomeSynthesizer(seqs=2, seqlen=300000, shuffle=10))
+    reader = tag.GFF3Reader(lines, assumesorted=True)
+    with pytest.raises(tag.reader.AnnotationSortingError):
+        entries = list(reader)
+
+
+def test_single_cds():
+    synth = GenomeSynthesizer(seqlen=100000, multicds=False, seed=4)
+    reader = tag.GFF3Reader(list(synth))
+    cds = list(tag.select.features(reader, type='CDS', traverse=True))
+    assert len(cds) > 0
+    assert all(f.get_attribute('ID') is None for f in cds)
+    assert synth.counts['CDS'] == 0
+
+
+def test_fasta():
+    synth = GenomeSynthesizer(seqs=2, seqlen=1000, density=0, matches=0,
+                              fasta=True)
+    reader = tag.GFF3Reader(list(synth))
+    sequences = list(tag.select.entry_type_filter(reader, tag.Sequence))
+    assert [s.defline for s in sequences] == ['>seq1', '>seq2']
+    assert [len(s.seq) for s in sequences] == [1000, 1000]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import pytest
+import tag
+from tag.tests import data_file, data_stream
+
+numpy = pytest.importorskip('numpy')
+FeatureTable = tag.table.FeatureTable
+
+
+def test_table_basic():
+    table = FeatureTable.from_file(data_file('pdom-withseq.gff3'))
+    assert len(table) == 32
+    assert table.seqids == ['PdomSCFr1.2-0483']
+    assert table.type_counts() == {
+        'gene': 2, 'mRNA': 2, 'exon': 12, 'CDS': 9, 'five_prime_UTR': 5,
+        'three_prime_UTR': 2,
+    }
+    assert table.parent[0] == -1
+    assert table.types[table.type[1]] == 'mRNA'
+    assert table.parent[1] == 0
+    assert table.attributes(0).startswith('ID=gene1')
+
+
+def test_table_sum():
+    infile = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+    table = FeatureTable.from_file(infile)
+    assert len(table) == 4298
+    counts = table.type_counts()
+    assert counts['CDS'] == 1973
+    assert counts['gene'] == 2012
+    assert table.length_stats('gene')['max'] == 12025
+    assert table.length_stats('region')['max'] == 74332
+    assert table.length_stats('bogus')['count'] == 0
+
+
+@pytest.mark.parametrize('gff3,ftype,expected', [
+    ('oluc-20kb.gff3', 'CDS', 14100),
+    ('bogus-aligns.gff3', 'cDNA_match', 7006),
+    ('bogus-genes.gff3', 'gene', 18000),
+    ('bogus-genes.gff3', 'exon', 11000),
+])
+def test_table_coverage(gff3, ftype, expected):
+    table = FeatureTable.from_file(data_file(gff3))
+    assert sum(table.coverage(type=ftype).values()) == expected
+
+
+def test_table_window():
+    table = FeatureTable.from_file(data_file('pcan-123.gff3.gz'))
+    for strict in (True, False):
+        mask = table.window_mask('scaffold_125', 19000, 87000, strict=strict)
+        mask &= table.type_mask('gene')
+        subtable = table.select(mask)
+        starts = [s + 1 for s in subtable.start]
+        if strict:
+            assert starts == [57450]
+        else:
+            assert starts == [18994, 57450, 86995]
+        assert list(subtable.parent) == [-1] * len(subtable)
+
+
+def test_table_roundtrip():
+    infile = data_file('grape-cpgat.gff3')
+    features = list(tag.select.features(tag.GFF3Reader(infilename=infile)))
+
+    table = FeatureTable.from_file(infile)
+    assert [repr(f) for f in table.features()] == [repr(f) for f in features]
+
+    table = FeatureTable.from_features(features)
+    assert len(table) == 28
+    assert [repr(f) for f in table.features()] == [repr(f) for f in features]
+
+
+def test_table_multi():
+    infile = data_file('amel-cdna-multi.gff3')
+    reader = tag.GFF3Reader(infilename=infile)
+    features = list(tag.select.features(reader))
+    table = FeatureTable.from_features(features)
+    assert [repr(f) for f in table.features()] == [repr(f) for f in features]
+
+
+def test_table_missing_parent():
+    gff3 = [
+        '##gff-version   3',
+        'chr\tvim\tgene\t1\t100\t.\t+\t.\tID=gene1',
+        'chr\tvim\tmRNA\t1\t100\t.\t+\t.\tID=mRNA1;Parent=gene2',
+    ]
+    with pytest.raises(tag.reader.MissingParentError) as mpe:
+        FeatureTable.from_stream(gff3)
+    assert 'parent feature "gene2" not found' in str(mpe)
@@ -75,3 +75,16 @@ def test_primary_transcript_boring_exons():
     for gene in gene_filter:
         t = [c for c in gene.children if c.type in tag.transcript.type_terms]
         assert len(t) == 0
+
+
+@pytest.mark.parametrize('func,infile', [
+    (primary_mrna, 'psyllid-100k.gff3'),
+    (primary_mrna, 'pdom-withseq.gff3'),
+    (primary_transcript, 'psyllid-multi-trans.gff3.gz'),
+])
+def test_primary_parallel(func, infile):
+    serial = func(tag.GFF3Reader(data_stream(infile)))
+    parallel = func(
+        tag.GFF3Reader(data_stream(infile)), processes=2, chunksize=3
+    )
+    assert [repr(e) for e in parallel] == [repr(e) for e in serial]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+import pytest
+import tag
+from tag.tests import data_file
+from tag.validate import check_lines, validate
+
+
+def errors(infile, **kwargs):
+    with tag.open(data_file(infile), 'r') as instream:
+        return list(validate(instream, **kwargs))
+
+
+@pytest.mark.parametrize('infile,kwargs,expected', [
+    ('lhum-mrna-span.gff3', dict(), [
+        (3, 'child of feature LH19950 is not contained within its span '
+            '(12-2275)'),
+    ]),
+    ('lhum-cds-strand.gff3', dict(), [
+        (lineno, 'child of feature LH19950-RA has a different strand')
+        for lineno in range(9, 14)
+    ]),
+    ('lhum-feat-dup.gff3', dict(), [
+        (15, 'ID "LH19950" already used on sequence scaffold1 (line 2)'),
+        (16, 'ID "LH19950-RA" already used on sequence scaffold1 (line 3)'),
+        (16, 'seqid mismatch for feature LH19950 (scaffold1 vs scaffold2)'),
+        (17, 'seqid mismatch for feature LH19950-RA (scaffold1 vs '
+             'scaffold2)'),
+        (18, 'seqid mismatch for feature LH19950-RA (scaffold1 vs '
+             'scaffold2)'),
+    ]),
+    ('lhum-feat-dup.gff3', dict(assumesorted=True), []),
+    ('vcar-seqreg-dup.gff3.gz', dict(), [
+        (3, 'duplicated sequence-region for NW_003307554.1'),
+    ]),
+    ('grape-cpgat-seqreg-after.gff3.gz', dict(assumesorted=True), [
+        (16, 'sorting error: sequence-region for chr8 follows features'),
+    ]),
+    ('grape-cpgat-unsorted.gff3', dict(assumesorted=True), [
+        (23, 'sorting error: chr8[72, 5081] sorts before chr8[10538, 11678]'),
+    ]),
+    ('grape-cpgat-unsorted.gff3', dict(), []),
+    ('psyllid-cdnamatch.gff3', dict(assumesorted=True), [
+        (1129, 'sorting error: NW_007377440.1[491929, 504268] sorts before '
+               'NW_007377440.1[1089750, 1092919]'),
+    ]),
+    ('mito-trna.gff3', dict(strict=False), []),
+    ('pdom-withseq.gff3', dict(), []),
+    ('pcan-123.gff3.gz', dict(processes=2, chunksize=100), []),
+])
+def test_validate(infile, kwargs, expected):
+    assert errors(infile, **kwargs) == expected
+
+
+@pytest.mark.parametrize('infile', [
+    'amel-cdna-multi.gff3',
+    'honeybee-100kb.gff3.gz',
+    'psyllid-cdnamatch-sorted.gff3',
+    'psyllid-cdnamatch-reverse-sorted.gff3',
+])
+def test_validate_sorted_multi(infile):
+    """Multi-features are sorted by their full span, not by each part."""
+    assert errors(infile, assumesorted=True) == []
+    reader = tag.GFF3Reader(infilename=data_file(infile), assumesorted=True)
+    for entry in tag.select.check_sorted(reader):
+        pass
+
+
+def test_validate_out_of_bounds():
+    errorlist = errors('vcar-out-of-bounds.gff3')
+    assert len(errorlist) == 22
+    assert errorlist[0] == (
+        3, 'feature gene@NW_003307548.1[95396, 100541] out-of-bounds'
+    )
+    assert errors('vcar-out-of-bounds.gff3', maxerrors=5) == errorlist[:5]
+    assert errors('vcar-out-of-bounds.gff3', maxerrors=0) == errorlist
+    assert errors('vcar-out-of-bounds.gff3', processes=2,
+                  chunksize=4) == errorlist
+
+
+def test_validate_syntax():
+    lines = [
+        '##gff-version\t3',
+        '##sequence-region chr1 1 1000',
+        'chr1\tsrc\tgene\t100\t200\t.\t+\t.\tID=gene1',
+        'chr1\tsrc\tgene\t100\t200\t.\t+',
+        'chr1\tsrc\tgene\tx\t200\t.\t+\t.\tID=gene2',
+        'chr1\tsrc\tgene\t300\t200\t.\t+\t.\tID=gene3',
+        'chr1\tsrc\tmRNA\t100\t200\tbad\t*\t3\tID=a,b;Parent=gene1;Name',
+        'chr1\tsrc\tCDS\t100\t200\t.\t+\t0\tParent=mRNA1',
+        '##FASTA',
+        '>chr1',
+        'ACGT',
+    ]
+    errorlist, records, fasta = check_lines(lines)
+    assert fasta is True
+    assert errorlist == [
+        (4, 'expected 9 tab-separated columns, found 7'),
+        (5, 'invalid coordinates [x, 200]'),
+        (6, 'invalid coordinates [300, 200]'),
+        (7, 'invalid score "bad"'),
+        (7, 'invalid strand "*"'),
+        (7, 'invalid phase "3"'),
+        (7, 'multiple values for ID'),
+        (7, 'invalid attribute "Name"'),
+    ]
+    assert records[0] == (2, 'chr1', 0, 1000)
+    assert records[1] == (
+        3, 'chr1', 99, 200, '+', 'gene', 'gene1', None, 'src'
+    )
+
+    result = list(validate(iter(lines)))
+    assert (7, 'child of feature gene1 has a different strand') in result
+    assert result[-1] == (8, 'Parent "mRNA1" not found')
+    assert len(result) == len(errorlist) + 2
@@ -97,3 +97,93 @@ def test_sort_multifeat_reverse(capsys):
     terminal = capsys.readouterr()
     testout = data_stream('psyllid-cdnamatch-reverse-sorted.gff3').read()
     assert terminal.out.strip() == testout.strip()
+
+
+def test_stats():
+    reader = GFF3Reader(infilename=data_file('grape-cpgat.gff3'))
+    with NamedTemporaryFile(suffix='.gff3', mode='w+t') as outfile:
+        writer = GFF3Writer(reader, outfile)
+        writer.write()
+        outfile.seek(0)
+        output = outfile.read()
+    stats = writer.stats.asdict()
+    assert stats['lines'] == output.count('\n')
+    assert stats['bytes'] == len(output)
+    assert stats['seconds'] > 0.0
+    assert stats['lines_per_second'] > 0.0
+    assert stats['bytes_per_second'] > stats['lines_per_second']
+    assert tag.writer.WriterStats().lines_per_second == 0.0
+
+
+def split_features(infile, files):
+    expected = sorted(
+        repr(f) for f in tag.select.features(GFF3Reader(infilename=infile))
+    )
+    observed = list()
+    for filename in files:
+        reader = GFF3Reader(infilename=filename)
+        observed.extend(repr(f) for f in tag.select.features(reader))
+    return sorted(observed), expected
+
+
+@pytest.mark.parametrize('by,chunksize,ext', [
+    ('seqid', None, 'gff3'),
+    ('type', None, 'gff3.gz'),
+    ('count', 50, 'gff3.bgz'),
+    ('size', 20000, 'gff3'),
+])
+def test_split_writer(by, chunksize, ext, tmpdir):
+    infile = data_file('GCF_001639295.1_ASM163929v1_genomic.gff.gz')
+    pattern = str(tmpdir.join('out', '{}.' + ext))
+    reader = GFF3Reader(infilename=infile, assumesorted=True)
+    writer = tag.writer.GFF3SplitWriter(reader, pattern, by=by,
+                                        chunksize=chunksize, maxopen=2)
+    writer.write()
+    assert len(writer._handles) == 0
+    observed, expected = split_features(infile, writer.files)
+    assert observed == expected
+
+    for filename in writer.files:
+        with tag.open(filename, 'r') as instream:
+            lines = instream.read().split('\n')
+        assert lines[0] == '##gff-version 3'
+        assert lines.count('##gff-version 3') == 1
+        regions = [ln for ln in lines if ln.startswith('##sequence-region')]
+        seqids = set(ln.split('\t')[0] for ln in lines if '\t' in ln)
+        assert len(regions) == len(seqids)
+    if by == 'seqid':
+        assert len(writer.files) == 232
+    elif by == 'type':
+        names = sorted(str(f).split('/')[-1] for f in writer.files)
+        assert names == ['gene.gff3.gz', 'region.gff3.gz',
+                         'repeat_region.gff3.gz']
+    elif by == 'count':
+        assert len(writer.files) == 45
+    else:
+        for filename in writer.files[:-1]:
+            with open(filename, 'r') as instream:
+                assert len(instream.read()) >= 20000
+
+
+def test_split_writer_fasta(tmpdir):
+    pattern = str(tmpdir.join('{}.gff3'))
+    reader = GFF3Reader(infilename=data_file('pdom-withseq.gff3'))
+    writer = tag.writer.GFF3SplitWriter(reader, pattern)
+    writer.write()
+    for filename in writer.files:
+        entries = list(GFF3Reader(infilename=filename))
+        sequences = list(tag.select.sequences(entries))
+        assert len(sequences) == 1
+        assert sequences[0].seqid == filename.split('/')[-1][:-5]
+
+
+def test_split_writer_args():
+    with pytest.raises(ValueError) as ve:
+        tag.writer.GFF3SplitWriter([], '{}.gff3', by='strand')
+    assert 'cannot split by "strand"' in str(ve)
+    with pytest.raises(ValueError) as ve:
+        tag.writer.GFF3SplitWriter([], '{}.gff3', by='count')
+    assert 'chunk size required' in str(ve)
+    with pytest.raises(ValueError) as ve:
+        tag.writer.GFF3SplitWriter([], 'out.gff3')
+    assert 'must contain "{}"' in str(ve)
@@ -8,9 +8,11 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import print_function
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from sys import stderr
 import tag
+from tag.stages import timed
 
 
 # One day I may write a program to crawl the Sequence Ontology and build a more
@@ -28,12 +30,16 @@ type_terms = set([
 
 def _emplace_pmrna(mrnas, parent, strict=False):
     """Retrieve the primary mRNA and discard all others."""
-    mrnas.sort(key=lambda m: (m.cdslen, m.get_attribute('ID')))
-    pmrna = mrnas.pop()
+    # Of mRNAs with identical keys, the last one is selected, as with a
+    # stable sort
+    pmrna = max(
+        reversed(mrnas), key=lambda m: (m.cdslen, m.get_attribute('ID'))
+    )
     if strict:
         parent.children = [pmrna]
     else:
-        parent.children = [c for c in parent.children if c not in mrnas]
+        discard = set(id(m) for m in mrnas if m is not pmrna)
+        parent.children = [c for c in parent.children if id(c) not in discard]
 
 
 def _emplace_transcript(transcripts, parent):
@@ -43,7 +49,48 @@ def _emplace_transcript(transcripts, parent):
     parent.children = [pt]
 
 
-def primary_mrna(entrystream, parenttype='gene'):
+def _select_chunk(funcname, records, kwargs):
+    """Apply a selection function to a chunk of encoded entries."""
+    func = globals()[funcname]
+    entries = [tag.cache.decode(record) for record in records]
+    return [tag.cache.encode(entry) for entry in func(entries, **kwargs)]
+
+
+def _parallel_select(funcname, entrystream, processes, chunksize, **kwargs):
+    """
+    Apply a selection function to chunks of entries in a process pool.
+
+    Entries are sent to the worker processes in chunks of :code:`chunksize`
+    entries, encoded as with :code:`tag.cache`. At most two chunks per
+    process are in flight at any time, and results are yielded in the
+    original order.
+    """
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        chunk = list()
+        for entry in entrystream:
+            chunk.append(tag.cache.encode(entry))
+            if len(chunk) < chunksize:
+                continue
+            pending.append(
+                executor.submit(_select_chunk, funcname, chunk, kwargs)
+            )
+            chunk = list()
+            while len(pending) > 2 * processes:
+                for record in pending.popleft().result():
+                    yield tag.cache.decode(record)
+        if chunk:
+            pending.append(
+                executor.submit(_select_chunk, funcname, chunk, kwargs)
+            )
+        while pending:
+            for record in pending.popleft().result():
+                yield tag.cache.decode(record)
+
+
+@timed('primary_mrna')
+def primary_mrna(entrystream, parenttype='gene', processes=None,
+                 chunksize=100):
     """
     Select a single mRNA as a representative for each protein-coding gene.
 
@@ -60,7 +107,22 @@ def primary_mrna(entrystream, parenttype='gene'):
     >>> filter = tag.transcript.primary_mrna(reader)
     >>> for gene in tag.select.features(filter, type='gene'):
     ...    assert gene.num_children == 1
+
+    To select isoforms in parallel, set :code:`processes` to the number of
+    worker processes. Entries are processed in chunks of :code:`chunksize`
+    top-level features, and are returned in their original order. When
+    combined with a streaming reader (see the :code:`assumesorted` option of
+    :code:`GFF3Reader`), memory consumption is bounded by the size of the
+    largest chunk rather than the size of the input.
     """
+    if processes:
+        for entry in _parallel_select(
+            'primary_mrna', entrystream, processes, chunksize,
+            parenttype=parenttype
+        ):
+            yield entry
+        return
+
     for entry in entrystream:
         if not isinstance(entry, tag.Feature):
             yield entry
@@ -93,7 +155,9 @@ def _get_primary_type(ttypes, parent, logstream=stderr):
     return ttypes[0]
 
 
-def primary_transcript(entrystream, parenttype='gene', logstream=stderr):
+@timed('primary_transcript')
+def primary_transcript(entrystream, parenttype='gene', logstream=stderr,
+                       processes=None, chunksize=100):
     """
     Select a single transcript as a representative for each gene.
 
@@ -126,7 +190,19 @@ def primary_transcript(entrystream, parenttype='gene', logstream=stderr):
     not the primary transcript, including non-transcript children. This is a
     retty subtle distinction, and anecdotal experience suggests that cases in
     which the distinction actually matters are extremely rare.
+
+    The :code:`processes` and :code:`chunksize` arguments behave as for the
+    `primary_mrna` function. In parallel mode, warnings are printed to the
+    worker processes' stderr rather than :code:`logstream`.
     """
+    if processes:
+        for entry in _parallel_select(
+            'primary_transcript', entrystream, processes, chunksize,
+            parenttype=parenttype
+        ):
+            yield entry
+        return
+
     for entry in entrystream:
         if not isinstance(entry, tag.Feature):
             yield entry
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+#
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Daniel Standage <daniel.standage@gmail.com>
+#
+# This file is part of tag (http://github.com/standage/tag) and is licensed
+# under the BSD 3-clause license: see LICENSE.
+# -----------------------------------------------------------------------------
+
+"""
+Streaming validation of GFF3 data.
+
+Validation makes the same checks as :code:`GFF3Reader`, but without
+building feature objects or feature graphs, and reports every problem
+rather than stopping at the first one. Each line is checked in two passes.
+The first pass checks the syntax of each line on its own, and reduces each
+feature to a tuple of the values needed by the second pass: sequence ID,
+coordinates, strand, type, ID, and parent IDs. The first pass can run in
+worker processes, a chunk of lines at a time. The second pass checks the
+tuples in order against the sequence regions, IDs, and parent features seen
+so far.
+"""
+
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import tag
+from tag.stages import timed
+
+
+def _check_attributes(attrstring, lineno, errors):
+    """Check an attribute string and pull out the ID and Parent values."""
+    fid, parents = None, None
+    if attrstring in ('', '.'):
+        return fid, parents
+    for kvp in attrstring.split(';'):
+        if kvp == '':
+            continue
+        if kvp.count('=') != 1:
+            errors.append((lineno, 'invalid attribute "{}"'.format(kvp)))
+            continue
+        if kvp.startswith('ID='):
+            fid = kvp[3:]
+            if ',' in fid:
+                errors.append((lineno, 'multiple values for ID'))
+        elif kvp.startswith('Parent='):
+            parents = kvp[7:].split(',')
+    return fid, parents
+
+
+def _check_directive(line, lineno, errors, records):
+    try:
+        directive = tag.Directive(line)
+    except (AssertionError, ValueError) as error:
+        message = str(error) or 'invalid directive "{}"'.format(line)
+        errors.append((lineno, message))
+        return
+    if directive.type == 'sequence-region':
+        rng = directive.range
+        records.append((lineno, directive.seqid, rng.start, rng.end))
+
+
+def check_lines(lines, firstline=1):
+    """
+    Check the syntax of each line of GFF3 data on its own.
+
+    Returns a list of :code:`(lineno, message)` errors, a list of records for
+    :code:`RecordValidator`, and a flag indicating whether the sequence
+    section (:code:`##FASTA`) of the file was reached. Each feature record is
+    a tuple of line number, sequence ID, start (0-based), end, strand, type,
+    ID, parent IDs, and source; sequence regions are recorded as a tuple of
+    line number, sequence ID, start, and end, and :code:`###` directives as a
+    tuple of the line number alone.
+    """
+    errors, records = list(), list()
+    for lineno, line in enumerate(lines, firstline):
+        line = line.strip()
+        if line == '':
+            continue
+        if line.startswith('#'):
+            if line == '###':
+                records.append((lineno,))
+            elif line == '##FASTA':
+                return errors, records, True
+            elif line.startswith('##'):
+                _check_directive(line, lineno, errors, records)
+            continue
+
+        fields = line.split('\t')
+        if len(fields) != 9:
+            message = 'expected 9 tab-separated columns, found {}'
+            errors.append((lineno, message.format(len(fields))))
+            continue
+        seqid, source, ftype, start, end, score, strand, phase, attrs = fields
+        try:
+            start, end = int(start) - 1, int(end)
+        except ValueError:
+            message = 'invalid coordinates [{}, {}]'.format(start, end)
+            errors.append((lineno, message))
+            continue
+        if start < 0 or end < 0 or start > end:
+            message = 'invalid coordinates [{}, {}]'.format(start + 1, end)
+            errors.append((lineno, message))
+            continue
+        if score != '.':
+            try:
+                float(score)
+            except ValueError:
+                errors.append((lineno, 'invalid score "{}"'.format(score)))
+        if strand not in ('+', '-', '.'):
+            errors.append((lineno, 'invalid strand "{}"'.format(strand)))
+        if phase not in ('0', '1', '2', '.'):
+            errors.append((lineno, 'invalid phase "{}"'.format(phase)))
+        fid, parents = _check_attributes(attrs, lineno, errors)
+        records.append(
+            (lineno, seqid, start, end, strand, ftype, fid, parents, source)
+        )
+    return errors, records, False
+
+
+class RecordValidator(object):
+    """
+    Check feature records against one another, in order.
+
+    See :code:`check_lines` for the format of the records. The checks mirror
+    those of :code:`GFF3Reader`: with :code:`assumesorted=True`, each
+    :code:`###` directive ends a block of features that must sort after the
+    previous block, and that cannot be referenced by later features; with
+    :code:`strict=False`, children need not share the strand of their parent
+    or fall within its bounds.
+    """
+
+    def __init__(self, assumesorted=False, strict=True):
+        self.assumesorted = assumesorted
+        self.strict = strict
+        self.regions = dict()
+        self.features = dict()
+        self.pending = defaultdict(list)
+        self.spans = dict()
+        self.blockmin = None
+        self.blockmax = None
+        self.prevmax = None
+        self.flushed = False
+
+    def _check_child(self, child, parent, errors):
+        lineno, seqid, start, end, strand = child[:5]
+        pid = parent[6]
+        if seqid != parent[1]:
+            message = 'seqid mismatch for feature {} ({} vs {})'.format(
+                pid, parent[1], seqid
+            )
+            errors.append((lineno, message))
+        elif self.strict and strand != parent[4]:
+            message = 'child of feature {} has a different strand'
+            errors.append((lineno, message.format(pid)))
+        elif self.strict and (start < parent[2] or end > parent[3]):
+            message = ('child of feature {} is not contained within its '
+                       'span ({}-{})').format(pid, start, end)
+            errors.append((lineno, message))
+
+    def _add_feature(self, record, errors):
+        lineno, seqid, start, end, strand, ftype, fid, parents, source = record
+        region = self.regions.get(seqid)
+        if region is not None and (start < region[0] or end > region[1]):
+            message = 'feature {}@{}[{}, {}] out-of-bounds'.format(
+                ftype, seqid, start + 1, end
+            )
+            errors.append((lineno, message))
+
+        if fid is not None:
+            first = self.features.get(fid)
+            if first is None:
+                self.features[fid] = record
+                for child in self.pending.pop(fid, ()):
+                    self._check_child(child, record, errors)
+            elif ftype != first[5]:
+                message = ('feature type disagreement for ID="{}": {} vs {} '
+                           '(line {})').format(fid, ftype, first[5], first[0])
+                errors.append((lineno, message))
+            elif seqid != first[1]:
+                message = 'ID "{}" already used on sequence {} (line {})'
+                errors.append((lineno, message.format(fid, first[1],
+                                                      first[0])))
+
+        if parents is None:
+            if self.assumesorted:
+                self._add_span(seqid, start, end, ftype, fid, source)
+            return
+        for pid in parents:
+            parent = self.features.get(pid)
+            if parent is None:
+                self.pending[pid].append(record)
+            else:
+                self._check_child(record, parent, errors)
+
+    def _add_span(self, seqid, start, end, ftype, fid, source):
+        """
+        Track the sort order of a top-level feature.
+
+        The parts of a multi-feature are combined into a single span before
+        sorting, as in :code:`GFF3Reader`, and top-level features are compared
+        in the order given by :code:`tag.select.sort_key`.
+        """
+        if fid is not None:
+            span = self.spans.get(fid)
+            if span is None:
+                self.spans[fid] = [seqid, start, end, ftype, source]
+            else:
+                span[1] = min(span[1], start)
+                span[2] = max(span[2], end)
+            return
+        self._add_key(self._key(seqid, start, end, ftype, source))
+
+    @staticmethod
+    def _key(seqid, start, end, ftype, source):
+        return (seqid, start, end, tag.select._type_key(ftype), source)
+
+    def _add_key(self, key):
+        if self.blockmin is None or key < self.blockmin:
+            self.blockmin = key
+        if self.blockmax is None or key > self.blockmax:
+            self.blockmax = key
+
+    def _add_region(self, record, errors):
+        lineno, seqid, start, end = record
+        if seqid in self.regions:
+            message = 'duplicated sequence-region for {}'.format(seqid)
+            errors.append((lineno, message))
+            return
+        if self.assumesorted and self.flushed:
+            message = 'sorting error: sequence-region for {} follows features'
+            errors.append((lineno, message.format(seqid)))
+        self.regions[seqid] = (start, end)
+
+    def _dangling(self, errors):
+        """Report features whose parents were not found."""
+        for pid in sorted(self.pending):
+            for child in self.pending[pid]:
+                message = 'Parent "{}" not found'.format(pid)
+                errors.append((child[0], message))
+        self.pending = defaultdict(list)
+
+    def _end_block(self, lineno, errors):
+        """Check the features since the last :code:`###` directive."""
+        self._dangling(errors)
+        self.features = dict()
+        for span in self.spans.values():
+            self._add_key(self._key(*span))
+        self.spans = dict()
+        if self.blockmin is None:
+            return
+        if self.prevmax is not None and self.blockmin < self.prevmax:
+            message = 'sorting error: {}[{}, {}] sorts before {}[{}, {}]'
+            errors.append((lineno, message.format(
+                self.blockmin[0], self.blockmin[1] + 1, self.blockmin[2],
+                self.prevmax[0], self.prevmax[1] + 1, self.prevmax[2],
+            )))
+        self.prevmax = self.blockmax
+        self.blockmin, self.blockmax = None, None
+        self.flushed = True
+
+    def validate(self, records):
+        """Check a list of records, returning a list of errors."""
+        errors = list()
+        for record in records:
+            size = len(record)
+            if size == 9:
+                self._add_feature(record, errors)
+            elif size == 4:
+                self._add_region(record, errors)
+            elif self.assumesorted:
+                self._end_block(record[0], errors)
+        return errors
+
+    def finish(self, lineno):
+        """Complete the checks at the end of the input (at line lineno)."""
+        errors = list()
+        if self.assumesorted:
+            self._end_block(lineno, errors)
+        else:
+            self._dangling(errors)
+        return sorted(errors)
+
+
+def _chunks(instream, chunksize):
+    chunk, firstline = list(), 1
+    for line in instream:
+        chunk.append(line)
+        if len(chunk) == chunksize:
+            yield chunk, firstline
+            firstline += chunksize
+            chunk = list()
+    if chunk:
+        yield chunk, firstline
+
+
+def _parallel_check(instream, processes, chunksize):
+    """Check chunks of lines in a process pool, yielding results in order."""
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        try:
+            for chunk, firstline in _chunks(instream, chunksize):
+                pending.append(executor.submit(check_lines, chunk, firstline))
+                while len(pending) > 2 * processes:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+@timed('validate')
+def validate(instream, assumesorted=False, strict=True, maxerrors=None,
+             processes=None, chunksize=10000):
+    """
+    Validate a stream of GFF3 lines, yielding an error for each problem.
+
+    Errors are reported as :code:`(lineno, message)` tuples. The syntax of
+    each line is checked, along with the consistency of features with
+    sequence regions, multi-features, and parent features, as described for
+    :code:`RecordValidator`. Errors for features whose parent is missing are
+    reported at the end of the input (or of the block of features, with
+    :code:`assumesorted=True`), so errors are not strictly in order of line
+    number. Validation stops after :code:`maxerrors` errors, if set.
+
+    To check the syntax of lines in parallel, set :code:`processes` to the
+    number of worker processes; lines are sent to the workers in chunks of
+    :code:`chunksize` lines.
+
+    >>> infile = tag.tests.data_file('eden-mismatch.gff3')
+    >>> with tag.open(infile, 'r') as instream:
+    ...     for lineno, message in validate(instream):
+    ...         print(lineno, message)
+    21 feature type disagreement for ID="cds00003": CDS vs exon (line 20)
+    22 feature type disagreement for ID="cds00003": CDS vs exon (line 20)
+    """
+    if processes:
+        results = _parallel_check(instream, processes, chunksize)
+    else:
+        results = (
+            check_lines(chunk, firstline)
+            for chunk, firstline in _chunks(instream, chunksize)
+        )
+    validator = RecordValidator(assumesorted=assumesorted, strict=strict)
+    errors = _errors(results, validator)
+    for error in islice(errors, maxerrors or None):
+        yield error
+
+
+def _errors(results, validator):
+    lineno = 0
+    for errors, records, fasta in results:
+        errors.extend(validator.validate(records))
+        errors.sort()
+        for error in errors:
+            yield error
+        if records:
+            lineno = records[-1][0]
+        if fasta:
+            break
+    for error in validator.finish(lineno):
+        yield error
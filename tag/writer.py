@@ -8,16 +8,50 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import print_function
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+import os
 try:
     from StringIO import StringIO
 except ImportError:  # pragma: no cover
     from io import StringIO
 import sys
+import time
 import tag
 from tag import Directive, Feature, Sequence, GFF3Reader
 
 
+class WriterStats(object):
+    """
+    Runtime statistics for a GFF3Writer.
+
+    The :code:`seconds` attribute records the wall time spent in
+    :code:`GFF3Writer.write`, which includes time spent pulling entries from
+    the input stream.
+    """
+
+    __slots__ = ('lines', 'bytes', 'seconds')
+
+    def __init__(self):
+        self.lines = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def lines_per_second(self):
+        return self.lines / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def asdict(self):
+        return dict(
+            lines=self.lines, bytes=self.bytes, seconds=self.seconds,
+            lines_per_second=self.lines_per_second,
+            bytes_per_second=self.bytes_per_second,
+        )
+
+
 class GFF3Writer():
     """
     Writes sequence features and other GFF3 entries to a file.
@@ -31,6 +65,11 @@ class GFF3Writer():
     >>> writer = GFF3Writer(instream=reader, outfile='/dev/null')
     >>> writer.retainids = True
     >>> writer.write()
+    >>> writer.stats.lines
+    33
+
+    Runtime statistics are collected in the writer's :code:`stats` attribute
+    (see :code:`WriterStats`).
     """
 
     def __init__(self, instream, outfile='-'):
@@ -46,13 +85,19 @@ class GFF3Writer():
         self.feature_counts = defaultdict(int)
         self._seq_written = False
         self._block_count = 0
+        self.stats = WriterStats()
+
+    def _print(self, text):
+        self._out.write(text + '\n')
+        self.stats.lines += text.count('\n') + 1
+        self.stats.bytes += len(text) + 1
 
     def _write_separator(self, blockitvl):
         if not blockitvl:
             return
         if self._block_count < blockitvl:
             return
-        print('###', file=self.outfile)
+        self._print('###')
         self._block_count = 0
 
     def __del__(self):
@@ -66,36 +111,213 @@ class GFF3Writer():
         intersperse separators throughout blocks of simple features, specify a
         desired block size with `blockitvl`.
         """
-        print(repr(Directive('##gff-version 3')), file=self.outfile)
+        starttime = time.perf_counter()
+        with tag.stages.stage('write'):
+            self._write(blockitvl)
+        self.stats.seconds += time.perf_counter() - starttime
+
+    def _write(self, blockitvl):
+        # Like print(), write to stdout if no output file is provided
+        self._out = sys.stdout if self.outfile is None else self.outfile
+        self._print(repr(Directive('##gff-version 3')))
         for entry in self._instream:
-            if isinstance(entry, Directive):
-                if entry.type == 'gff-version':
-                    pass
-                else:
-                    print(repr(entry), file=self.outfile)
-                continue
-            if isinstance(entry, Feature):
-                for feature in entry:
-                    if self.retainids:
+            self._write_entry(entry, blockitvl)
+
+    def _write_entry(self, entry, blockitvl):
+        if isinstance(entry, Directive):
+            if entry.type == 'gff-version':
+                pass
+            else:
+                self._print(repr(entry))
+            return
+        if isinstance(entry, Feature):
+            for feature in entry:
+                if self.retainids:
+                    continue
+                if feature.num_children > 0 or feature.is_multi:
+                    if feature.is_multi and feature != feature.multi_rep:
                         continue
-                    if feature.num_children > 0 or feature.is_multi:
-                        if feature.is_multi and feature != feature.multi_rep:
-                            continue
-                        self.feature_counts[feature.type] += 1
-                        fid = '{}{}'.format(feature.type,
-                                            self.feature_counts[feature.type])
-                        feature.add_attribute('ID', fid)
-                    else:
-                        feature.drop_attribute('ID')
-            if isinstance(entry, Sequence) and not self._seq_written:
-                print('##FASTA', file=self.outfile)
-                self._seq_written = True
-            print(repr(entry), file=self.outfile)
-            if isinstance(entry, Feature):
-                if entry.is_complex:
-                    self._block_count = 0
-                    if self.complex_separators:
-                        print('###', file=self.outfile)
+                    self.feature_counts[feature.type] += 1
+                    fid = '{}{}'.format(feature.type,
+                                        self.feature_counts[feature.type])
+                    feature.add_attribute('ID', fid)
                 else:
-                    self._block_count += 1
-            self._write_separator(blockitvl)
+                    feature.drop_attribute('ID')
+        if isinstance(entry, Sequence) and not self._seq_written:
+            self._print('##FASTA')
+            self._seq_written = True
+        self._print(repr(entry))
+        if isinstance(entry, Feature):
+            if entry.is_complex:
+                self._block_count = 0
+                if self.complex_separators:
+                    self._print('###')
+            else:
+                self._block_count += 1
+        self._write_separator(blockitvl)
+
+
+class GFF3SplitWriter(object):
+    """
+    Splits a stream of GFF3 entries into multiple files in a single pass.
+
+    Each top-level feature graph is routed to an output file, named by
+    substituting a key for :code:`{}` in the :code:`pattern`. Outputs are
+    compressed according to their file extension, as for :code:`tag.open`.
+    The key depends on :code:`by`:
+
+    - :code:`seqid`: the sequence ID of the feature
+    - :code:`type`: the type of the (top-level) feature
+    - :code:`count`: the chunk number, starting a new chunk after every
+      :code:`chunksize` feature graphs
+    - :code:`size`: the chunk number, starting a new chunk once
+      :code:`chunksize` bytes (of uncompressed GFF3) have been written to the
+      current chunk; chunks are only cut between feature graphs
+
+    Each output starts with a :code:`##gff-version` directive and a single
+    copy of any other directives preceding the first feature of the input,
+    and gets the :code:`##sequence-region` directive for each sequence
+    before its first feature on that sequence. Feature IDs are retained.
+    Sequences are written to the corresponding output when splitting by
+    sequence ID and are otherwise discarded, as are comments.
+
+    At most :code:`maxopen` output files are kept open at a time. When more
+    outputs are needed, the least recently used file is closed, and reopened
+    for appending when needed again.
+
+    >>> import shutil
+    >>> import tempfile
+    >>> outdir = tempfile.mkdtemp()
+    >>> reader = GFF3Reader(infilename=tag.tests.data_file('pcan-123.gff3.gz'))
+    >>> writer = GFF3SplitWriter(reader, os.path.join(outdir, '{}.gff3'))
+    >>> writer.write()
+    >>> [os.path.basename(filename) for filename in writer.files]
+    ['scaffold_123.gff3', 'scaffold_124.gff3', 'scaffold_125.gff3']
+    >>> with open(writer.files[0], 'r') as infile:
+    ...     print(''.join(infile.readlines()[:2]), end='')
+    ##gff-version 3
+    ##sequence-region scaffold_123 1 463498
+    >>> shutil.rmtree(outdir)
+    """
+
+    def __init__(self, instream, pattern, by='seqid', chunksize=None,
+                 maxopen=64):
+        if by not in ('seqid', 'type', 'count', 'size'):
+            raise ValueError('cannot split by "{}"'.format(by))
+        if by in ('count', 'size') and not chunksize:
+            raise ValueError('chunk size required to split by ' + by)
+        if '{}' not in pattern:
+            raise ValueError('output pattern must contain "{}"')
+        assert maxopen >= 1, 'must allow at least 1 open file'
+        self._instream = instream
+        self.pattern = pattern
+        self.by = by
+        self.chunksize = chunksize
+        self.maxopen = maxopen
+        self.files = list()
+        self.regions = dict()
+        self.header = list()
+        self._handles = OrderedDict()
+        self._seqids = dict()
+        self._fasta = set()
+        self._chunk = 1
+        self._chunkfill = 0
+
+    def filename(self, key):
+        key = str(key).replace(os.sep, '_')
+        if os.altsep:  # pragma: no cover
+            key = key.replace(os.altsep, '_')
+        return self.pattern.replace('{}', key)
+
+    def _handle(self, key):
+        handle = self._handles.get(key)
+        if handle is not None:
+            self._handles.move_to_end(key)
+            return handle
+        filename = self.filename(key)
+        if key in self._seqids:
+            handle = tag.open(filename, 'a')
+        else:
+            outdir = os.path.dirname(filename)
+            if outdir:
+                os.makedirs(outdir, exist_ok=True)
+            handle = tag.open(filename, 'w')
+            handle.write('##gff-version 3\n')
+            for directive in self.header:
+                handle.write(repr(directive) + '\n')
+            self._seqids[key] = set()
+            self.files.append(filename)
+        self._handles[key] = handle
+        while len(self._handles) > self.maxopen:
+            oldkey, oldhandle = self._handles.popitem(last=False)
+            oldhandle.close()
+        return handle
+
+    def _key(self, feature):
+        if self.by == 'seqid':
+            return feature.seqid
+        elif self.by == 'type':
+            return feature.type
+        return self._chunk
+
+    def _write_feature(self, feature):
+        key = self._key(feature)
+        handle = self._handle(key)
+        lines = list()
+        seqids = self._seqids[key]
+        if feature.seqid not in seqids:
+            seqids.add(feature.seqid)
+            if feature.seqid in self.regions:
+                lines.append(repr(self.regions[feature.seqid]))
+        lines.append(repr(feature))
+        if feature.is_complex:
+            lines.append('###')
+        text = '\n'.join(lines) + '\n'
+        handle.write(text)
+
+        if self.by == 'count':
+            self._chunkfill += 1
+        elif self.by == 'size':
+            self._chunkfill += len(text)
+        if self.by in ('count', 'size') and self._chunkfill >= self.chunksize:
+            self._handles.pop(key).close()
+            self._chunk += 1
+            self._chunkfill = 0
+
+    def _write_sequence(self, sequence):
+        if self.by != 'seqid':
+            return
+        handle = self._handle(sequence.seqid)
+        if sequence.seqid not in self._fasta:
+            self._fasta.add(sequence.seqid)
+            handle.write('##FASTA\n')
+        handle.write(repr(sequence) + '\n')
+
+    def _add_header(self, directive):
+        if directive.type is None:
+            return  # ### separator
+        text = repr(directive)
+        if all(repr(other) != text for other in self.header):
+            self.header.append(directive)
+
+    def write(self):
+        """Pull entries from the instream and write them to the outputs."""
+        with tag.stages.stage('write'):
+            try:
+                for entry in self._instream:
+                    if isinstance(entry, Feature):
+                        self._write_feature(entry)
+                    elif isinstance(entry, Sequence):
+                        self._write_sequence(entry)
+                    elif isinstance(entry, Directive):
+                        if entry.type == 'sequence-region':
+                            self.regions[entry.seqid] = entry
+                        elif entry.type != 'gff-version' and not self.files:
+                            self._add_header(entry)
+            finally:
+                self.close()
+
+    def close(self):
+        while self._handles:
+            key, handle = self._handles.popitem(last=False)
+            handle.close()